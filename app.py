@@ -5,17 +5,17 @@
 import streamlit as st
 import os
 from pathlib import Path
-from io import BytesIO
 from datetime import datetime
-import docx
-from docx.shared import Inches, Pt
-from docx.enum.text import WD_PARAGRAPH_ALIGNMENT
 
 # 导入本地模块
-from parser import TenderParser, ParseResult
-from generator import BidDocumentGenerator as BidGenerator
-from database import CompanyDatabase
+from parser import ParseResult
 import config
+from services import get_services
+from bid_preview import pending_thumbnails
+from metrics_store import generation_metrics
+from generation_estimate import compare_to_actual, estimate_generation, fit_history, format_comparison, format_duration
+from cert_images import format_size
+from tracing import start_trace
 
 
 # ==================== 配置 ====================
@@ -42,18 +42,24 @@ st.markdown("""
 
 # ==================== 初始化 ====================
 
-# 初始化数据库
-data_dir = Path(__file__).parent / "data"
-db = CompanyDatabase(data_dir)
+# 数据库、解析器、生成器每个进程只创建一次，后台预热数据和证书缓存
+services = get_services()
+data_dir = services.data_dir
+db = services.db
+parser = services.parser
+generator = services.generator
 
-# 初始化解析器
-parser = TenderParser(data_dir)
 
-# 初始化生成器
-templates_dir = Path(__file__).parent / "templates"
-output_dir = Path("output")
-output_dir.mkdir(exist_ok=True)
-generator = BidGenerator(templates_dir, output_dir)
+@st.cache_data(show_spinner=False)
+def estimate_coefficients(latest_record_id, date: str) -> dict:
+    """历史生成记录拟合的预估系数（参数只作为缓存键：有新的生成记录或换日时才重新读取和拟合）
+
+    Args:
+        latest_record_id: 最新生成记录的 ID（MetricsStore.latest_id）
+        date: 当天日期（历史记录按天数取范围）
+    """
+    return fit_history(services.metrics.records(config.ESTIMATE_CONFIG["history_days"]))
+
 
 # ==================== 会话状态 ====================
 
@@ -93,6 +99,10 @@ with st.sidebar:
     # 资料管理入口
     if st.button("📊 资料管理", use_container_width=True):
         st.session_state.active_page = "data_management"
+
+    # 性能统计入口
+    if st.button("📈 性能统计", use_container_width=True):
+        st.session_state.active_page = "performance"
     
     # 快速操作
     st.divider()
@@ -105,6 +115,15 @@ with st.sidebar:
     st.markdown(f"- **产品**: {len(db.get_products())} 项")
     st.markdown(f"- **人员**: {len(db.get_personnel())} 项")
 
+    # 服务预热状态
+    service_status = services.status()
+    if not service_status["ready"]:
+        st.caption("⏳ 服务预热中……")
+    elif service_status["error"]:
+        st.caption(f"⚠️ 服务预热失败：{service_status['error']}")
+    else:
+        st.caption(f"✓ 服务就绪（预热 {service_status['warmup_seconds']:.2f}s）")
+
 # 主内容区
 if st.session_state.get('active_page') == 'data_management':
     st.title("📊 资料管理")
@@ -115,7 +134,73 @@ if st.session_state.get('active_page') == 'data_management':
     st.markdown(f"- `{data_dir}/cases.json`")
     st.markdown(f"- `{data_dir}/products.json`")
     st.markdown(f"- `{data_dir}/personnel.json`")
-    
+
+elif st.session_state.get('active_page') == 'performance':
+    st.title("📈 性能统计")
+
+    if st.button("⬅️ 返回生成页面"):
+        st.session_state.active_page = "main"
+        st.rerun()
+
+    periods = {"最近 7 天": 7, "最近 30 天": 30, "最近 90 天": 90, "全部": None}
+    period = st.radio("时间范围", list(periods), index=1, horizontal=True)
+    days = periods[period]
+    summary = services.metrics.summary(days)
+
+    if not summary["count"]:
+        st.info("暂无生成记录，生成投标文件后在这里查看耗时统计")
+    else:
+        seconds = summary["fields"]["total_seconds"]
+        output_bytes = summary["fields"]["output_bytes"]
+        col1, col2, col3, col4 = st.columns(4)
+        col1.metric("生成次数", summary["count"])
+        col2.metric("耗时 P50", f"{seconds['p50']:.1f}s")
+        col3.metric("耗时 P90", f"{seconds['p90']:.1f}s")
+        col4.metric("文件大小 P50", f"{(output_bytes['p50'] or 0) / (1024 * 1024):.1f} MB")
+
+        st.markdown("#### 各阶段耗时（秒）")
+        st.table([
+            {"阶段": name, "次数": stats["count"], "P50": round(stats["p50"], 2),
+             "P90": round(stats["p90"], 2), "P95": round(stats["p95"], 2), "最大": round(stats["max"], 2)}
+            for name, stats in summary["stages"].items()
+        ])
+        st.caption("证书转换为各页转换耗时之和（并发转换，可能大于构建章节耗时）")
+
+        trend = services.metrics.daily_trend(days)
+        if len(trend) > 1:
+            st.markdown("#### 每日耗时趋势（秒）")
+            st.line_chart({
+                "日期": [t["date"] for t in trend],
+                "P50": [t["p50_seconds"] for t in trend],
+                "P90": [t["p90_seconds"] for t in trend],
+            }, x="日期")
+
+        records = services.metrics.records(days)
+        st.markdown("#### 耗时与证书数量")
+        st.scatter_chart({
+            "证书页数": [r["certs_rendered"] + r["certs_cached"] for r in records],
+            "耗时（秒）": [r["total_seconds"] for r in records],
+        }, x="证书页数", y="耗时（秒）")
+
+        st.markdown("#### 最近生成记录")
+        st.dataframe([
+            {
+                "时间": r["created_at"],
+                "项目": r["project_name"],
+                "耗时（秒）": round(r["total_seconds"], 2),
+                "需求": r["requirements"],
+                "资质": r["qualifications"],
+                "证书转换": r["certs_rendered"],
+                "证书缓存": r["certs_cached"],
+                "章节缓存": r["sections_cached"],
+                "设备规格行": r["equipment_rows"],
+                "复用文件": r["reused"],
+                "大小（MB）": round(r["output_bytes"] / (1024 * 1024), 2),
+                "峰值内存（MB）": round(r["peak_rss_mb"]) if r["peak_rss_mb"] is not None else None,
+            }
+            for r in records[:50]
+        ], use_container_width=True)
+
 else:
     st.title("📄 智能投标文件生成")
     st.markdown("---")
@@ -312,6 +397,14 @@ else:
         
         # 更新session state
         st.session_state.tender_info['requirements'] = edited_requirements
+
+        # 后台预渲染可能匹配到的证书（与第二步相同的匹配方法），点击生成时直接命中缓存
+        if config.CERT_IMAGE_CONFIG.get("prerender"):
+            st.session_state.prerender_batch = services.prerenderer.schedule(
+                db.match_qualifications(edited_requirements),
+                data_dir,
+                st.session_state.get("compression_profile")
+            )
         
         # 显示建议
         if parse_result.get_confidence_level() != "高":
@@ -404,6 +497,51 @@ else:
         separate_bids = st.checkbox("技术标和商务标分开生成", value=True, key="separate_bids")
         st.caption("勾选后，将生成两个独立的文件")
 
+        profile_names = list(config.COMPRESSION_PROFILES)
+        compression_profile = st.selectbox(
+            "证书图片压缩方案",
+            profile_names,
+            index=profile_names.index(config.DEFAULT_COMPRESSION_PROFILE),
+            format_func=lambda name: config.COMPRESSION_PROFILES[name]["label"],
+            key="compression_profile"
+        )
+        st.caption("打印：高清原图；屏幕阅读：默认；招标平台上传：黑白件转灰度/黑白，控制总大小")
+
+        # 只显示当前招标文件这批证书的进度
+        prerender_batch = st.session_state.get('prerender_batch')
+        prerender_status = prerender_batch.status() if prerender_batch else {"queued": 0}
+        if prerender_status["queued"]:
+            finished = prerender_status["done"] + prerender_status["failed"]
+            st.caption(f"证书预渲染: {finished}/{prerender_status['queued']} 个已完成")
+
+        # 预估耗时和文件大小（按证书页数、渲染缓存、设备规格行数和历史生成记录）
+        estimate = estimate_generation(
+            st.session_state.matched_data.get('qualifications', []),
+            data_dir,
+            separate_bids=separate_bids,
+            compression_profile=compression_profile,
+            cert_cache_dir=generator.cert_cache_dir,
+            coefficients=estimate_coefficients(services.metrics.latest_id(), datetime.now().strftime("%Y-%m-%d"))
+        )
+        st.info(f"⏱️ 预计耗时约 {format_duration(estimate['seconds'])}，文件大小约 {format_size(estimate['bytes'])}")
+        basis = f"参考 {estimate['history']} 条历史记录" if estimate['history'] else "暂无历史记录，按默认值预估"
+        st.caption(f"证书 {estimate['cert_pages']} 页（已缓存 {estimate['cached_pages']} 页）、"
+                   f"设备规格 {estimate['equipment_rows']} 行；{basis}")
+
+        # 即时预览（直接用匹配结果渲染，不生成 docx）
+        with st.expander("👁️ 预览投标文件", expanded=False):
+            st.markdown(
+                generator.generate_preview_html(
+                    st.session_state.tender_info,
+                    config.COMPANY_INFO,
+                    st.session_state.matched_data,
+                    separate_bids=separate_bids
+                ),
+                unsafe_allow_html=True
+            )
+            if pending_thumbnails():
+                st.caption("证书缩略图生成中，稍后刷新页面即可显示")
+
         # 生成按钮
         if st.button("🚀 生成投标文件", type="primary", key="generate_bid"):
             try:
@@ -420,50 +558,51 @@ else:
                 # 准备匹配数据
                 matched_data = st.session_state.matched_data
 
-                # 生成投标文件
-                if separate_bids:
-                    # 生成技术标和商务标分开
-                    output_paths = generator.generate_separate_bids(
+                # 生成投标文件（技术标和商务标分开或单一文件），保留生成结果供下载
+                with start_trace("生成投标文件", separate_bids=separate_bids) as generate_trace:
+                    artifacts = generator.generate_artifacts(
                         st.session_state.tender_info,
                         config.COMPANY_INFO,
                         matched_data,
-                        show_cert_images=True
+                        separate_bids=separate_bids,
+                        show_cert_images=True,
+                        compression_profile=compression_profile
                     )
-                    st.success("✅ 投标文件生成成功！")
-                else:
-                    # 生成单一投标文件
-                    output_path = generator.generate_bid(
-                        st.session_state.tender_info,
-                        config.COMPANY_INFO,
-                        matched_data,
-                        show_cert_images=True
-                    )
-                    st.success("✅ 投标文件生成成功！")
-
-                # 添加下载按钮
-                st.markdown("---")
-                st.markdown("### 📥 下载投标文件")
-
-                # 查找生成的文件
-                output_dir = Path("output")
-                if output_dir.exists():
-                    files = list(output_dir.glob("*.docx"))
-
-                    if files:
-                        # 按修改时间排序，显示最新的2份文件（技术标和商务标）
-                        latest_files = sorted(files, key=lambda f: f.stat().st_mtime, reverse=True)[:2]
-
-                        for file in latest_files:
-                            with open(file, 'rb') as f:
-                                st.download_button(
-                                    label=f"⬇️ 下载 {file.name}",
-                                    data=f,
-                                    file_name=file.name,
-                                    mime='application/vnd.openxmlformats-officedocument.wordprocessingml.document',
-                                    key=f"download_{file.name}"
-                                )
-                            st.caption(f"生成时间: {datetime.fromtimestamp(file.stat().st_mtime).strftime('%Y-%m-%d %H:%M:%S')} | 大小: {file.stat().st_size / 1024:.1f} KB")
-                    else:
-                        st.info("暂无生成的文件")
+                st.session_state.generated_artifacts = artifacts
+
+                # 记录本次生成的耗时和大小（性能统计页面）
+                metrics = generation_metrics(
+                    generate_trace, st.session_state.tender_info, matched_data,
+                    [artifact.path for artifact in artifacts if artifact.path]
+                )
+                services.metrics.record(metrics)
+                st.session_state.estimate_comparison = compare_to_actual(
+                    estimate, metrics["total_seconds"], metrics["output_bytes"]
+                )
+                st.success("✅ 投标文件生成成功！")
             except Exception as e:
                 st.error(f"❌ 生成失败：{e}")
+
+        # 添加下载按钮（直接使用本次生成的结果，不扫描输出目录）
+        artifacts = st.session_state.get('generated_artifacts')
+        if artifacts:
+            st.markdown("---")
+            st.markdown("### 📥 下载投标文件")
+
+            for artifact in artifacts:
+                if not artifact.exists():
+                    st.warning(f"⚠️ {artifact.label}文件已被清理，请重新生成")
+                    continue
+                st.download_button(
+                    label=f"⬇️ 下载{artifact.label} {artifact.name}",
+                    data=artifact.read_bytes(),
+                    file_name=artifact.name,
+                    mime=artifact.mime,
+                    key=f"download_{artifact.name}"
+                )
+                st.caption(f"生成时间: {artifact.created.strftime('%Y-%m-%d %H:%M:%S')} | 大小: {artifact.size / 1024:.1f} KB")
+
+            # 预估与实际对比
+            comparison = st.session_state.get('estimate_comparison')
+            if comparison:
+                st.caption(format_comparison(comparison))
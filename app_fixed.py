@@ -18,11 +18,13 @@ from datetime import datetime
 sys.path.insert(0, str(Path(__file__).parent))
 
 from config import COMPANY_INFO, DATA_DIR, UPLOADS_DIR, OUTPUT_DIR, PRODUCTION_BASES
-from database import CompanyDatabase
-from parser import TenderParser
-from generator import BidDocumentGenerator
+from services import get_services
+from tracing import start_trace, render_waterfall_html
+from metrics_store import generation_metrics
+from profiling import profile_run
 from error_handler import get_error_handler, handle_error, format_error_for_display
 import shutil
+from contextlib import nullcontext
 
 
 # ==================== 页面配置 ====================
@@ -95,24 +97,114 @@ def log_file_upload(filename: str, file_size: int, file_type: str):
     })
 
 
+def show_trace(trace):
+    """调试模式下显示耗时瀑布图（悬停在行上查看区间属性）
+
+    Args:
+        trace: 耗时追踪（见 tracing.py）
+    """
+    if not st.session_state.debug_mode or trace is None:
+        return
+
+    st.markdown(f"**⏱️ 耗时瀑布图：{trace.name}（{trace.duration:.2f}s）**")
+    st.markdown(render_waterfall_html(trace), unsafe_allow_html=True)
+
+    # 内存采样：列出解析文件、各阶段和各章节（不含每页证书转换）
+    if trace.memory is not None:
+        rows = []
+        for record in trace.to_records():
+            memory = record["memory"]
+            if memory is None or record["depth"] > 3:
+                continue
+            rows.append({
+                "区间": "　" * record["depth"] + record["name"],
+                "峰值（MB）": memory["peak_mb"],
+                "保留（MB）": memory["retained_mb"],
+                "主要分配位置": "；".join(f"{site['site']} +{site['size_mb']:.1f}MB"
+                                      for site in memory.get("top_sites", [])[:3]),
+            })
+        st.markdown("**🧠 各阶段内存**")
+        st.dataframe(rows, use_container_width=True)
+        st.caption("峰值和保留量相对区间开始时计算；并发构建的章节互相包含对方的分配")
+    st.download_button(
+        label="📥 下载追踪数据（JSON Lines）",
+        data=trace.to_jsonl(),
+        file_name=f"trace_{trace.trace_id}.jsonl",
+        mime="application/x-ndjson",
+        key=f"trace_{trace.trace_id}"
+    )
+
+
+def memory_sampling() -> bool:
+    """调试模式下是否开启了内存采样"""
+    return st.session_state.debug_mode and st.session_state.get("memory_enabled", False)
+
+
+def profile_step(name: str):
+    """调试模式下开启性能分析时，对步骤运行 cProfile，否则不做任何事
+
+    Args:
+        name: 步骤名称
+    """
+    if st.session_state.debug_mode and st.session_state.get("profile_enabled"):
+        return profile_run(name)
+    return nullcontext()
+
+
+def show_profile(run):
+    """显示性能分析结果：累计耗时最多的函数，提供 .prof 文件下载
+
+    Args:
+        run: 性能分析（见 profiling.py），未开启时为 None
+    """
+    if run is None:
+        return
+
+    st.markdown(f"**🔬 性能分析：{run.name}（{run.seconds:.2f}s）**")
+    st.dataframe([
+        {
+            "函数": entry["function"],
+            "调用次数": entry["calls"],
+            "自身耗时（秒）": round(entry["tottime"], 4),
+            "累计耗时（秒）": round(entry["cumtime"], 4),
+        }
+        for entry in run.top_functions()
+    ], use_container_width=True)
+    st.caption("章节构建、证书转换在线程池中并发进行，各线程的耗时累加，可能超过步骤总耗时")
+    if run.path and run.path.exists():
+        st.download_button(
+            label="📥 下载性能分析文件（.prof，可用 snakeviz 查看）",
+            data=run.path.read_bytes(),
+            file_name=run.path.name,
+            mime="application/octet-stream",
+            key=f"profile_{run.path.name}"
+        )
+
+
+def record_generation(trace, tender_info: dict, output_paths: list):
+    """记录本次生成的耗时和大小（生成指标历史，见 metrics_store.py）
+
+    Args:
+        trace: 本次生成的耗时追踪
+        tender_info: 招标信息
+        output_paths: 生成的文件
+    """
+    metrics = generation_metrics(trace, tender_info, st.session_state.matched_data, output_paths)
+    get_services().metrics.record(metrics)
+
+
 # ==================== 初始化数据库 ====================
-@st.cache_resource
 def get_database():
-    """获取数据库实例"""
-    return CompanyDatabase(DATA_DIR)
+    """获取数据库实例（进程内共用，见 services.py）"""
+    return get_services().db
 
-@st.cache_resource
 def get_parser():
     """获取解析器实例"""
-    return TenderParser()
+    return get_services().parser
 
-@st.cache_resource
 def get_generator():
     """获取生成器实例"""
-    return BidDocumentGenerator(
-        templates_dir=Path(__file__).parent / "templates",
-        output_dir=OUTPUT_DIR
-    )
+    return get_services().generator
 
 
 # ==================== 侧边栏 ====================
@@ -158,6 +250,10 @@ def render_sidebar():
 
         if st.session_state.debug_mode:
             st.success("🔓 调试模式已开启 - 将显示详细错误信息")
+            st.checkbox("⏱️ 性能分析（cProfile）", key="profile_enabled",
+                        help="对解析、匹配、生成运行 cProfile，显示累计耗时最多的函数，可下载 .prof 文件")
+            st.checkbox("🧠 内存采样（tracemalloc）", key="memory_enabled",
+                        help="记录解析、各阶段、各章节和证书转换的内存峰值、保留量和主要分配位置（运行明显变慢）")
         else:
             st.info("🔒 调试模式已关闭 - 仅显示基本错误信息")
 
@@ -292,16 +388,23 @@ def page_generate_bid():
                     "files": tender_paths
                 })
 
+                parse_trace = None
+                parse_profile = None
                 with st.spinner(f"正在解析 {len(tender_paths)} 个招标文件..."):
                     try:
                         # 解析所有文件并合并结果
-                        tender_info = parser.parse_multiple_files(tender_paths)
+                        with start_trace("解析招标文件", memory=memory_sampling(), files=len(tender_paths)) as parse_trace, \
+                                profile_step("解析招标文件") as parse_profile:
+                            tender_info = parser.parse_multiple_files(tender_paths)
 
                         # 记录解析结果
                         log_step("招标文件解析完成", {
                             "project_name": tender_info.get("project_info", {}).get("project_name"),
-                            "require_separate_bids": tender_info.get("require_separate_bids", False)
+                            "require_separate_bids": tender_info.get("require_separate_bids", False),
+                            "seconds": round(parse_trace.duration, 3)
                         })
+                        show_trace(parse_trace)
+                        show_profile(parse_profile)
 
                         # 显示解析结果
                         project_info = tender_info.get("project_info", {})
@@ -362,6 +465,8 @@ def page_generate_bid():
                         if st.session_state.debug_mode:
                             with st.expander("🔍 详细错误信息（调试模式）"):
                                 st.markdown(format_error_for_display(error_info))
+                                show_trace(parse_trace)
+                                show_profile(parse_profile)
 
                                 # 显示会话状态（用于调试）
                                 st.subheader("📋 会话状态")
@@ -407,22 +512,26 @@ def page_generate_bid():
                     "product_requirements": tender_info.get("product_requirements", [])
                 })
 
+                match_trace = None
+                match_profile = None
                 with st.spinner("正在匹配相关资料..."):
                     try:
-                        # 匹配资质
-                        qual_reqs = tender_info.get("qualification_requirements", [])
-                        matched_qualifications = db.match_qualifications(qual_reqs)
-
-                        # 匹配案例
-                        product_reqs = tender_info.get("product_requirements", [])
-                        matched_cases = db.match_cases(
-                            industry=None,  # 不限制行业
-                            product_type=product_reqs[0] if product_reqs else None,
-                            limit=5
-                        )
+                        with start_trace("匹配资料", memory=memory_sampling()) as match_trace, \
+                                profile_step("匹配资料") as match_profile:
+                            # 匹配资质
+                            qual_reqs = tender_info.get("qualification_requirements", [])
+                            matched_qualifications = db.match_qualifications(qual_reqs)
+
+                            # 匹配案例
+                            product_reqs = tender_info.get("product_requirements", [])
+                            matched_cases = db.match_cases(
+                                industry=None,  # 不限制行业
+                                product_type=product_reqs[0] if product_reqs else None,
+                                limit=5
+                            )
 
-                        # 匹配产品
-                        matched_products = db.match_products(product_reqs)
+                            # 匹配产品
+                            matched_products = db.match_products(product_reqs)
 
                         # 调试信息（显示解析出来的关键词）
                         st.info("💡 解析信息：")
@@ -439,8 +548,11 @@ def page_generate_bid():
                         log_step("资料匹配完成", {
                             "matched_qualifications": len(matched_qualifications),
                             "matched_cases": len(matched_cases),
-                            "matched_products": len(matched_products)
+                            "matched_products": len(matched_products),
+                            "seconds": round(match_trace.duration, 3)
                         })
+                        show_trace(match_trace)
+                        show_profile(match_profile)
 
                         # 显示匹配结果
                         col1, col2 = st.columns(2)
@@ -482,6 +594,8 @@ def page_generate_bid():
                         if st.session_state.debug_mode:
                             with st.expander("🔍 详细错误信息（调试模式）"):
                                 st.markdown(format_error_for_display(error_info))
+                                show_trace(match_trace)
+                                show_profile(match_profile)
 
     # 步骤4：生成文件
     if current_step >= 3:
@@ -503,16 +617,20 @@ def page_generate_bid():
                     "require_separate_bids": require_separate
                 })
 
+                generate_trace = None
+                generate_profile = None
                 with st.spinner("正在生成投标文件..."):
                     try:
                         if require_separate:
                             # 生成技术标和商务标
-                            output_paths = generator.generate_separate_bids(
-                                tender_info=tender_info,
-                                company_info=COMPANY_INFO,
-                                matched_data=st.session_state.matched_data,
-                                quote_data=st.session_state.get("quote_data", {})
-                            )
+                            with start_trace("生成投标文件", memory=memory_sampling(), separate_bids=True) as generate_trace, \
+                                    profile_step("生成投标文件") as generate_profile:
+                                output_paths = generator.generate_separate_bids(
+                                    tender_info=tender_info,
+                                    company_info=COMPANY_INFO,
+                                    matched_data=st.session_state.matched_data,
+                                    quote_data=st.session_state.get("quote_data", {})
+                                )
 
                             st.success(f"✓ 已生成2个投标文件：")
                             st.write(f"  • {output_paths['tech'].name}")
@@ -521,8 +639,12 @@ def page_generate_bid():
                             # 记录生成成功
                             log_step("投标文件生成成功", {
                                 "tech_file": output_paths['tech'].name,
-                                "commercial_file": output_paths['commercial'].name
+                                "commercial_file": output_paths['commercial'].name,
+                                "seconds": round(generate_trace.duration, 3)
                             })
+                            show_trace(generate_trace)
+                            show_profile(generate_profile)
+                            record_generation(generate_trace, tender_info, list(output_paths.values()))
 
                             # 下载技术标
                             with open(output_paths['tech'], "rb") as f:
@@ -545,19 +667,25 @@ def page_generate_bid():
                                 )
                         else:
                             # 生成单一投标文件
-                            output_path = generator.generate_bid(
-                                tender_info=tender_info,
-                                company_info=COMPANY_INFO,
-                                matched_data=st.session_state.matched_data,
-                                quote_data=st.session_state.get("quote_data", {})
-                            )
+                            with start_trace("生成投标文件", memory=memory_sampling(), separate_bids=False) as generate_trace, \
+                                    profile_step("生成投标文件") as generate_profile:
+                                output_path = generator.generate_bid(
+                                    tender_info=tender_info,
+                                    company_info=COMPANY_INFO,
+                                    matched_data=st.session_state.matched_data,
+                                    quote_data=st.session_state.get("quote_data", {})
+                                )
 
                             st.success(f"✓ 投标文件已生成：{output_path.name}")
 
                             # 记录生成成功
                             log_step("投标文件生成成功", {
-                                "file": output_path.name
+                                "file": output_path.name,
+                                "seconds": round(generate_trace.duration, 3)
                             })
+                            show_trace(generate_trace)
+                            show_profile(generate_profile)
+                            record_generation(generate_trace, tender_info, [output_path])
 
                             # 下载按钮
                             with open(output_path, "rb") as f:
@@ -580,6 +708,8 @@ def page_generate_bid():
                         if st.session_state.debug_mode:
                             with st.expander("🔍 详细错误信息（调试模式）"):
                                 st.markdown(format_error_for_display(error_info))
+                                show_trace(generate_trace)
+                                show_profile(generate_profile)
 
                                 # 显示会话状态（用于调试）
                                 st.subheader("📋 会话状态")
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+docx 保存性能测试
+
+生成一个包含 60 个证书扫描件的投标文件（技术标），
+比较 python-docx 默认保存与 docx_writer 各种压缩策略的保存时间和文件大小。
+
+用法：
+    python bench_docx_save.py [证书数量] [重复次数]
+"""
+
+import sys
+import tempfile
+import time
+from io import BytesIO
+from pathlib import Path
+
+from PIL import Image as PILImage
+from reportlab.pdfgen import canvas
+
+from bid_layout import get_layout, build_fragments, assemble_fragments
+from cert_images import format_size
+from docx_writer import save_docx
+from generator import BidDocumentGenerator
+
+
+def make_certificates(data_dir: Path, count: int) -> list:
+    """生成扫描件证书 PDF（带噪点的 A4 图片，接近真实扫描件的压缩特性）"""
+    qualifications = []
+    keywords = ["体系认证", "AAA信用", "重点荣誉", "授权合作", "其他"]
+    for i in range(1, count + 1):
+        noise = [PILImage.effect_noise((620, 877), 40 + i % 20) for _ in range(3)]
+        image = PILImage.merge("RGB", noise).resize((1240, 1754))
+        image_path = data_dir / f"cert_{i}.jpg"
+        image.save(image_path, quality=85)
+
+        pdf_path = data_dir / f"cert_{i}.pdf"
+        c = canvas.Canvas(str(pdf_path))
+        c.drawImage(str(image_path), 0, 0, width=595, height=842)
+        c.showPage()
+        c.save()
+
+        qualifications.append({
+            "id": i,
+            "name": f"{keywords[i % len(keywords)]}证书{i}",
+            "level": "一级",
+            "cert_file": pdf_path.name,
+        })
+    return qualifications
+
+
+def build_bid(root: Path, count: int):
+    """按技术标布局构建文档（不使用章节缓存）"""
+    (root / "templates").mkdir()
+    data_dir = root / "data"
+    data_dir.mkdir()
+    qualifications = make_certificates(data_dir, count)
+
+    generator = BidDocumentGenerator(root / "templates", root)
+    layout = get_layout("技术标")
+    tender_info = {"project_info": {"project_name": "性能测试"}, "product_requirements": []}
+    company_info = {"name": "测试公司", "address": "地址", "phone": "1", "fax": "2", "email": "e"}
+    matched_data = {"qualifications": qualifications, "cases": []}
+
+    # 证书小节每类最多 10 个，其余归入其他证书
+    builders = generator._section_builders(layout, tender_info, company_info, matched_data)
+    return assemble_fragments(build_fragments(layout, builders))
+
+
+def bench(name: str, save, repeat: int) -> dict:
+    """重复保存取最短时间"""
+    best = None
+    size = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        size = save()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return {"name": name, "seconds": best, "size": size}
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 60
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        print(f"构建 {count} 个证书的技术标...")
+        doc = build_bid(root, count)
+        print(f"图片数量: {len(doc.inline_shapes)}")
+        print()
+
+        output_path = root / "bench.docx"
+
+        def to_file(**options):
+            def save():
+                save_docx(doc, output_path, **options)
+                return output_path.stat().st_size
+            return save
+
+        def python_docx_save():
+            doc.save(output_path)
+            return output_path.stat().st_size
+
+        def to_buffer():
+            buffer = BytesIO()
+            save_docx(doc, buffer)
+            return len(buffer.getvalue())
+
+        results = [
+            bench("python-docx doc.save", python_docx_save, repeat),
+            bench("全部 deflate（级别 6）", to_file(store_media=False, compresslevel=6), repeat),
+            bench("图片存储 + XML 级别 6", to_file(store_media=True, compresslevel=6), repeat),
+            bench("图片存储 + XML 级别 1", to_file(store_media=True, compresslevel=1), repeat),
+            bench("图片存储 + XML 级别 9", to_file(store_media=True, compresslevel=9), repeat),
+            bench("写入内存缓冲区（默认配置）", to_buffer, repeat),
+        ]
+
+        baseline = results[0]["seconds"]
+        print(f"{'保存方式':<28}{'时间':>10}{'大小':>12}{'相对耗时':>10}")
+        print("-" * 62)
+        for result in results:
+            print(f"{result['name']:<28}{result['seconds'] * 1000:>8.0f}ms"
+                  f"{format_size(result['size']):>12}{result['seconds'] / baseline:>9.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+微基准测试
+
+对解析、匹配、生成的热点函数分别计时，测试数据按固定随机种子生成（见 synthetic_data.py），每次运行结果可以对比：
+- extract_requirements: 从 1 万/10 万行文本中提取需求
+- calculate_confidence: 计算解析置信度
+- match_qualifications / match_cases / match_products: 100/1 万/10 万条公司资料（含读取 JSON 文件，与实际调用一致）
+- equipment_specs_table: 100/1 万行设备说明一览表
+- cert_convert: 单个证书文件转换（渲染缓存缺失时）
+- doc_save / save_docx: 保存文档（python-docx 原生保存、确定性保存）
+
+每项先自动确定循环次数（单次计时不少于 0.2 秒），再在时间预算内重复测量，
+报告单次调用耗时的最小值、中位数、平均值；计时期间关闭垃圾回收（同 timeit）。
+
+用法：
+    python benchmark.py                         # 全部基准（1 万行设备表等大规模项较慢，约需数分钟）
+    python benchmark.py match extract           # 名称以这些前缀开头的基准
+    python benchmark.py --quick                 # 每项只测最小规模
+    python benchmark.py --output result.json    # 结果文件，默认写入 cache/benchmarks/
+    python benchmark.py --compare base.json     # 与之前的结果对比（按中位数）
+"""
+
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import timeit
+from datetime import datetime
+from io import BytesIO
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from config import BASE_DIR, BENCHMARK_DIR, BENCHMARK_CONFIG
+from synthetic_data import (
+    FILLER_SENTENCES, REQUIREMENT_SENTENCES, certificate_pdf, company_records, equipment_specs, scan_image,
+    tender_text, write_data_dir,
+)
+
+# 已注册的基准 {名称: {'param': 规模参数名, 'sizes': [...], 'factory': 准备函数}}
+BENCHMARKS: Dict[str, Dict] = {}
+
+
+def benchmark(name: str, param: str, sizes: List):
+    """
+    注册基准的装饰器
+
+    准备函数 factory(size, work_dir, rng) 生成测试数据，返回被测函数，
+    或 (被测函数, 每次调用前执行的准备函数)；环境不满足时返回 None（记为跳过）。
+    """
+    def decorator(factory: Callable) -> Callable:
+        BENCHMARKS[name] = {"param": param, "sizes": sizes, "factory": factory}
+        return factory
+    return decorator
+
+
+def measure(func: Callable, setup: Optional[Callable] = None,
+            budget: Optional[float] = None, max_repeat: Optional[int] = None) -> Dict:
+    """
+    测量单次调用耗时
+
+    Args:
+        func: 被测函数
+        setup: 每次调用前执行（不计时），提供时每次计时只调用一次
+        budget: 重复测量的时间预算（秒），默认见 BENCHMARK_CONFIG
+        max_repeat: 最多重复次数，默认见 BENCHMARK_CONFIG
+
+    Returns:
+        {'number': 每次计时的调用次数, 'runs': [单次调用耗时, ...], 'min', 'median', 'mean', 'stdev'}
+    """
+    budget = budget or BENCHMARK_CONFIG["budget_seconds"]
+    max_repeat = max_repeat or BENCHMARK_CONFIG["max_repeat"]
+    if setup is None:
+        timer = timeit.Timer(func)
+        number, first = timer.autorange()
+    else:
+        timer = timeit.Timer(func, setup)
+        number, first = 1, timer.timeit(1)
+
+    if first > budget:
+        # 单次已超过预算（如 1 万行表格），不再重复
+        totals = [first]
+    else:
+        # 第一次计时作为预热，不计入结果
+        repeat = max(3, min(max_repeat, int(budget / first)))
+        totals = timer.repeat(repeat=repeat, number=number)
+
+    runs = [total / number for total in totals]
+    return {
+        "number": number,
+        "runs": runs,
+        "min": min(runs),
+        "median": statistics.median(runs),
+        "mean": statistics.mean(runs),
+        "stdev": statistics.stdev(runs) if len(runs) > 1 else 0.0,
+    }
+
+
+# ==================== 测试数据 ====================
+
+def paragraphs_document(paragraphs: int, images: int, work_dir: Path, rng: random.Random):
+    """包含若干段落和扫描件图片的文档（用于测量保存）"""
+    from docx import Document
+    from docx.shared import Inches
+
+    doc = Document()
+    for i in range(paragraphs):
+        doc.add_paragraph(f"{i + 1}. {rng.choice(REQUIREMENT_SENTENCES)}，{rng.choice(FILLER_SENTENCES)}。")
+    for i in range(images):
+        doc.add_picture(str(scan_image(work_dir / f"page_{i}.jpg", (1240, 1754), rng)), width=Inches(6))
+    return doc
+
+
+# ==================== 基准 ====================
+
+@benchmark("extract_requirements", "lines", [10_000, 100_000])
+def _bench_extract_requirements(lines: int, work_dir: Path, rng: random.Random):
+    from parser import TenderParser
+
+    parser = TenderParser(work_dir)
+    text = tender_text(lines, rng)
+    return lambda: parser._extract_requirements_from_text(text)
+
+
+@benchmark("calculate_confidence", "requirements", [20])
+def _bench_calculate_confidence(count: int, work_dir: Path, rng: random.Random):
+    from parser import TenderParser
+
+    parser = TenderParser(work_dir)
+    requirements = [rng.choice(REQUIREMENT_SENTENCES) for _ in range(count)]
+    return lambda: parser._calculate_confidence(requirements, "pdf")
+
+
+def _company_database(records: int, work_dir: Path, rng: random.Random):
+    from database import CompanyDatabase
+
+    files = company_records(rng, qualifications=records, cases=records, products=records, equipment_rows=0,
+                            certificates=0)
+    return CompanyDatabase(write_data_dir(work_dir / "data", files))
+
+
+@benchmark("match_qualifications", "records", [100, 10_000, 100_000])
+def _bench_match_qualifications(records: int, work_dir: Path, rng: random.Random):
+    db = _company_database(records, work_dir, rng)
+    requirements = list(REQUIREMENT_SENTENCES)
+    return lambda: db.match_qualifications(requirements)
+
+
+@benchmark("match_cases", "records", [100, 10_000, 100_000])
+def _bench_match_cases(records: int, work_dir: Path, rng: random.Random):
+    db = _company_database(records, work_dir, rng)
+    return lambda: db.match_cases(product_type="开关柜")
+
+
+@benchmark("match_products", "records", [100, 10_000, 100_000])
+def _bench_match_products(records: int, work_dir: Path, rng: random.Random):
+    db = _company_database(records, work_dir, rng)
+    keywords = ["环网柜", "KYN28", "断路器"]
+    return lambda: db.match_products(keywords)
+
+
+@benchmark("equipment_specs_table", "rows", [100, 10_000])
+def _bench_equipment_specs_table(rows: int, work_dir: Path, rng: random.Random):
+    from docx import Document
+    from generator import BidDocumentGenerator
+
+    data_dir = write_data_dir(work_dir / "data", {"equipment_specs.json": {"equipment_specs": equipment_specs(rows, rng)}})
+    generator = BidDocumentGenerator(work_dir / "templates", work_dir / "output")
+    state = {}
+    return (lambda: generator._add_equipment_specs_table(state["doc"], data_dir),
+            lambda: state.update(doc=Document()))
+
+
+@benchmark("cert_convert", "kind", ["scan", "scan_large", "vector"])
+def _bench_cert_convert(kind: str, work_dir: Path, rng: random.Random):
+    from cert_images import CertificateImageConverter, find_rasterizer
+
+    if kind == "vector" and find_rasterizer() is None:
+        return None
+    pdf_path = certificate_pdf(work_dir / f"{kind}.pdf", kind, rng)
+    cache_dir = work_dir / "cert_cache"
+    converter = CertificateImageConverter(dpi=200, cache_dir=cache_dir)
+    # 每次转换前清空渲染缓存，测量缓存缺失时的转换
+    return (lambda: converter.get_page_image(pdf_path, 0),
+            lambda: shutil.rmtree(cache_dir, ignore_errors=True))
+
+
+def _document_factory(paragraphs: int, work_dir: Path, rng: random.Random):
+    return paragraphs_document(paragraphs, images=10, work_dir=work_dir, rng=rng)
+
+
+@benchmark("doc_save", "paragraphs", [1_000, 20_000])
+def _bench_doc_save(paragraphs: int, work_dir: Path, rng: random.Random):
+    doc = _document_factory(paragraphs, work_dir, rng)
+    return lambda: doc.save(BytesIO())
+
+
+@benchmark("save_docx", "paragraphs", [1_000, 20_000])
+def _bench_save_docx(paragraphs: int, work_dir: Path, rng: random.Random):
+    from docx_writer import save_docx
+
+    doc = _document_factory(paragraphs, work_dir, rng)
+    return lambda: save_docx(doc, BytesIO(), deterministic=True)
+
+
+# ==================== 运行与对比 ====================
+
+def _git_commit() -> Optional[str]:
+    try:
+        result = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR,
+                                capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return result.stdout.strip() or None
+
+
+def run_benchmarks(names: Optional[List[str]] = None, quick: bool = False, seed: Optional[int] = None,
+                   budget: Optional[float] = None) -> Dict:
+    """
+    运行基准
+
+    Args:
+        names: 名称前缀，默认全部
+        quick: 每项只测最小规模
+        seed: 随机种子，默认见 BENCHMARK_CONFIG
+        budget: 每项的时间预算（秒），默认见 BENCHMARK_CONFIG
+
+    Returns:
+        {'created_at', 'commit', 'python', 'platform', 'seed',
+         'results': [{'name', 'param', 'size', 'number', 'runs', 'min', 'median', 'mean', 'stdev'}
+                     或 {'name', 'param', 'size', 'skipped': 原因}, ...]}
+    """
+    seed = seed if seed is not None else BENCHMARK_CONFIG["seed"]
+    selected = [name for name in BENCHMARKS if not names or any(name.startswith(prefix) for prefix in names)]
+
+    results = []
+    for name in selected:
+        spec = BENCHMARKS[name]
+        for size in spec["sizes"][:1] if quick else spec["sizes"]:
+            result = {"name": name, "param": spec["param"], "size": size}
+            with tempfile.TemporaryDirectory() as temp_dir:
+                # 每项单独的随机数生成器，只运行部分基准时数据也相同
+                prepared = spec["factory"](size, Path(temp_dir), random.Random(f"{seed}:{name}:{size}"))
+                if prepared is None:
+                    result["skipped"] = "环境不支持"
+                else:
+                    func, setup = prepared if isinstance(prepared, tuple) else (prepared, None)
+                    result.update(measure(func, setup, budget=budget))
+            results.append(result)
+            _print_result(result)
+
+    return {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "seed": seed,
+        "results": results,
+    }
+
+
+def format_seconds(seconds: float) -> str:
+    if seconds >= 1:
+        return f"{seconds:.2f}s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.1f}ms"
+    return f"{seconds * 1e6:.1f}µs"
+
+
+def _print_result(result: Dict):
+    label = f"{result['name']}[{result['param']}={result['size']}]"
+    if "skipped" in result:
+        print(f"⚠️ {label:<44} 跳过（{result['skipped']}）")
+        return
+    print(f"✓ {label:<44} 中位数 {format_seconds(result['median']):>9}  "
+          f"最小 {format_seconds(result['min']):>9}  （{len(result['runs'])} 次 × {result['number']}）")
+
+
+def compare_results(base: Dict, current: Dict, threshold: Optional[float] = None) -> List[Dict]:
+    """
+    按名称和规模对比两次结果的中位数
+
+    Returns:
+        [{'name', 'size', 'base', 'current', 'ratio', 'regressed'}, ...]（两次都测过的项）
+    """
+    threshold = threshold or BENCHMARK_CONFIG["regression_ratio"]
+    base_results = {(r["name"], str(r["size"])): r for r in base["results"] if "median" in r}
+    rows = []
+    for result in current["results"]:
+        previous = base_results.get((result["name"], str(result["size"])))
+        if previous is None or "median" not in result:
+            continue
+        ratio = result["median"] / previous["median"] if previous["median"] else float("inf")
+        rows.append({
+            "name": result["name"],
+            "size": result["size"],
+            "base": previous["median"],
+            "current": result["median"],
+            "ratio": ratio,
+            "regressed": ratio > threshold,
+        })
+    return rows
+
+
+def save_results(results: Dict, path: Optional[Path] = None) -> Path:
+    """写出 JSON 结果，默认写入 cache/benchmarks/"""
+    if path is None:
+        path = BENCHMARK_DIR / f"{datetime.now():%Y%m%d_%H%M%S}_{results['commit'] or 'local'}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for option in ("--output", "--compare", "--seed"):
+        if option in args:
+            index = args.index(option)
+            options[option] = args[index + 1]
+            del args[index:index + 2]
+    quick = "--quick" in args
+    names = [arg for arg in args if arg != "--quick"]
+    unknown = [prefix for prefix in names if not any(name.startswith(prefix) for name in BENCHMARKS)]
+    if unknown:
+        print(f"✗ 未知的基准: {', '.join(unknown)}，可选: {', '.join(BENCHMARKS)}")
+        sys.exit(2)
+
+    seed = int(options["--seed"]) if "--seed" in options else None
+    results = run_benchmarks(names, quick=quick, seed=seed)
+    path = save_results(results, Path(options["--output"]) if "--output" in options else None)
+    print(f"\n✓ 结果已保存: {path}")
+
+    if "--compare" in options:
+        base = json.loads(Path(options["--compare"]).read_text(encoding="utf-8"))
+        rows = compare_results(base, results)
+        print(f"\n与 {options['--compare']}（{base.get('commit') or '未知版本'}）对比：")
+        for row in rows:
+            status = "⚠️" if row["regressed"] else "✓"
+            print(f"{status} {row['name']}[{row['size']}]: {format_seconds(row['base'])} → "
+                  f"{format_seconds(row['current'])}（×{row['ratio']:.2f}）")
+        if any(row["regressed"] for row in rows):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
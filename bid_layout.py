@@ -0,0 +1,300 @@
+"""
+投标文件布局与章节组装
+
+每种投标文件（单一文件/技术标/商务标）由一个有序的章节定义列表描述，
+章节编号和目录都由布局推导，不再分别维护编号表。
+
+生成时每个章节独立构建到自己的片段文档（Document）中，可以并发构建，
+最后按布局顺序组装成完整文档（复制正文元素并重新关联图片），
+或逐个交给流式写出（见 docx_stream.py），不在内存中保留整份文档。
+提供章节输入时，片段按输入哈希缓存（见 section_cache.py），输入不变的章节不再重新构建。
+"""
+
+import copy
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import Callable, Dict, Iterator, List, Optional
+
+from docx import Document
+from docx.oxml.ns import qn
+
+from config import BID_BUILD_CONFIG
+from metrics_exporter import SECTION_CACHE
+from section_cache import SectionCache, hash_inputs
+from tracing import bind_context, span
+
+# 模板版本（修改章节格式、样式或构建代码后递增，使章节缓存失效）
+TEMPLATE_VERSION = "2"
+
+# 公司通用内容章节标题带中文序号（如 "九、近三年无重大违法记录声明"）
+_CHINESE_PREFIX = re.compile(r'^[一二三四五六七八九十]+、')
+
+
+class SectionSpec:
+    """章节定义"""
+
+    def __init__(self, key: str, title: str, toc_title: Optional[str] = None):
+        """
+        Args:
+            key: 章节标识，对应生成器中的章节构建函数
+            title: 章节标题（与构建函数写入的标题一致）
+            toc_title: 目录中显示的标题，为空时使用去掉中文序号的标题
+        """
+        self.key = key
+        self.title = title
+        self.toc_title = toc_title or _CHINESE_PREFIX.sub('', title)
+
+    def __repr__(self):
+        return f"SectionSpec({self.key!r}, {self.title!r})"
+
+
+class BidLayout:
+    """投标文件布局"""
+
+    def __init__(self, bid_type: str, cover_title: str, filename_prefix: str,
+                 sections: List[SectionSpec], number_format: str, page_numbers: bool = False):
+        """
+        Args:
+            bid_type: 投标类型（单一文件、技术标、商务标）
+            cover_title: 封面上的文件名称
+            filename_prefix: 输出文件名前缀
+            sections: 按顺序排列的章节
+            number_format: 章节编号格式，{n} 为章节序号
+            page_numbers: 是否添加页码
+        """
+        self.bid_type = bid_type
+        self.cover_title = cover_title
+        self.filename_prefix = filename_prefix
+        self.sections = sections
+        self.number_format = number_format
+        self.page_numbers = page_numbers
+
+    def number_of(self, key: str) -> Optional[str]:
+        """章节编号，布局中没有该章节时返回 None"""
+        for n, spec in enumerate(self.sections, 1):
+            if spec.key == key:
+                return self.number_format.format(n=n)
+        return None
+
+    def find(self, title: str) -> Optional[SectionSpec]:
+        """按章节标题查找章节定义（精确匹配）"""
+        for spec in self.sections:
+            if spec.title == title:
+                return spec
+        return None
+
+    def toc_entries(self) -> List[tuple]:
+        """目录条目 [(编号, 标题, 页码), ...]"""
+        return [
+            (self.number_format.format(n=n), spec.toc_title, str(n))
+            for n, spec in enumerate(self.sections, 1)
+        ]
+
+
+# 章节定义
+COVER = SectionSpec("cover", "封面")
+TOC = SectionSpec("toc", "目录")
+COMPANY_PROOF = SectionSpec("company_proof", "公司概况")
+BID_OUTLINE = SectionSpec("bid_outline", "投标纲领")
+TECH_DEVIATION = SectionSpec("tech_deviation", "技术偏离表")
+COMMERCIAL_DEVIATION = SectionSpec("commercial_deviation", "商务偏离表")
+COMPANY_INTRO = SectionSpec("company_intro", "公司简介")
+TECH_SOLUTION = SectionSpec("tech_solution", "技术方案")
+LEGAL_AUTHORIZATION = SectionSpec("legal_authorization", "二、法定代表人授权书")
+BID_GUARANTEE = SectionSpec("bid_guarantee", "三、投标保证金缴纳证明")
+WARRANTY_COMMITMENT = SectionSpec("warranty_commitment", "六、质保期满后三年内的备品备件供货承诺")
+COMPLIANCE_STATEMENT = SectionSpec("compliance_statement", "九、近三年无重大违法记录声明")
+QUALITY_CONTROL = SectionSpec("quality_control", "十二、质量控制专项方案")
+SAFETY_GUARANTEE = SectionSpec("safety_guarantee", "十三、安全保证")
+DELIVERY_PLAN = SectionSpec("delivery_plan", "十四、供货组织及进度计划")
+TRAINING_SERVICE = SectionSpec("training_service", "十五、技术培训、售后服务的内容、计划及措施", "技术培训、售后服务")
+EQUIPMENT_SPECS = SectionSpec("equipment_specs", "设备说明一览表")
+QUOTATION = SectionSpec("quotation", "报价说明")
+QUALIFICATIONS = SectionSpec("qualifications", "资质证书")
+PERFORMANCE = SectionSpec("performance", "项目案例")
+AFTER_SALES = SectionSpec("after_sales", "售后服务")
+TECH_COMMITMENT = SectionSpec("tech_commitment", "技术承诺")
+RESPONSE_COMMITMENT = SectionSpec("response_commitment", "响应承诺")
+COMMERCIAL_COMMITMENT = SectionSpec("commercial_commitment", "商务承诺")
+
+BID_LAYOUTS = {
+    "单一文件": BidLayout(
+        "单一文件", "投标文件", "投标文件",
+        [
+            COVER, TOC, COMPANY_PROOF, BID_OUTLINE, TECH_DEVIATION, COMPANY_INTRO, TECH_SOLUTION,
+            LEGAL_AUTHORIZATION, BID_GUARANTEE, WARRANTY_COMMITMENT,
+            EQUIPMENT_SPECS,
+            QUALITY_CONTROL, SAFETY_GUARANTEE, DELIVERY_PLAN, TRAINING_SERVICE,
+            QUOTATION, QUALIFICATIONS, PERFORMANCE, AFTER_SALES,
+        ],
+        number_format="{n}.",
+        page_numbers=True,
+    ),
+    "技术标": BidLayout(
+        "技术标", "技术投标文件", "技术标",
+        [
+            COVER, TOC, COMPANY_PROOF, BID_OUTLINE, TECH_DEVIATION, COMPANY_INTRO, TECH_SOLUTION,
+            COMPLIANCE_STATEMENT, QUALITY_CONTROL, SAFETY_GUARANTEE,
+            EQUIPMENT_SPECS,
+            DELIVERY_PLAN, TRAINING_SERVICE,
+            QUALIFICATIONS, PERFORMANCE, TECH_COMMITMENT, RESPONSE_COMMITMENT,
+        ],
+        number_format="1.{n}",
+    ),
+    "商务标": BidLayout(
+        "商务标", "商务投标文件", "商务标",
+        [
+            COVER, TOC, COMPANY_PROOF, BID_OUTLINE, COMMERCIAL_DEVIATION, COMPANY_INTRO,
+            RESPONSE_COMMITMENT, QUOTATION, QUALIFICATIONS, PERFORMANCE, AFTER_SALES,
+            COMMERCIAL_COMMITMENT,
+        ],
+        number_format="1.{n}",
+    ),
+}
+
+
+def get_layout(bid_type: str) -> BidLayout:
+    """获取投标类型对应的布局"""
+    if bid_type not in BID_LAYOUTS:
+        raise ValueError(f"未知的投标类型: {bid_type}，可选: {', '.join(BID_LAYOUTS)}")
+    return BID_LAYOUTS[bid_type]
+
+
+def numbered_title(title: str, bid_type: str = '单一文件') -> str:
+    """
+    获取带编号的章节标题（编号由布局中的章节位置决定）
+
+    中文序号开头的公司通用内容标题会替换为阿拉伯数字编号，
+    例如技术标中 "九、近三年无重大违法记录声明" -> "1.8 近三年无重大违法记录声明"。
+    布局中没有的标题原样返回。
+    """
+    layout = BID_LAYOUTS.get(bid_type)
+    spec = layout.find(title) if layout else None
+    if spec is None:
+        return title
+    return f"{layout.number_of(spec.key)} {_CHINESE_PREFIX.sub('', title)}"
+
+
+def section_cache_key(layout: BidLayout, spec: SectionSpec, inputs) -> str:
+    """
+    章节缓存键
+
+    除章节输入外还包含模板版本和整个布局的章节顺序（章节编号由位置决定）。
+    """
+    return hash_inputs(TEMPLATE_VERSION, layout.bid_type, [s.key for s in layout.sections], spec.key, inputs)
+
+
+def iter_fragments(layout: BidLayout, builders: Dict[str, Callable],
+                   max_workers: Optional[int] = None,
+                   inputs: Optional[Dict] = None,
+                   cache: Optional[SectionCache] = None,
+                   prefetch: Optional[int] = None) -> Iterator[Document]:
+    """
+    并发构建各章节片段，按布局顺序逐个产出
+
+    Args:
+        layout: 投标文件布局
+        builders: {章节标识: 构建函数(doc)}，构建函数向传入的空文档写入章节内容；
+                  没有构建函数的章节（如未安装的可选模块）为空片段
+        max_workers: 并发数，默认见 BID_BUILD_CONFIG
+        inputs: {章节标识: 章节输入}，章节内容只由这些输入决定；没有输入的章节每次都重新构建
+        cache: 章节片段缓存，为空时不缓存
+        prefetch: 最多提前构建的章节数（含正在构建的），默认等于并发数；
+                  产出后的片段不再被持有，内存中同时存在的片段不超过这个数量
+
+    Yields:
+        按布局顺序排列的片段文档
+    """
+    inputs = inputs or {}
+    rebuilt = []
+
+    def build(spec: SectionSpec) -> Document:
+        with span(spec.toc_title, section=spec.key) as s:
+            key = None
+            if cache is not None and spec.key in inputs:
+                key = section_cache_key(layout, spec, inputs[spec.key])
+                fragment = cache.get(key)
+                SECTION_CACHE.inc(result="hit" if fragment is not None else "miss")
+                if fragment is not None:
+                    s.set(cached=True)
+                    return fragment
+
+            fragment = Document()
+            builder = builders.get(spec.key)
+            if builder is not None:
+                builder(fragment)
+            rebuilt.append(spec.toc_title)
+
+            if key is not None:
+                cache.put(key, fragment)
+            return fragment
+
+    max_workers = max_workers or BID_BUILD_CONFIG["max_workers"]
+    prefetch = max(1, prefetch or max_workers)
+    specs = iter(layout.sections)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque(executor.submit(bind_context(build), spec) for _, spec in zip(range(prefetch), specs))
+        while pending:
+            # 按布局顺序取结果；任一章节失败时异常在这里抛出
+            fragment = pending.popleft().result()
+            spec = next(specs, None)
+            if spec is not None:
+                pending.append(executor.submit(bind_context(build), spec))
+            yield fragment
+
+    if cache is not None:
+        cached = len(layout.sections) - len(rebuilt)
+        print(f"章节缓存: 命中 {cached}/{len(layout.sections)}，重新构建: {', '.join(rebuilt) or '无'}")
+        cache.prune()
+
+
+def build_fragments(layout: BidLayout, builders: Dict[str, Callable],
+                    max_workers: Optional[int] = None,
+                    inputs: Optional[Dict] = None,
+                    cache: Optional[SectionCache] = None) -> List[Document]:
+    """
+    并发构建各章节片段（参数见 iter_fragments，全部章节同时提交）
+
+    Returns:
+        按布局顺序排列的片段文档列表
+    """
+    return list(iter_fragments(layout, builders, max_workers, inputs, cache,
+                               prefetch=len(layout.sections)))
+
+
+def _copy_images(element, source_part, target_part):
+    """把片段中引用的图片添加到目标文档，并更新元素中的关系 ID"""
+    for blip in element.iter(qn('a:blip')):
+        rid = blip.get(qn('r:embed'))
+        if not rid:
+            continue
+        image_part = source_part.related_parts[rid]
+        new_rid, _ = target_part.get_or_add_image(BytesIO(image_part.blob))
+        blip.set(qn('r:embed'), new_rid)
+
+
+def assemble_fragments(fragments: List[Document]) -> Document:
+    """
+    按顺序组装章节片段
+
+    片段都由同一个默认模板创建，样式和编号定义一致，只需复制正文元素；
+    图片按内容去重后重新添加到目标文档，图片对象 ID 在组装完成后重新编号。
+    """
+    doc = Document()
+    body = doc.element.body
+    sect_pr = body.find(qn('w:sectPr'))
+
+    for fragment in fragments:
+        for child in fragment.element.body.iterchildren():
+            if child.tag == qn('w:sectPr'):
+                continue
+            element = copy.deepcopy(child)
+            _copy_images(element, fragment.part, doc.part)
+            sect_pr.addprevious(element)
+
+    for n, doc_pr in enumerate(body.iter(qn('wp:docPr')), 1):
+        doc_pr.set('id', str(n))
+
+    return doc
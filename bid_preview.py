@@ -0,0 +1,245 @@
+"""
+投标文件预览
+
+直接用生成投标文件时的同一份数据（布局、匹配结果、资质分类）渲染 HTML 预览，
+不构建也不保存 docx，界面内即时显示：
+- 各投标文件的章节目录（由布局推导，与正式文件一致）
+- 按正式文件的分类列出资质证书，附缩略图
+- 案例、产品和需求数量
+
+证书缩略图按证书文件签名缓存在 cache/thumbnails/。缓存中没有的缩略图先显示占位，
+在后台线程中生成（同时预热证书渲染缓存），下次刷新预览时显示。
+"""
+
+import base64
+import html
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bid_layout import BidLayout
+from cert_images import CertificateImageConverter
+from config import THUMBNAIL_CACHE_DIR, PREVIEW_CONFIG
+from section_cache import file_signature, hash_inputs
+
+# 后台生成缩略图（所有缩略图缓存共用）
+_executor = None
+_pending = set()
+_pending_lock = threading.Lock()
+
+
+def pending_thumbnails() -> int:
+    """正在后台生成的缩略图数量"""
+    with _pending_lock:
+        return len(_pending)
+
+
+class ThumbnailCache:
+    """证书缩略图缓存"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, width: Optional[int] = None):
+        self.cache_dir = cache_dir or THUMBNAIL_CACHE_DIR
+        self.width = width or PREVIEW_CONFIG["thumbnail_width"]
+
+    def _path(self, pdf_path: Path) -> Optional[Path]:
+        signature = file_signature(pdf_path)
+        if signature is None:
+            return None
+        return self.cache_dir / f"{hash_inputs(signature, self.width)}.jpg"
+
+    def get(self, pdf_path: Path) -> Optional[Path]:
+        """缓存中的缩略图，没有时返回 None"""
+        path = self._path(pdf_path)
+        if path is not None and path.exists():
+            return path
+        return None
+
+    def render(self, pdf_path: Path) -> Optional[Path]:
+        """
+        生成缩略图（使用证书渲染缓存中的首页图片，默认压缩方案，与正式生成共用缓存）
+
+        Returns:
+            缩略图路径，证书无法转换时返回 None
+        """
+        path = self._path(pdf_path)
+        if path is None:
+            return None
+        if path.exists():
+            return path
+
+        image_path, _ = CertificateImageConverter().get_page_image(pdf_path, 0)
+        if image_path is None:
+            return None
+
+        from PIL import Image as PILImage
+
+        with PILImage.open(image_path) as img:
+            img = img.convert("RGB")
+            img.thumbnail((self.width, self.width * 2))
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.stem}.{uuid.uuid4().hex[:8]}.tmp.jpg")
+            img.save(tmp_path, "JPEG", quality=70)
+            os.replace(tmp_path, path)
+        return path
+
+    def prefetch(self, pdf_paths: List[Path]):
+        """在后台生成缺失的缩略图"""
+        global _executor
+        missing = [p for p in pdf_paths if p.exists() and self.get(p) is None]
+        if not missing:
+            return
+
+        with _pending_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(max_workers=PREVIEW_CONFIG["thumbnail_workers"],
+                                               thread_name_prefix="thumbnail")
+            for pdf_path in missing:
+                if pdf_path in _pending:
+                    continue
+                _pending.add(pdf_path)
+                _executor.submit(self._render_pending, pdf_path)
+
+    def _render_pending(self, pdf_path: Path):
+        try:
+            self.render(pdf_path)
+        except Exception as e:
+            print(f"⚠️ 缩略图生成失败: {pdf_path.name} - {e}")
+        finally:
+            with _pending_lock:
+                _pending.discard(pdf_path)
+
+    def data_uri(self, pdf_path: Path) -> Optional[str]:
+        """缩略图的 data URI（可直接放入 HTML），没有缓存时返回 None"""
+        path = self.get(pdf_path)
+        if path is None:
+            return None
+        return "data:image/jpeg;base64," + base64.b64encode(path.read_bytes()).decode("ascii")
+
+
+_STYLE = """
+<style>
+.bid-preview { font-size: 14px; }
+.bid-preview .summary { color: #555; margin-bottom: 12px; }
+.bid-preview .outlines { display: flex; gap: 24px; flex-wrap: wrap; }
+.bid-preview .outline { min-width: 220px; }
+.bid-preview .outline td { padding: 1px 8px 1px 0; }
+.bid-preview .certs { display: flex; gap: 12px; flex-wrap: wrap; }
+.bid-preview .cert { width: 170px; }
+.bid-preview .cert .thumb { width: 160px; height: 220px; background: #f2f2f2; color: #999;
+    display: flex; align-items: center; justify-content: center; }
+.bid-preview .cert .thumb img { max-width: 160px; max-height: 220px; }
+.bid-preview .cert .caption { font-size: 12px; }
+.bid-preview table.list { border-collapse: collapse; }
+.bid-preview table.list td, .bid-preview table.list th { border: 1px solid #ddd; padding: 2px 6px; }
+</style>
+"""
+
+
+def _e(value) -> str:
+    return html.escape(str(value if value is not None else ""))
+
+
+def _render_outline(layout: BidLayout) -> str:
+    rows = "".join(f"<tr><td>{_e(number)}</td><td>{_e(title)}</td></tr>"
+                   for number, title, _ in layout.toc_entries())
+    return f'<div class="outline"><h4>{_e(layout.cover_title)}</h4><table>{rows}</table></div>'
+
+
+def _render_cert(cert: Dict, data_dir: Path, thumbnails: ThumbnailCache) -> str:
+    thumb = "无证书文件"
+    if cert.get("cert_file"):
+        uri = thumbnails.data_uri(data_dir / cert["cert_file"])
+        thumb = f'<img src="{uri}"/>' if uri else "缩略图生成中"
+
+    caption = [f"<b>{_e(cert.get('name'))}</b>"]
+    if cert.get("level"):
+        caption.append(_e(cert["level"]))
+    if cert.get("cert_no"):
+        caption.append(f"证书编号：{_e(cert['cert_no'])}")
+    if cert.get("valid_until"):
+        caption.append(f"有效期至：{_e(cert['valid_until'])}")
+    return (f'<div class="cert"><div class="thumb">{thumb}</div>'
+            f'<div class="caption">{"<br/>".join(caption)}</div></div>')
+
+
+def _render_list(title: str, items: List[Dict], columns: List[tuple]) -> str:
+    """列表小节，columns 为 [(表头, 取值函数), ...]"""
+    max_items = PREVIEW_CONFIG["max_items"]
+    parts = [f"<h4>{_e(title)}（{len(items)} 项）</h4>"]
+    if items:
+        header = "".join(f"<th>{_e(name)}</th>" for name, _ in columns)
+        rows = "".join(
+            "<tr>" + "".join(f"<td>{_e(get(item))}</td>" for _, get in columns) + "</tr>"
+            for item in items[:max_items]
+        )
+        parts.append(f'<table class="list"><tr>{header}</tr>{rows}</table>')
+        if len(items) > max_items:
+            parts.append(f"<p>……还有 {len(items) - max_items} 项</p>")
+    return "".join(parts)
+
+
+def render_preview_html(layouts: List[BidLayout], tender_info: Dict, company_info: Dict,
+                        matched_data: Dict, qualification_groups: List[tuple], data_dir: Path,
+                        thumbnails: Optional[ThumbnailCache] = None) -> str:
+    """
+    渲染投标文件预览
+
+    Args:
+        layouts: 要生成的投标文件布局（分开生成时为技术标和商务标）
+        tender_info: 招标信息
+        company_info: 公司信息
+        matched_data: 匹配的数据（资质、案例、产品等）
+        qualification_groups: 资质分类 [(小节标题, 证书列表), ...]，与正式文件一致
+        data_dir: 数据目录（证书文件所在目录）
+        thumbnails: 缩略图缓存，缺失的缩略图在后台生成
+
+    Returns:
+        HTML 字符串
+    """
+    thumbnails = thumbnails or ThumbnailCache()
+    project_name = tender_info.get("project_info", {}).get("project_name", "未知项目")
+    requirements = tender_info.get("requirements", [])
+    qualifications = matched_data.get("qualifications", [])
+    cases = matched_data.get("cases", [])
+    products = matched_data.get("products", [])
+
+    # 先提交缺失的缩略图，再渲染（本次显示占位）
+    thumbnails.prefetch([data_dir / cert["cert_file"]
+                         for _, certs in qualification_groups for cert in certs if cert.get("cert_file")])
+
+    parts = [_STYLE, '<div class="bid-preview">']
+    parts.append(f"<h3>{_e(project_name)}</h3>")
+    parts.append(
+        f'<div class="summary">投标人：{_e(company_info.get("name"))} ｜ 需求 {len(requirements)} 项 ｜ '
+        f"资质 {len(qualifications)} 项 ｜ 案例 {len(cases)} 项 ｜ 产品 {len(products)} 项</div>"
+    )
+
+    parts.append('<div class="outlines">')
+    parts.extend(_render_outline(layout) for layout in layouts)
+    parts.append("</div>")
+
+    parts.append(f"<h4>资质证书（{len(qualifications)} 项）</h4>")
+    for title, certs in qualification_groups:
+        if not certs:
+            continue
+        parts.append(f"<h5>{_e(title)}（{len(certs)} 项）</h5>")
+        parts.append('<div class="certs">')
+        parts.extend(_render_cert(cert, data_dir, thumbnails) for cert in certs)
+        parts.append("</div>")
+
+    parts.append(_render_list("项目案例", cases, [
+        ("项目名称", lambda c: c.get("project_name")),
+        ("客户", lambda c: c.get("client")),
+        ("金额（元）", lambda c: f"{c.get('amount', 0) or 0:,.0f}"),
+    ]))
+    parts.append(_render_list("产品", products, [
+        ("名称", lambda p: p.get("name")),
+        ("型号", lambda p: p.get("model")),
+        ("分类", lambda p: p.get("category")),
+    ]))
+
+    parts.append("</div>")
+    return "".join(parts)
@@ -0,0 +1,813 @@
+"""
+证书图片转换模块
+
+大部分证书 PDF 只是把一张扫描 JPEG 包装成一页 PDF，
+用 Ghostscript 以 200dpi 重新渲染再压缩是纯粹的浪费。
+
+转换策略（按优先级）：
+1. 直通（passthrough）：单图片页面 + DCT(JPEG) 编码 + 尺寸合适，直接写出原始 JPEG 字节，不重新编码
+2. 提取（extracted）：单图片页面，取出内嵌图片，仅在需要缩放或非 JPEG 编码时重新编码
+3. 栅格化（rasterized）：矢量页面或多对象页面，由 pdftoppm/Ghostscript 直接写出目标尺寸的 JPEG
+
+转换结果按（PDF 签名, 页码, 转换参数）缓存在渲染缓存目录，多页证书只转换被选中的页面。
+
+图片编码参数由压缩方案（COMPRESSION_PROFILES）决定：黑白扫描件可转为灰度或 1 位 PNG，
+可选渐进式 JPEG 和色度抽样；设置了目标文档大小时，由 fit_to_budget 逐张降低图片质量。
+"""
+
+import hashlib
+import os
+import shutil
+import subprocess
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from io import BytesIO
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from config import CERT_CACHE_DIR, CERT_IMAGE_CONFIG, COMPRESSION_PROFILES, DEFAULT_COMPRESSION_PROFILE
+from metrics_exporter import CERT_PAGES, CERT_QUEUE_DEPTH, CERT_RENDER_SECONDS, RASTERIZER_PROCESSES
+from tracing import bind_context, span
+
+# pypdf 导入较慢，在读取 PDF 的函数内才导入
+if TYPE_CHECKING:
+    from pypdf import PdfReader
+
+# 单页渲染超时时间（秒）
+RASTERIZE_TIMEOUT = 60
+
+# 转换路径
+PATH_PASSTHROUGH = "passthrough"
+PATH_EXTRACTED = "extracted"
+PATH_RASTERIZED = "rasterized"
+PATH_CACHED = "cached"
+
+PATH_LABELS = {
+    PATH_PASSTHROUGH: "直通原图",
+    PATH_EXTRACTED: "提取内嵌图片",
+    PATH_RASTERIZED: "栅格化渲染",
+    PATH_CACHED: "缓存命中",
+}
+
+# 会在页面上绘制可见内容（文字、路径、着色、内联图片）的操作符
+# 出现任意一个就说明页面不只是一张图片
+_PAINTING_OPERATORS = {
+    b"Tj", b"TJ", b"'", b'"',
+    b"S", b"s", b"f", b"F", b"f*", b"B", b"B*", b"b", b"b*",
+    b"sh", b"BI",
+}
+
+# 可以直接写入 Word 的颜色空间（CMYK 等需要转换的不直通）
+_PASSTHROUGH_COLORSPACES = {"/DeviceRGB", "/DeviceGray"}
+
+# DCT 之前允许出现的无损编码
+_LOSSLESS_FILTERS = {"/ASCII85Decode", "/ASCIIHexDecode", "/FlateDecode"}
+
+# 黑白扫描件检测：通道差超过阈值的像素占比低于 1% 视为灰度图
+_GRAY_CHANNEL_DIFF = 24
+_GRAY_COLOR_RATIO = 0.01
+# 灰度图中间调像素占比低于 8% 视为纯黑白文字件
+_BILEVEL_MIDTONE_RATIO = 0.08
+_BILEVEL_THRESHOLD = 160
+
+# 按目标大小降低质量时的步长和下限
+QUALITY_STEP = 10
+MIN_QUALITY = 35
+
+
+def _only_image_xobject(page):
+    """页面资源中唯一的 XObject（必须是图片），否则返回 None"""
+    resources = page.get("/Resources")
+    if resources is None:
+        return None
+    xobjects = resources.get_object().get("/XObject")
+    if xobjects is None:
+        return None
+    xobjects = xobjects.get_object()
+    if len(xobjects) != 1:
+        return None
+
+    xobj = list(xobjects.values())[0].get_object()
+    if xobj.get("/Subtype") != "/Image":
+        return None
+    return xobj
+
+
+def _draws_single_image(page, reader: "PdfReader") -> bool:
+    """内容流是否只绘制一次图片（没有其他绘制操作，也没有旋转/翻转）"""
+    from pypdf.generic import ContentStream
+
+    contents = page.get_contents()
+    if contents is None:
+        return False
+
+    draw_count = 0
+    for operands, operator in ContentStream(contents, reader).operations:
+        if operator in _PAINTING_OPERATORS:
+            return False
+        if operator == b"Do":
+            draw_count += 1
+        elif operator == b"cm":
+            # 只接受平移和正向缩放，旋转/翻转的图片交给渲染器处理
+            a, b, c, d = (float(v) for v in operands[:4])
+            if b or c or a <= 0 or d <= 0:
+                return False
+    return draw_count == 1
+
+
+def find_single_image(page, reader: "PdfReader"):
+    """
+    检测页面是否只由一张图片构成
+
+    Args:
+        page: pypdf 页面对象
+        reader: 页面所属的 PdfReader
+
+    Returns:
+        图片 XObject；矢量页面或多对象页面返回 None
+    """
+    if int(page.get("/Rotate", 0) or 0) % 360:
+        return None
+
+    xobj = _only_image_xobject(page)
+    if xobj is None or not _draws_single_image(page, reader):
+        return None
+    return xobj
+
+
+def _image_filters(xobj) -> List[str]:
+    """返回图片的编码过滤器链"""
+    from pypdf.generic import ArrayObject
+
+    filters = xobj.get("/Filter")
+    if filters is None:
+        return []
+    if isinstance(filters, ArrayObject):
+        return [str(f) for f in filters]
+    return [str(filters)]
+
+
+def _colorspace_name(xobj) -> Optional[str]:
+    """解析图片颜色空间名称，ICCBased 按通道数折算为 DeviceGray/DeviceRGB"""
+    from pypdf.generic import ArrayObject
+
+    colorspace = xobj.get("/ColorSpace")
+    if colorspace is None:
+        return None
+    colorspace = colorspace.get_object()
+    if isinstance(colorspace, ArrayObject):
+        if colorspace[0] == "/ICCBased":
+            channels = colorspace[1].get_object().get("/N")
+            return {1: "/DeviceGray", 3: "/DeviceRGB"}.get(channels)
+        return None
+    return str(colorspace)
+
+
+def is_passthrough_jpeg(xobj) -> bool:
+    """内嵌图片能否不经重新编码直接作为 JPEG 写出"""
+    # 允许 DCT 外层包一层无损编码（如 ASCII85），解码后仍是原始 JPEG 字节
+    filters = _image_filters(xobj)
+    if not filters or filters[-1] != "/DCTDecode":
+        return False
+    if any(f not in _LOSSLESS_FILTERS for f in filters[:-1]):
+        return False
+    if "/Decode" in xobj or "/SMask" in xobj or "/Mask" in xobj:
+        return False
+    return _colorspace_name(xobj) in _PASSTHROUGH_COLORSPACES
+
+
+_rasterizer = None
+
+
+def find_rasterizer() -> Optional[tuple]:
+    """
+    查找可用的渲染器，优先 pdftoppm（poppler），其次 Ghostscript
+
+    Returns:
+        (渲染器名称, 可执行文件路径)，都未安装时返回 None
+    """
+    global _rasterizer
+    if _rasterizer is None:
+        for name, candidates in (("pdftoppm", ("pdftoppm",)), ("gs", ("gs", "gswin64c", "gswin32c"))):
+            for candidate in candidates:
+                path = shutil.which(candidate)
+                if path:
+                    _rasterizer = (name, path)
+                    return _rasterizer
+    return _rasterizer
+
+
+def render_cache_key(pdf_path: Path, page_index: int, *params) -> str:
+    """
+    渲染缓存键：PDF 路径 + 文件大小 + 修改时间 + 页码 + 渲染参数
+    """
+    stat = pdf_path.stat()
+    raw = "|".join(str(v) for v in (pdf_path.resolve(), stat.st_size, stat.st_mtime_ns, page_index) + params)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+_page_counts = {}
+_page_counts_lock = threading.Lock()
+
+_inflight_locks = {}  # {缓存键: [转换锁, 持有或等待的线程数]}
+_inflight_guard = threading.Lock()
+
+
+@contextmanager
+def _inflight_lock(key: str):
+    """持有某个缓存键的转换锁（同一页面同一时间只转换一次），没有线程使用时删除该锁"""
+    with _inflight_guard:
+        entry = _inflight_locks.setdefault(key, [threading.Lock(), 0])
+        entry[1] += 1
+    try:
+        with entry[0]:
+            yield
+    finally:
+        with _inflight_guard:
+            entry[1] -= 1
+            if entry[1] == 0:
+                del _inflight_locks[key]
+
+
+def get_page_count(pdf_path: Path) -> int:
+    """
+    读取 PDF 页数（只读页面树的 /Count，不解析页面内容），按文件签名缓存
+    """
+    stat = pdf_path.stat()
+    key = (str(pdf_path.resolve()), stat.st_size, stat.st_mtime_ns)
+    with _page_counts_lock:
+        if key in _page_counts:
+            return _page_counts[key]
+
+    from pypdf import PdfReader
+
+    count = len(PdfReader(str(pdf_path)).pages)
+    with _page_counts_lock:
+        _page_counts[key] = count
+    return count
+
+
+def parse_page_selection(selection, page_count: int) -> List[int]:
+    """
+    解析证书页面选择
+
+    Args:
+        selection: 页面选择，支持 1、"1-3"、"1,3,5"、"all"、[1, 2]；为空时使用默认配置
+        page_count: PDF 总页数
+
+    Returns:
+        页面序号列表（从 0 开始，去重并保持顺序，超出范围的页码忽略）
+    """
+    if selection is None or selection == "":
+        selection = CERT_IMAGE_CONFIG["default_pages"]
+
+    if isinstance(selection, int):
+        numbers = [selection]
+    elif isinstance(selection, (list, tuple)):
+        numbers = [int(n) for n in selection]
+    elif str(selection).strip().lower() in ("all", "全部"):
+        numbers = list(range(1, page_count + 1))
+    else:
+        numbers = []
+        for part in str(selection).replace("，", ",").split(","):
+            part = part.strip()
+            if not part:
+                continue
+            if "-" in part:
+                first, last = part.split("-", 1)
+                first = int(first) if first.strip() else 1
+                last = int(last) if last.strip() else page_count
+                numbers.extend(range(first, last + 1))
+            else:
+                numbers.append(int(part))
+
+    indexes = []
+    for n in numbers:
+        if 1 <= n <= page_count and n - 1 not in indexes:
+            indexes.append(n - 1)
+    return indexes[:CERT_IMAGE_CONFIG["max_pages"]]
+
+
+def _fit_width(img, max_width: int):
+    """图片超过最大宽度时等比缩小"""
+    from PIL import Image as PILImage
+
+    img_width, img_height = img.size
+    if img_width > max_width:
+        ratio = max_width / img_width
+        new_height = int(img_height * ratio)
+        img = img.resize((max_width, new_height), PILImage.LANCZOS)
+    return img
+
+
+def get_compression_profile(name: Optional[str] = None) -> Dict:
+    """
+    获取压缩方案配置
+
+    Args:
+        name: 方案名称（print/screen/portal），为空时使用默认方案
+
+    Returns:
+        方案配置字典的副本
+    """
+    name = name or DEFAULT_COMPRESSION_PROFILE
+    if name not in COMPRESSION_PROFILES:
+        raise ValueError(f"未知的压缩方案: {name}，可选: {', '.join(COMPRESSION_PROFILES)}")
+    profile = dict(COMPRESSION_PROFILES[name])
+    profile["name"] = name
+    return profile
+
+
+def _is_grayscale(img) -> bool:
+    """检测图片是否为黑白扫描件（彩色像素极少）"""
+    from PIL import ImageChops
+
+    if img.mode in ("L", "1"):
+        return True
+    small = img.convert("RGB")
+    small.thumbnail((256, 256))
+    r, g, b = small.split()
+    diff = ImageChops.lighter(ImageChops.difference(r, g), ImageChops.difference(g, b))
+    histogram = diff.histogram()
+    colored = sum(histogram[_GRAY_CHANNEL_DIFF:])
+    return colored <= small.width * small.height * _GRAY_COLOR_RATIO
+
+
+def _is_bilevel(img) -> bool:
+    """检测灰度图是否为纯黑白文字件（几乎没有中间调）"""
+    small = img.convert("L")
+    small.thumbnail((256, 256))
+    histogram = small.histogram()
+    midtones = sum(histogram[64:192])
+    return midtones <= small.width * small.height * _BILEVEL_MIDTONE_RATIO
+
+
+def encode_image(img, output_path: Path, profile: Dict, quality: Optional[int] = None) -> str:
+    """
+    按压缩方案编码图片
+
+    Args:
+        img: PIL 图片
+        output_path: 输出路径（扩展名由编码格式决定，不使用其后缀）
+        profile: 压缩方案
+        quality: JPEG 质量，为空时使用方案配置
+
+    Returns:
+        实际输出格式 "jpeg" 或 "png"
+    """
+    mono = profile.get("mono", "none")
+    if img.mode not in ("RGB", "L"):
+        img = img.convert("RGB")
+
+    if mono != "none" and img.mode == "RGB" and _is_grayscale(img):
+        img = img.convert("L")
+
+    if mono == "bilevel" and img.mode == "L" and _is_bilevel(img):
+        img = img.point(lambda v: 255 if v > _BILEVEL_THRESHOLD else 0, "1")
+        img.save(output_path, "PNG", optimize=True)
+        return "png"
+
+    options = {
+        "quality": quality or profile["quality"],
+        "optimize": True,
+        "progressive": bool(profile.get("progressive")),
+    }
+    if img.mode == "RGB":
+        options["subsampling"] = profile.get("subsampling", "4:2:0")
+    img.save(output_path, "JPEG", **options)
+    return "jpeg"
+
+
+def _image_suffix(image_format: str) -> str:
+    return ".png" if image_format == "png" else ".jpg"
+
+
+def format_size(size: int) -> str:
+    """格式化文件大小"""
+    if size >= 1024 * 1024:
+        return f"{size / 1024 / 1024:.1f} MB"
+    return f"{size / 1024:.0f} KB"
+
+
+class CertificateImageConverter:
+    """证书图片转换器"""
+
+    def __init__(self, dpi: int = 200, max_width: Optional[int] = None, quality: Optional[int] = None,
+                 cache_dir: Optional[Path] = None, max_workers: Optional[int] = None,
+                 profile: Optional[str] = None):
+        self.profile = get_compression_profile(profile)
+        if max_width is not None:
+            self.profile["max_width"] = max_width
+        if quality is not None:
+            self.profile["quality"] = quality
+        self.dpi = dpi
+        self.max_width = self.profile["max_width"]
+        self.quality = self.profile["quality"]
+        self.cache_dir = cache_dir or CERT_CACHE_DIR
+        self.max_workers = max_workers or CERT_IMAGE_CONFIG["max_workers"]
+        self.stats = {PATH_PASSTHROUGH: 0, PATH_EXTRACTED: 0, PATH_RASTERIZED: 0, PATH_CACHED: 0, "failed": 0}
+        self._stats_lock = threading.Lock()
+
+    def convert_page(self, pdf_path: Path, output_path: Path, page_index: int = 0) -> Optional[str]:
+        """
+        将证书 PDF 的一页转换为 JPEG 并复制到指定路径
+
+        Args:
+            pdf_path: 证书 PDF 路径
+            output_path: 输出 JPEG 路径
+            page_index: 页面序号（从 0 开始）
+
+        Returns:
+            实际使用的转换路径（passthrough/extracted/rasterized/cached），失败返回 None
+        """
+        image_path, path_used = self.get_page_image(pdf_path, page_index)
+        if image_path is None:
+            return None
+        shutil.copyfile(image_path, output_path)
+        return path_used
+
+    def _encoding_params(self) -> tuple:
+        """参与缓存键的编码参数"""
+        profile = self.profile
+        return (self.dpi, self.max_width, self.quality, profile.get("subsampling"),
+                bool(profile.get("progressive")), profile.get("mono"), bool(profile.get("passthrough")))
+
+    def _find_cached(self, key: str) -> Optional[Path]:
+        for suffix in (".jpg", ".png"):
+            cached = self.cache_dir / f"{key}{suffix}"
+            if cached.exists():
+                return cached
+        return None
+
+    def get_page_image(self, pdf_path: Path, page_index: int = 0) -> tuple:
+        """
+        获取证书 PDF 某一页的图片（按页缓存，只在缓存缺失时转换）
+
+        Returns:
+            (缓存中的图片路径, 转换路径)，失败返回 (None, None)
+        """
+        key = render_cache_key(pdf_path, page_index, *self._encoding_params())
+        cached = self._find_cached(key)
+        if cached is not None:
+            self._count(PATH_CACHED)
+            return cached, PATH_CACHED
+
+        # 同一页面同时只转换一次，其他请求等待后直接命中缓存
+        with _inflight_lock(key):
+            cached = self._find_cached(key)
+            if cached is not None:
+                self._count(PATH_CACHED)
+                return cached, PATH_CACHED
+            return self._convert_to_cache(pdf_path, page_index, key)
+
+    def cache_status(self, qualifications: List[Dict], data_dir: Path) -> Dict:
+        """
+        各证书选中页面在渲染缓存中的情况（只检查缓存，不转换）
+
+        Returns:
+            {'pages': 选中的总页数, 'cached': 已缓存页数, 'cached_bytes': 已缓存图片的总大小}
+        """
+        status = {"pages": 0, "cached": 0, "cached_bytes": 0}
+        params = self._encoding_params()
+        for cert in qualifications:
+            if not cert.get('cert_file'):
+                continue
+            cert_path = data_dir / cert['cert_file']
+            try:
+                page_indexes = parse_page_selection(cert.get('pages'), get_page_count(cert_path))
+            except Exception:
+                # 文件缺失或无法读取，生成时同样跳过
+                continue
+            for page_index in page_indexes:
+                status["pages"] += 1
+                cached = self._find_cached(render_cache_key(cert_path, page_index, *params))
+                if cached is not None:
+                    status["cached"] += 1
+                    status["cached_bytes"] += cached.stat().st_size
+        return status
+
+    def _convert_to_cache(self, pdf_path: Path, page_index: int, key: str) -> tuple:
+        """转换页面并写入渲染缓存"""
+        # 先写入临时文件再原子替换，避免读到半个文件
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.cache_dir / f"{key}.{uuid.uuid4().hex[:8]}.tmp.jpg"
+
+        path_used = None
+        image_format = "jpeg"
+        start = time.perf_counter()
+        try:
+            result = self._extract_embedded(pdf_path, tmp_path, page_index)
+            if result is not None:
+                path_used, image_format = result
+        except Exception as e:
+            print(f"⚠️ 内嵌图片提取失败，改用渲染: {pdf_path.name} - {e}")
+
+        if path_used is None and self._rasterize(pdf_path, tmp_path, page_index):
+            path_used = PATH_RASTERIZED
+
+        self._count(path_used or "failed")
+        CERT_RENDER_SECONDS.observe(time.perf_counter() - start, path=path_used or "failed")
+        if path_used is None:
+            tmp_path.unlink(missing_ok=True)
+            return None, None
+
+        cached = self.cache_dir / f"{key}{_image_suffix(image_format)}"
+        os.replace(tmp_path, cached)
+        return cached, path_used
+
+    def reencode(self, image_path: Path, quality: int) -> Path:
+        """
+        以更低的 JPEG 质量重新编码缓存图片（用于满足目标文档大小）
+
+        总是从原始缓存图片编码，避免多次有损压缩叠加。
+        """
+        from PIL import Image as PILImage
+
+        target = image_path.with_name(f"{image_path.stem}_q{quality}.jpg")
+        if target.exists():
+            return target
+        with _inflight_lock(str(target)):
+            if not target.exists():
+                tmp_path = target.with_name(f"{target.stem}.{uuid.uuid4().hex[:8]}.tmp.jpg")
+                with PILImage.open(image_path) as img:
+                    img.load()
+                    encode_image(img, tmp_path, self.profile, quality=quality)
+                os.replace(tmp_path, target)
+        return target
+
+    def fit_to_budget(self, image_paths: List[Path], budget: int) -> Dict[Path, Path]:
+        """
+        逐张降低图片质量，使图片总大小不超过预算
+
+        每次选择当前最大的一张 JPEG 降低一档质量，小图尽量保持原质量。
+        1 位 PNG（纯黑白件）已经足够小，不参与调整。
+
+        Args:
+            image_paths: 缓存图片路径列表
+            budget: 图片总大小预算（字节）
+
+        Returns:
+            {原图片路径: 调整后的图片路径}
+        """
+        chosen = {}
+        for path in dict.fromkeys(image_paths):
+            chosen[path] = {"path": path, "quality": self.quality, "size": path.stat().st_size}
+
+        total = sum(item["size"] for item in chosen.values())
+        while total > budget:
+            candidates = [
+                (source, item) for source, item in chosen.items()
+                if source.suffix == ".jpg" and item["quality"] - QUALITY_STEP >= MIN_QUALITY
+            ]
+            if not candidates:
+                print(f"⚠️ 图片已降到最低质量，仍超出目标大小 {format_size(total - budget)}")
+                break
+            source, item = max(candidates, key=lambda pair: pair[1]["size"])
+            item["quality"] -= QUALITY_STEP
+            item["path"] = self.reencode(source, item["quality"])
+            new_size = item["path"].stat().st_size
+            total += new_size - item["size"]
+            item["size"] = new_size
+
+        return {source: item["path"] for source, item in chosen.items()}
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+        CERT_PAGES.inc(path=key)
+
+    def _extract_embedded(self, pdf_path: Path, output_path: Path, page_index: int) -> Optional[tuple]:
+        """
+        直接取出单图片页面的内嵌图片
+
+        Returns:
+            (转换路径, 输出格式)，非单图片页面返回 None
+        """
+        from pypdf import PdfReader
+
+        reader = PdfReader(str(pdf_path))
+        page = reader.pages[page_index]
+        xobj = find_single_image(page, reader)
+        if xobj is None:
+            return None
+
+        if is_passthrough_jpeg(xobj):
+            data = xobj.get_data()
+            if self.profile.get("passthrough") and int(xobj.get("/Width", 0)) <= self.max_width:
+                output_path.write_bytes(data)
+                return PATH_PASSTHROUGH, "jpeg"
+
+            # 需要缩放：让 libjpeg 以 1/2、1/4、1/8 的比例直接解码，避免解码完整大图
+            from PIL import Image as PILImage
+            img = PILImage.open(BytesIO(data))
+            img.draft(img.mode, (self.max_width, self.max_width * img.height // img.width))
+        else:
+            images = page.images
+            if len(images) != 1:
+                return None
+            img = images[0].image
+
+        if img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        img = _fit_width(img, self.max_width)
+        return PATH_EXTRACTED, encode_image(img, output_path, self.profile)
+
+    def _rasterize(self, pdf_path: Path, output_path: Path, page_index: int) -> bool:
+        """
+        由 pdftoppm/Ghostscript 直接以目标尺寸写出 JPEG（矢量或多对象页面的回退方案）
+
+        不经过 PPM 管道和 PIL 重新编码。矢量页面不是扫描件，不做黑白转换；
+        Ghostscript 的 jpeg 设备不支持渐进式输出，该选项只对 pdftoppm 生效。
+        """
+        rasterizer = find_rasterizer()
+        if rasterizer is None:
+            print("✗ 未找到 pdftoppm 或 Ghostscript，无法渲染 PDF")
+            print("  Mac 安装命令: brew install poppler ghostscript")
+            print("  Linux 安装命令: sudo apt-get install poppler-utils ghostscript")
+            return False
+
+        try:
+            resolution = self._target_resolution(pdf_path, page_index)
+        except Exception as e:
+            print(f"✗ PDF 读取失败: {pdf_path.name} - {e}")
+            return False
+
+        name, executable = rasterizer
+        page_no = str(page_index + 1)
+
+        if name == "pdftoppm":
+            # -singlefile 会在输出前缀后追加 .jpg
+            command = [
+                executable, "-jpeg",
+                "-jpegopt", f"quality={self.quality},optimize=y,"
+                            f"progressive={'y' if self.profile.get('progressive') else 'n'}",
+                "-r", f"{resolution:.3f}",
+                "-f", page_no, "-l", page_no,
+                "-cropbox", "-singlefile",
+                str(pdf_path), str(output_path.with_suffix("")),
+            ]
+        else:
+            command = [
+                executable, "-dSAFER", "-dBATCH", "-dNOPAUSE", "-dQUIET",
+                "-sDEVICE=jpeg", f"-dJPEGQ={self.quality}",
+                f"-r{resolution:.3f}", "-dUseCropBox",
+                f"-dFirstPage={page_no}", f"-dLastPage={page_no}",
+                f"-sOutputFile={output_path}",
+                str(pdf_path),
+            ]
+
+        try:
+            with RASTERIZER_PROCESSES.track():
+                result = subprocess.run(command, capture_output=True, text=True, timeout=RASTERIZE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            print(f"✗ PDF 渲染超时: {pdf_path.name}")
+            return False
+
+        if result.returncode != 0 or not output_path.exists():
+            print(f"✗ PDF 渲染失败: {pdf_path.name} - {result.stderr.strip()}")
+            return False
+        return True
+
+    def _target_resolution(self, pdf_path: Path, page_index: int) -> float:
+        """根据页面尺寸计算渲染分辨率，使输出宽度不超过 max_width"""
+        from pypdf import PdfReader
+
+        page = PdfReader(str(pdf_path)).pages[page_index]
+        box = page.cropbox
+        width_pt, height_pt = float(box.width), float(box.height)
+        if int(page.get("/Rotate", 0) or 0) % 180:
+            width_pt = height_pt
+        if width_pt <= 0:
+            return float(self.dpi)
+        return min(float(self.dpi), self.max_width * 72.0 / width_pt)
+
+    def convert_certificates(self, qualifications: List[Dict], data_dir: Path,
+                             output_dir: Optional[Path] = None) -> Dict:
+        """
+        批量转换证书 PDF 为图片
+
+        每个证书按 "pages" 字段选择页面（默认见 CERT_IMAGE_CONFIG），
+        先从 PDF 页面树读取页数，只转换选中的页面，多页并发转换。
+
+        Args:
+            qualifications: 资质列表
+            data_dir: 数据目录
+            output_dir: 图片输出目录；为空时直接使用渲染缓存中的图片
+
+        Returns:
+            转换结果字典 {证书ID: {'name', 'level', 'images'[, 'error']}}
+        """
+        converted_images, tasks, total, failed = self._plan_conversions(qualifications, data_dir)
+        self._run_conversions(tasks, converted_images, output_dir)
+        failed += self._drop_failed_pages(converted_images)
+
+        print(f"转换完成: 总计 {total}, 成功 {total - failed}, 失败 {failed}")
+        print(self.format_stats())
+
+        return converted_images
+
+    def _plan_conversions(self, qualifications: List[Dict], data_dir: Path) -> tuple:
+        """
+        读取各证书页数并列出要转换的页面
+
+        Returns:
+            (结果字典, [(证书, 证书路径, 结果序号, 页码), ...], 证书总数, 失败数)
+        """
+        converted_images = {}
+        tasks = []
+        total = 0
+        failed = 0
+
+        for cert in qualifications:
+            if not cert.get('cert_file'):
+                continue
+
+            total += 1
+            cert_path = data_dir / cert['cert_file']
+            if not cert_path.exists():
+                print(f"✗ 证书文件不存在: {cert['cert_file']}")
+                failed += 1
+                continue
+
+            try:
+                page_indexes = parse_page_selection(cert.get('pages'), get_page_count(cert_path))
+            except Exception as e:
+                print(f"✗ 证书读取失败: {cert['name']} - {e}")
+                converted_images[cert['id']] = {
+                    'name': cert['name'],
+                    'level': cert['level'],
+                    'images': [],
+                    'error': str(e)
+                }
+                failed += 1
+                continue
+
+            converted_images[cert['id']] = {
+                'name': cert['name'],
+                'level': cert['level'],
+                'images': [None] * len(page_indexes)
+            }
+            for slot, page_index in enumerate(page_indexes):
+                tasks.append((cert, cert_path, slot, page_index))
+
+        return converted_images, tasks, total, failed
+
+    def _convert_page(self, cert: Dict, cert_path: Path, page_index: int) -> tuple:
+        with span("证书转换", cert=cert['name'], page=page_index + 1) as s:
+            image_path, path_used = self.get_page_image(cert_path, page_index)
+            s.set(path=PATH_LABELS.get(path_used, "失败"), cached=path_used == PATH_CACHED)
+            if image_path is None:
+                # get_page_image 失败时返回 None 而不抛异常，这里记下错误，指标中不计为已渲染
+                s.set(error="转换失败")
+            return image_path, path_used
+
+    def _run_conversions(self, tasks: List[tuple], converted_images: Dict, output_dir: Optional[Path]):
+        """并发转换各页，结果按序号填入 converted_images（指定 output_dir 时复制过去）"""
+        CERT_QUEUE_DEPTH.inc(len(tasks), source="generate")
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = {
+                executor.submit(bind_context(self._convert_page), cert, cert_path, page_index): (cert, slot, page_index)
+                for cert, cert_path, slot, page_index in tasks
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                cert, slot, page_index = futures[future]
+                CERT_QUEUE_DEPTH.dec(source="generate")
+                try:
+                    image_path, path_used = future.result()
+                except Exception as e:
+                    print(f"✗ 证书转换失败: {cert['name']} 第{page_index + 1}页 - {e}")
+                    traceback.print_exc()
+                    image_path, path_used = None, None
+
+                if image_path is not None and output_dir is not None:
+                    target = output_dir / f"{cert['id']}_{page_index + 1}{image_path.suffix}"
+                    shutil.copyfile(image_path, target)
+                    image_path = target
+
+                converted_images[cert['id']]['images'][slot] = image_path
+                if image_path is not None:
+                    print(f"✓ 证书转换成功（{PATH_LABELS[path_used]}）: {cert['name']} 第{page_index + 1}页")
+
+                if done % 5 == 0:
+                    print(f"进度: {done}/{len(tasks)} 页")
+
+    @staticmethod
+    def _drop_failed_pages(converted_images: Dict) -> int:
+        """去掉转换失败的页面，返回全部页面都失败的证书数"""
+        failed = 0
+        for result in converted_images.values():
+            if None in result['images']:
+                result['images'] = [img for img in result['images'] if img is not None]
+                if not result['images']:
+                    result['error'] = '转换失败'
+                    failed += 1
+        return failed
+
+    def format_stats(self) -> str:
+        """格式化各转换路径的页面数量"""
+        parts = [f"{PATH_LABELS[key]} {self.stats[key]}" for key in PATH_LABELS]
+        return "转换路径: " + ", ".join(parts)
@@ -0,0 +1,134 @@
+"""
+证书预渲染
+
+上传招标文件（第一步）后，用户还要校验需求、查看匹配结果，才会点击生成；
+证书转换全部发生在点击生成之后。
+
+这里在第一步完成后就按解析出的需求匹配资质（与第二步相同的匹配方法），
+在后台把这些证书选中的页面转换进渲染缓存。点击生成时大部分证书直接命中缓存；
+仍在转换中的页面由渲染缓存的同页锁保证只转换一次，生成时等待结果即可。
+
+每次提交返回一个批次，界面只显示当前招标文件那一批证书的进度。
+"""
+
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from cert_images import CertificateImageConverter, get_page_count, parse_page_selection
+from config import CERT_IMAGE_CONFIG
+from metrics_exporter import CERT_QUEUE_DEPTH
+from section_cache import file_signature, hash_inputs
+
+
+class PrerenderBatch:
+    """一次提交的证书的预渲染进度（之前已提交的同一证书沿用原来的任务）"""
+
+    def __init__(self, futures: List[Future], submitted: int):
+        self._futures = futures
+        self.submitted = submitted  # 本次新提交的证书数量
+
+    def status(self) -> Dict:
+        """预渲染进度 {'queued': 证书数, 'done': 完成, 'failed': 失败}"""
+        finished = [future for future in self._futures if future.done()]
+        done = sum(1 for future in finished if future.result())
+        return {"queued": len(self._futures), "done": done, "failed": len(finished) - done}
+
+
+class CertificatePrerenderer:
+    """后台预渲染证书页面"""
+
+    def __init__(self, max_workers: Optional[int] = None, cache_dir: Optional[Path] = None,
+                 max_tracked: Optional[int] = None):
+        """
+        Args:
+            max_workers: 后台线程数，默认见 CERT_IMAGE_CONFIG
+            cache_dir: 渲染缓存目录，默认与生成时相同
+            max_tracked: 最多记录的已提交证书数，默认见 CERT_IMAGE_CONFIG
+        """
+        self.max_workers = max_workers or CERT_IMAGE_CONFIG["prerender_workers"]
+        self.cache_dir = cache_dir
+        self.max_tracked = max_tracked or CERT_IMAGE_CONFIG["prerender_tracked"]
+        self._executor = None
+        self._submitted: "OrderedDict[str, Future]" = OrderedDict()  # {证书及页面选择的哈希: 任务}
+        self._lock = threading.Lock()
+
+    def schedule(self, qualifications: List[Dict], data_dir: Path,
+                 compression_profile: Optional[str] = None) -> PrerenderBatch:
+        """
+        提交证书预渲染（已提交过的证书沿用原来的任务，可以在每次页面刷新时调用）
+
+        Args:
+            qualifications: 预计会用到的资质
+            data_dir: 数据目录
+            compression_profile: 压缩方案（与生成时一致才能命中缓存）
+
+        Returns:
+            这批证书的预渲染进度
+        """
+        tasks = {}
+        for cert in qualifications:
+            if not cert.get("cert_file"):
+                continue
+            cert_path = data_dir / cert["cert_file"]
+            signature = file_signature(cert_path)
+            if signature is None:
+                continue
+            tasks[hash_inputs(signature, cert.get("pages"), compression_profile)] = (cert, cert_path)
+
+        futures = []
+        submitted = 0
+        with self._lock:
+            for key, (cert, cert_path) in tasks.items():
+                future = self._submitted.get(key)
+                if future is None:
+                    if self._executor is None:
+                        self._executor = ThreadPoolExecutor(max_workers=self.max_workers,
+                                                            thread_name_prefix="cert-prerender")
+                    CERT_QUEUE_DEPTH.inc(source="prerender")
+                    future = self._executor.submit(self._render, cert, cert_path, compression_profile)
+                    self._submitted[key] = future
+                    submitted += 1
+                futures.append(future)
+            self._forget_finished()
+
+        if submitted:
+            print(f"🔄 后台预渲染证书: {submitted} 个")
+        return PrerenderBatch(futures, submitted)
+
+    def _forget_finished(self):
+        """已提交的证书超过上限时丢弃最早完成的记录（再次提交时直接命中渲染缓存）；调用方持有锁"""
+        excess = len(self._submitted) - self.max_tracked
+        if excess <= 0:
+            return
+        for key in [key for key, future in self._submitted.items() if future.done()][:excess]:
+            del self._submitted[key]
+
+    def _render(self, cert: Dict, cert_path: Path, compression_profile: Optional[str]) -> bool:
+        """转换证书选中的页面到渲染缓存，返回是否全部成功"""
+        ok = False
+        try:
+            converter = CertificateImageConverter(dpi=200, cache_dir=self.cache_dir, profile=compression_profile)
+            page_indexes = parse_page_selection(cert.get("pages"), get_page_count(cert_path))
+            results = [converter.get_page_image(cert_path, page_index)[0] for page_index in page_indexes]
+            ok = all(path is not None for path in results)
+        except Exception as e:
+            print(f"⚠️ 证书预渲染失败: {cert.get('name')} - {e}")
+        finally:
+            CERT_QUEUE_DEPTH.dec(source="prerender")
+        return ok
+
+
+_prerenderer = None
+_prerenderer_lock = threading.Lock()
+
+
+def get_prerenderer() -> CertificatePrerenderer:
+    """进程内共用的预渲染器"""
+    global _prerenderer
+    with _prerenderer_lock:
+        if _prerenderer is None:
+            _prerenderer = CertificatePrerenderer()
+        return _prerenderer
@@ -12,6 +12,9 @@ from docx import Document
 from docx.shared import Pt
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
+# 公司通用内容版本（修改章节格式或固定文字后递增，使章节缓存失效）
+COMPANY_CONTENT_VERSION = "1"
+
 
 def read_temp_file(filename: str) -> str:
     """从临时文件读取内容"""
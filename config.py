@@ -13,9 +13,34 @@ DATA_DIR = BASE_DIR / "data"
 TEMPLATES_DIR = BASE_DIR / "templates"
 UPLOADS_DIR = BASE_DIR / "uploads"
 OUTPUT_DIR = BASE_DIR / "output"
+CACHE_DIR = BASE_DIR / "cache"
+
+# 证书渲染缓存目录（栅格化结果按 PDF 内容签名缓存）
+CERT_CACHE_DIR = CACHE_DIR / "cert_images"
+# 章节片段缓存目录（按章节输入的哈希缓存）
+SECTION_CACHE_DIR = CACHE_DIR / "sections"
+# 已生成投标文件索引（按全部输入的哈希）
+OUTPUT_STORE_DIR = CACHE_DIR / "outputs"
+# 预览用证书缩略图缓存
+THUMBNAIL_CACHE_DIR = CACHE_DIR / "thumbnails"
+# 耗时追踪记录（JSON Lines，每次解析/匹配/生成一个文件）
+TRACE_DIR = CACHE_DIR / "traces"
+# 生成指标历史（SQLite，不随缓存清理，首次写入时创建）
+METRICS_DB_PATH = BASE_DIR / "metrics" / "generations.sqlite3"
+# 性能分析结果（cProfile .prof 文件）
+PROFILE_DIR = CACHE_DIR / "profiles"
+# 微基准测试结果（JSON，运行时创建）
+BENCHMARK_DIR = CACHE_DIR / "benchmarks"
+# 性能回归测试的招标文件包和公司资料（按随机种子生成，运行时创建）
+GOLDEN_DIR = CACHE_DIR / "golden"
+# 性能回归测试基准（随代码提交）
+GOLDEN_BASELINE_PATH = BASE_DIR / "golden_baseline.json"
+# 并发压力测试结果（JSON，运行时创建）
+LOAD_TEST_DIR = CACHE_DIR / "load_tests"
 
 # 创建目录
-for dir_path in [DATA_DIR, TEMPLATES_DIR, UPLOADS_DIR, OUTPUT_DIR]:
+for dir_path in [DATA_DIR, TEMPLATES_DIR, UPLOADS_DIR, OUTPUT_DIR, CERT_CACHE_DIR, SECTION_CACHE_DIR, OUTPUT_STORE_DIR,
+                 THUMBNAIL_CACHE_DIR, TRACE_DIR, PROFILE_DIR]:
     dir_path.mkdir(parents=True, exist_ok=True)
 
 # 公司基本信息
@@ -117,3 +142,160 @@ QUOTE_CONFIG = {
     "warranty_period": "一年",  # 质保期
     "quote_validity_days": 30,  # 报价有效期30天
 }
+
+# 证书图片配置
+CERT_IMAGE_CONFIG = {
+    "default_pages": "1",  # 默认只插入第1页；单个资质可用 "pages" 字段覆盖，如 "1-3"、"1,3"、"all"
+    "max_pages": 20,  # 单个证书最多插入的页数
+    "max_workers": 4,  # 并发渲染线程数
+    "prerender": True,  # 上传招标文件后在后台预渲染可能用到的证书
+    "prerender_workers": 2,  # 后台预渲染线程数（低于生成时的并发数，不影响界面响应）
+    "prerender_tracked": 1000,  # 最多记录的已提交证书数（超过时丢弃最早完成的记录，再次提交时直接命中渲染缓存）
+}
+
+# 证书图片压缩方案
+# - max_width: 图片最大宽度（像素）
+# - quality: JPEG 质量
+# - subsampling: 色度抽样（4:4:4 最清晰，4:2:0 最小）
+# - progressive: 是否输出渐进式 JPEG
+# - mono: 黑白扫描件处理（none 不处理，grayscale 转灰度，bilevel 纯黑白件转 1 位 PNG）
+# - passthrough: 是否允许扫描件原始 JPEG 直通
+# - target_size_mb: 整个文档的目标大小（MB），超出时逐张降低图片质量
+COMPRESSION_PROFILES = {
+    "print": {
+        "label": "打印",
+        "max_width": 1200,
+        "quality": 92,
+        "subsampling": "4:4:4",
+        "progressive": False,
+        "mono": "grayscale",
+        "passthrough": True,
+        "target_size_mb": None,
+    },
+    "screen": {
+        "label": "屏幕阅读",
+        "max_width": 500,
+        "quality": 85,
+        "subsampling": "4:2:0",
+        "progressive": False,
+        "mono": "none",
+        "passthrough": True,
+        "target_size_mb": None,
+    },
+    "portal": {
+        "label": "招标平台上传",
+        "max_width": 800,
+        "quality": 75,
+        "subsampling": "4:2:0",
+        "progressive": True,
+        "mono": "bilevel",
+        "passthrough": False,
+        "target_size_mb": 10,
+    },
+}
+
+DEFAULT_COMPRESSION_PROFILE = "screen"
+
+# 投标文件章节构建配置
+BID_BUILD_CONFIG = {
+    "max_workers": 4,  # 并发构建章节的线程数
+    "section_cache": True,  # 是否缓存章节片段（输入不变的章节直接复用）
+    "section_cache_max_entries": 500,  # 章节缓存最多保留的片段数
+    "deterministic": True,  # 确定性输出：相同输入生成相同字节的文件，文件名使用输入哈希，重复生成直接复用
+    "streaming": False,  # 流式写出：章节写入磁盘临时文件后即释放，证书很多或并发生成时内存占用基本不随文件大小增长
+}
+
+# docx 保存配置
+DOCX_SAVE_CONFIG = {
+    "store_media": True,  # JPEG/PNG 等已压缩图片不再 deflate，原样存储
+    "xml_compresslevel": 6,  # XML 部件的 deflate 级别（0-9，1 最快，9 最小）
+}
+
+# 输出目录保留策略（后台定期清理 output/）
+OUTPUT_RETENTION_CONFIG = {
+    "max_age_days": 30,  # 超过天数的投标文件删除
+    "max_total_mb": 2048,  # 输出目录总大小上限，超出时从最旧的文件开始删除
+    "min_age_minutes": 60,  # 最近生成的文件不删除（用户可能正在下载）
+    "interval_minutes": 30,  # 清理间隔
+}
+
+# 投标文件预览（界面内 HTML 预览，不生成 docx）
+PREVIEW_CONFIG = {
+    "thumbnail_width": 160,  # 证书缩略图宽度（像素）
+    "thumbnail_workers": 2,  # 后台生成缩略图的线程数
+    "max_items": 10,  # 案例、产品每类最多列出的条数
+}
+
+# 耗时追踪（见 tracing.py）
+TRACE_CONFIG = {
+    "export": True,  # 每次追踪结束后写出 JSON Lines 到 cache/traces/
+    "keep": 200,  # 最多保留的追踪文件数
+    "memory": False,  # 默认是否采样各区间内存（tracemalloc，明显变慢；调试模式下可单独开启）
+    "memory_snapshot_depth": 2,  # 不超过这个深度的区间（解析文件、各项匹配、构建/组装/保存）记录主要分配位置，设为 3 时包含各章节（更慢）
+    "memory_top_sites": 5,  # 每个区间列出的分配位置数量
+    "rss_sample_interval": 0.05,  # 追踪期间采样常驻内存的间隔（秒），记录每次追踪的峰值内存
+}
+
+# 生成指标历史（见 metrics_store.py）
+METRICS_CONFIG = {
+    "max_records": 10000,  # 最多保留的生成记录数
+}
+
+# 性能分析（见 profiling.py，调试模式下按需开启）
+PROFILE_CONFIG = {
+    "top_n": 30,  # 界面内列出的函数数量
+    "keep": 50,  # 最多保留的 .prof 文件数
+}
+
+# 实时监控指标导出（见 metrics_exporter.py），默认关闭
+METRICS_EXPORTER_CONFIG = {
+    "enabled": False,
+    "host": "127.0.0.1",  # 只监听本机；监控系统在其他机器上时改为 0.0.0.0
+    "port": 9464,  # GET /metrics，设为 None 时不开端口
+    "textfile": None,  # 定期写出的指标文件（node_exporter textfile collector 目录下的 .prom 文件），None 时不写
+    "interval_seconds": 15,  # 指标文件写出间隔
+}
+
+# 微基准测试（见 benchmark.py）
+BENCHMARK_CONFIG = {
+    "seed": 0,  # 测试数据的随机种子（相同种子生成相同数据，结果才能对比）
+    "budget_seconds": 2.0,  # 每项重复测量的时间预算，单次超过预算的只测一次
+    "max_repeat": 7,  # 每项最多重复次数
+    "regression_ratio": 1.2,  # 对比时中位数超过基准的这个倍数视为变慢
+}
+
+# 端到端性能回归测试（见 golden_tenders.py）
+GOLDEN_CONFIG = {
+    "seed": 0,  # 招标文件包和公司资料的随机种子
+    "certificates": 36,  # 公司资质证书 PDF 数量
+    "repeat": 3,  # 每个招标文件包运行次数，取中位数
+    "time_tolerance": 0.25,  # 总耗时超过基准的比例
+    "memory_tolerance": 0.15,  # 峰值内存超过基准的比例
+    "size_tolerance": 0.05,  # 输出文件大小超过基准的比例
+}
+
+# 并发压力测试（见 load_test.py）
+LOAD_TEST_CONFIG = {
+    "seed": 0,  # 测试数据和思考时间的随机种子
+    "users": [1, 2, 4, 8, 16],  # 逐级增加的并发用户数
+    "duration_seconds": 60,  # 每级持续时间（到时后不再开始新的流程，进行中的流程完成后结束）
+    "think_seconds": 5,  # 两次生成之间的平均思考时间（指数分布）
+    "certificates": 36,  # 公司资质证书 PDF 数量
+    "tenders": 4,  # 招标文件包数量（每包一个 PDF 和一个 DOCX，用户每次随机选择一包）
+    "tender_pages": 30,  # 每个招标文件的页数
+    "sample_interval": 0.5,  # CPU 和队列的采样间隔（秒）
+    "latency_factor": 2.0,  # p95 延迟超过第一级的这个倍数视为饱和
+    "min_throughput_gain": 0.1,  # 增加用户后吞吐量增长低于这个比例视为饱和
+}
+
+# 生成耗时和大小预估（见 generation_estimate.py）
+ESTIMATE_CONFIG = {
+    "history_days": 90,  # 拟合系数使用的历史记录范围（天）
+    "prior_weight": 5,  # 默认系数相当于多少条历史记录（历史记录越多越接近实际拟合结果）
+    "seconds_per_bid": 0.5,  # 每份投标文件的固定耗时（封面、目录、公司通用内容、组装和保存）
+    "seconds_per_rendered_page": 0.1,  # 每页证书转换（渲染缓存缺失；矢量页面需要栅格化时更慢）
+    "seconds_per_cached_page": 0.01,  # 每页证书命中渲染缓存
+    "seconds_per_equipment_row": 0.007,  # 设备说明一览表每行
+    "bytes_per_bid": 60 * 1024,  # 每份投标文件除证书图片外的大小
+    "bytes_per_page": 150 * 1024,  # 每页证书图片（渲染缓存中没有可参考的图片时）
+}
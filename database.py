@@ -13,6 +13,9 @@ from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
+from metrics_exporter import MATCHES, MATCH_SECONDS, timed
+from tracing import traced
+
 
 class CompanyDatabase:
     """公司资料数据库"""
@@ -233,6 +236,8 @@ class CompanyDatabase:
 
     # ==================== 智能匹配 ====================
 
+    @traced("匹配资质")
+    @timed(MATCHES, MATCH_SECONDS, kind="qualifications")
     def match_qualifications(self, requirements: List[str]) -> List[Dict]:
         """智能匹配资质"""
         qualifications = self.get_qualifications()
@@ -266,6 +271,8 @@ class CompanyDatabase:
 
         return matched
 
+    @traced("匹配案例")
+    @timed(MATCHES, MATCH_SECONDS, kind="cases")
     def match_cases(self, industry: str = None, product_type: str = None,
                     min_amount: float = 0, limit: int = 5) -> List[Dict]:
         """智能匹配案例"""
@@ -300,6 +307,8 @@ class CompanyDatabase:
 
         return matched_cases[:limit]
 
+    @traced("匹配产品")
+    @timed(MATCHES, MATCH_SECONDS, kind="products")
     def match_products(self, keywords: List[str]) -> List[Dict]:
         """智能匹配产品"""
         products = self.get_products()
@@ -0,0 +1,162 @@
+"""
+流式写出投标文件
+
+assemble_fragments 把全部章节复制进一个 python-docx 文档，保存前整棵 XML 树和
+所有证书图片都留在内存中，证书多、并发生成时内存占用随投标文件大小线性增长。
+
+StreamingDocxWriter 逐个接收章节片段：
+- 正文元素（关联图片、重新编号图片对象 ID 后）立即序列化追加到磁盘上的正文临时文件
+- 图片按内容去重后写入磁盘临时文件，文档中只保留不含内容的图片部件占位
+- 保存时按块读取临时文件写出 zip
+
+片段写入后即可释放，内存中只保留当前章节和文档骨架（样式、设置、页脚等）。
+输出的部件、关系、内容类型和正文与 assemble_fragments + save_docx 完全一致。
+"""
+
+import tempfile
+from hashlib import sha1
+from pathlib import Path
+from typing import IO, Iterator, Optional, Union
+
+from docx import Document
+from docx.image.image import Image
+from docx.opc.constants import RELATIONSHIP_TYPE as RT
+from docx.opc.packuri import PackURI
+from docx.opc.part import Part
+from docx.oxml.ns import qn
+from lxml import etree
+
+from docx_writer import iter_package_entries, write_entries, write_to_target
+
+# 按块读取临时文件的块大小
+CHUNK_SIZE = 1024 * 1024
+
+
+def _read_chunks(path: Path) -> Iterator[bytes]:
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+class StreamingDocxWriter:
+    """流式 docx 写出（用法：逐个 add_fragment，再 save）"""
+
+    def __init__(self, work_dir: Optional[Path] = None):
+        """
+        Args:
+            work_dir: 临时文件目录，默认使用系统临时目录
+        """
+        # 文档骨架：正文只有节属性，页码等节设置直接修改 self.doc
+        self.doc = Document()
+        root = self.doc.element
+        self._namespaces = {(prefix, uri) for prefix, uri in root.nsmap.items()}
+
+        self._tmp = tempfile.TemporaryDirectory(prefix="docx_stream_", dir=work_dir)
+        self._work_dir = Path(self._tmp.name)
+        self._body_path = self._work_dir / "body.xml"
+        self._body = open(self._body_path, "wb")
+
+        self._media = {}  # zip 条目名 -> 临时文件
+        self._image_rids = {}  # 图片 sha1 -> 关系 ID
+        self._doc_pr_count = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """删除临时文件"""
+        if not self._body.closed:
+            self._body.close()
+        self._tmp.cleanup()
+
+    def _add_image(self, blob: bytes) -> str:
+        """添加图片（按内容去重），返回文档中的关系 ID"""
+        digest = sha1(blob).hexdigest()
+        rid = self._image_rids.get(digest)
+        if rid is not None:
+            return rid
+
+        # 部件名和关系 ID 的分配方式与 python-docx 的 get_or_add_image 相同
+        image = Image.from_blob(blob)
+        partname = PackURI(f"/word/media/image{len(self._media) + 1}.{image.ext}")
+        media_path = self._work_dir / f"media{len(self._media) + 1}"
+        media_path.write_bytes(blob)
+        self._media[partname.membername] = media_path
+
+        placeholder = Part(partname, image.content_type, package=self.doc.part.package)
+        rid = self.doc.part.relate_to(placeholder, RT.IMAGE)
+        self._image_rids[digest] = rid
+        return rid
+
+    def _serialize(self, element) -> bytes:
+        """
+        序列化正文元素
+
+        单独序列化子元素时 lxml 会在开始标签上重复声明根元素的命名空间，
+        这里去掉骨架根元素已经声明的部分，与整份文档序列化的结果一致。
+        """
+        xml = etree.tostring(element, encoding="UTF-8")
+        end = xml.index(b">")
+        start_tag = xml[:end]
+        for prefix, uri in element.nsmap.items():
+            if (prefix, uri) not in self._namespaces:
+                continue
+            name = f"xmlns:{prefix}" if prefix else "xmlns"
+            start_tag = start_tag.replace(f' {name}="{uri}"'.encode("utf-8"), b"", 1)
+        return start_tag + xml[end:]
+
+    def add_fragment(self, fragment: Document):
+        """追加一个章节片段（片段中的元素会被修改，写入后不应再使用）"""
+        for child in fragment.element.body.iterchildren():
+            if child.tag == qn('w:sectPr'):
+                continue
+
+            for blip in child.iter(qn('a:blip')):
+                rid = blip.get(qn('r:embed'))
+                if not rid:
+                    continue
+                image_part = fragment.part.related_parts[rid]
+                blip.set(qn('r:embed'), self._add_image(image_part.blob))
+
+            for doc_pr in child.iter(qn('wp:docPr')):
+                self._doc_pr_count += 1
+                doc_pr.set('id', str(self._doc_pr_count))
+
+            self._body.write(self._serialize(child))
+
+    def _document_chunks(self, skeleton: bytes) -> Iterator[bytes]:
+        """document.xml：骨架的正文开始标签之后插入正文临时文件"""
+        body_start = skeleton.index(b"<w:body>") + len(b"<w:body>")
+        yield skeleton[:body_start]
+        yield from _read_chunks(self._body_path)
+        yield skeleton[body_start:]
+
+    def write(self, stream: IO[bytes], deterministic: bool = False,
+              store_media: Optional[bool] = None, compresslevel: Optional[int] = None):
+        """写入可写二进制流（参数见 docx_writer.write_entries）"""
+        self._body.flush()
+        document_name = self.doc.part.partname.membername
+
+        def entries():
+            for name, data in iter_package_entries(self.doc):
+                if name == document_name:
+                    data = self._document_chunks(data)
+                elif name in self._media:
+                    data = _read_chunks(self._media[name])
+                yield name, data
+
+        write_entries(entries(), stream, deterministic, store_media, compresslevel)
+
+    def save(self, target: Union[Path, str, IO[bytes]], deterministic: bool = False,
+             store_media: Optional[bool] = None, compresslevel: Optional[int] = None):
+        """
+        保存 docx（参数与返回值同 docx_writer.save_docx）
+        """
+        return write_to_target(
+            lambda stream: self.write(stream, deterministic, store_media, compresslevel), target)
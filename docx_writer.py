@@ -0,0 +1,193 @@
+"""
+docx 保存
+
+python-docx 的 doc.save 对每个部件都做 deflate 压缩，包括本身已经压缩过的 JPEG/PNG 图片，
+图片多的投标文件大部分保存时间都花在压缩不可压缩的数据上。
+
+这里直接按部件写出 zip：
+- 已压缩的媒体文件（JPEG/PNG 等）不再压缩，原样存储
+- XML 部件使用可配置的 deflate 级别（DOCX_SAVE_CONFIG）
+- 可以写入文件路径，也可以写入内存缓冲区或流式 HTTP 响应等任意可写对象
+- 确定性模式固定条目时间戳和顺序，相同输入生成字节完全一致的文件
+"""
+
+import os
+import time
+import uuid
+import zipfile
+from pathlib import Path
+from typing import IO, Iterable, Iterator, List, Optional, Tuple, Union
+from xml.sax.saxutils import quoteattr
+
+from docx import Document
+from docx.opc.packuri import PACKAGE_URI
+
+from config import DOCX_SAVE_CONFIG
+
+# 确定性模式下所有 zip 条目使用的时间戳（zip 格式支持的最早时间）
+FIXED_ZIP_TIMESTAMP = (1980, 1, 1, 0, 0, 0)
+
+# 已经压缩过的媒体格式，再做 deflate 几乎不会变小
+COMPRESSED_MEDIA_EXTENSIONS = {".jpeg", ".jpg", ".png", ".gif", ".jpe", ".tif", ".tiff", ".emz", ".wdp"}
+
+# [Content_Types].xml 中按扩展名声明的默认类型（其余部件逐个声明）
+DEFAULT_CONTENT_TYPES = {
+    "rels": "application/vnd.openxmlformats-package.relationships+xml",
+    "xml": "application/xml",
+}
+
+
+def _entry_order(name: str) -> tuple:
+    """条目顺序：[Content_Types].xml 在最前（部分阅读器要求），其余按名称排序"""
+    return (name != "[Content_Types].xml", name)
+
+
+def content_types_xml(parts: List) -> bytes:
+    """
+    [Content_Types].xml
+
+    只使用部件公开的 partname 和 content_type：按扩展名声明默认类型（Default，图片等），
+    类型与扩展名默认类型不一致的部件（正文、样式等 XML 部件）逐个声明（Override）。
+    """
+    defaults = dict(DEFAULT_CONTENT_TYPES)
+    overrides = {}
+    for part in parts:
+        ext = part.partname.ext.lower()
+        if defaults.setdefault(ext, part.content_type) != part.content_type:
+            overrides[str(part.partname)] = part.content_type
+
+    elements = [f'<Default Extension={quoteattr(ext)} ContentType={quoteattr(content_type)}/>'
+                for ext, content_type in sorted(defaults.items())]
+    elements += [f'<Override PartName={quoteattr(partname)} ContentType={quoteattr(content_type)}/>'
+                 for partname, content_type in sorted(overrides.items())]
+    return ("<?xml version='1.0' encoding='UTF-8' standalone='yes'?>\n"
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            + "".join(elements) + "</Types>").encode("utf-8")
+
+
+def iter_package_entries(doc: Document) -> Iterator[Tuple[str, bytes]]:
+    """
+    按 python-docx 的写出顺序生成 docx 包中的全部条目 (zip 条目名, 内容)
+
+    与 OpcPackage.save 相同：先调用各部件的 before_marshal，
+    再写 [Content_Types].xml、包关系和各部件（及其关系）。
+    """
+    package = doc.part.package
+    parts = list(package.iter_parts())
+    for part in parts:
+        part.before_marshal()
+
+    yield "[Content_Types].xml", content_types_xml(parts)
+    yield PACKAGE_URI.rels_uri.membername, package.rels.xml
+    for part in parts:
+        yield part.partname.membername, part.blob
+        if len(part.rels):
+            yield part.partname.rels_uri.membername, part.rels.xml
+
+
+def is_compressed_media(name: str) -> bool:
+    """zip 条目是否为已压缩的媒体文件"""
+    return os.path.splitext(name)[1].lower() in COMPRESSED_MEDIA_EXTENSIONS
+
+
+def write_entries(entries: Iterable[Tuple[str, Union[bytes, Iterable[bytes]]]], stream: IO[bytes],
+                  deterministic: bool = False, store_media: Optional[bool] = None,
+                  compresslevel: Optional[int] = None):
+    """
+    把 docx 包条目写入可写二进制流（文件、BytesIO、HTTP 响应等，不要求可 seek）
+
+    Args:
+        entries: (zip 条目名, 内容)，内容为 bytes 或按块产出的 bytes 迭代器（大部件不必整体读入内存）
+        stream: 可写二进制流
+        deterministic: 是否固定条目时间戳和顺序
+        store_media: 已压缩的媒体文件是否不再压缩，默认见 DOCX_SAVE_CONFIG
+        compresslevel: XML 部件的 deflate 级别（0-9），默认见 DOCX_SAVE_CONFIG
+    """
+    if store_media is None:
+        store_media = DOCX_SAVE_CONFIG["store_media"]
+    if compresslevel is None:
+        compresslevel = DOCX_SAVE_CONFIG["xml_compresslevel"]
+
+    if deterministic:
+        entries = sorted(entries, key=lambda entry: _entry_order(entry[0]))
+
+    date_time = FIXED_ZIP_TIMESTAMP if deterministic else time.localtime(time.time())[:6]
+    with zipfile.ZipFile(stream, "w") as archive:
+        for name, data in entries:
+            info = zipfile.ZipInfo(name, date_time=date_time)
+            info.external_attr = 0o644 << 16
+            if store_media and is_compressed_media(name):
+                info.compress_type = zipfile.ZIP_STORED
+            else:
+                info.compress_type = zipfile.ZIP_DEFLATED
+
+            if isinstance(data, bytes):
+                archive.writestr(info, data, compresslevel=compresslevel)
+                continue
+
+            # 按块写入：按名称打开的条目使用归档的压缩方式和级别，时间戳为 zip 最早时间
+            archive.compression = info.compress_type
+            archive.compresslevel = compresslevel
+            with archive.open(name, "w") as entry:
+                for chunk in data:
+                    entry.write(chunk)
+            # 权限只写在中央目录（关闭归档时写出）
+            archive.getinfo(name).external_attr = info.external_attr
+
+
+def write_docx(doc: Document, stream: IO[bytes], deterministic: bool = False,
+               store_media: Optional[bool] = None, compresslevel: Optional[int] = None):
+    """
+    把文档写入可写二进制流（文件、BytesIO、HTTP 响应等，不要求可 seek）
+
+    Args:
+        doc: python-docx 文档
+        stream: 可写二进制流
+        deterministic: 是否固定条目时间戳和顺序
+        store_media: 已压缩的媒体文件是否不再压缩，默认见 DOCX_SAVE_CONFIG
+        compresslevel: XML 部件的 deflate 级别（0-9），默认见 DOCX_SAVE_CONFIG
+    """
+    write_entries(iter_package_entries(doc), stream, deterministic, store_media, compresslevel)
+
+
+def save_docx(doc: Document, target: Union[Path, str, IO[bytes]], deterministic: bool = False,
+              store_media: Optional[bool] = None, compresslevel: Optional[int] = None):
+    """
+    保存 docx
+
+    Args:
+        doc: python-docx 文档
+        target: 输出路径，或可写二进制流（BytesIO、HTTP 响应等）
+        deterministic: 是否使用确定性输出（固定 zip 时间戳和条目顺序）
+        store_media: 已压缩的媒体文件是否不再压缩，默认见 DOCX_SAVE_CONFIG
+        compresslevel: XML 部件的 deflate 级别（0-9），默认见 DOCX_SAVE_CONFIG
+
+    Returns:
+        输出路径；写入流时返回该流
+    """
+    return write_to_target(lambda stream: write_docx(doc, stream, deterministic, store_media, compresslevel),
+                           target)
+
+
+def write_to_target(write, target: Union[Path, str, IO[bytes]]):
+    """
+    把 write(stream) 的输出写入路径或流
+
+    写入路径时先写临时文件再原子替换，同一输入并发生成时不会读到半个文件。
+
+    Returns:
+        输出路径；写入流时返回该流
+    """
+    if not isinstance(target, (str, Path)):
+        write(target)
+        return target
+
+    target = Path(target)
+    tmp_path = target.with_name(f".{target.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, target)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+    return target
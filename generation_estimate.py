@@ -0,0 +1,202 @@
+"""
+生成耗时和大小预估
+
+点击生成前按本次输入预估耗时和文件大小，避免用户不知道要等多久而重复点击：
+- 证书页数：匹配资质中各证书选中的页数（同生成时的页面选择），以及其中已在渲染缓存中的页数
+- 设备说明一览表行数
+- 历史生成记录（metrics_store）中的耗时、证书转换/命中缓存页数、设备规格行数和输出大小
+
+耗时 ≈ 每份文件固定耗时 × 文件数 + 每页转换耗时 × 需转换页数 + 每页缓存耗时 × 缓存页数 + 每行耗时 × 设备行数，
+各项系数由历史记录最小二乘拟合，以 ESTIMATE_CONFIG 中的默认值作为先验（历史记录少时接近默认值）。
+文件大小：已缓存的证书页面按缓存图片的实际大小计，未缓存的按缓存图片平均大小（没有时按拟合的每页大小）。
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from bid_layout import get_layout
+from config import ESTIMATE_CONFIG
+
+# 耗时系数（顺序即拟合特征顺序）
+TIME_COEFFICIENTS = ["seconds_per_bid", "seconds_per_rendered_page", "seconds_per_cached_page",
+                     "seconds_per_equipment_row"]
+# 大小系数
+SIZE_COEFFICIENTS = ["bytes_per_bid", "bytes_per_page"]
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    """高斯消元解线性方程组（矩阵为正定的法方程）"""
+    n = len(vector)
+    rows = [list(matrix[i]) + [vector[i]] for i in range(n)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(rows[r][col]))
+        rows[col], rows[pivot] = rows[pivot], rows[col]
+        for r in range(col + 1, n):
+            factor = rows[r][col] / rows[col][col]
+            for c in range(col, n + 1):
+                rows[r][c] -= factor * rows[col][c]
+    result = [0.0] * n
+    for r in range(n - 1, -1, -1):
+        result[r] = (rows[r][n] - sum(rows[r][c] * result[c] for c in range(r + 1, n))) / rows[r][r]
+    return result
+
+
+def fit_coefficients(features: List[List[float]], targets: List[float], prior: List[float],
+                     prior_weight: Optional[float] = None) -> List[float]:
+    """
+    带先验的最小二乘拟合
+
+    最小化 Σ(y - x·β)² + w·Σ s_j(β_j - prior_j)²，s_j 为第 j 个特征平方的均值，
+    即先验相当于 w 条记录；某个特征在历史中始终为 0 时该系数保持先验值。结果不小于 0。
+    """
+    weight = prior_weight if prior_weight is not None else ESTIMATE_CONFIG["prior_weight"]
+    n = len(prior)
+    matrix = [[sum(x[i] * x[j] for x in features) for j in range(n)] for i in range(n)]
+    vector = [sum(x[i] * y for x, y in zip(features, targets)) for i in range(n)]
+    for j in range(n):
+        scale = sum(x[j] ** 2 for x in features) / len(features) if features else 0
+        penalty = weight * (scale or 1.0)
+        matrix[j][j] += penalty
+        vector[j] += penalty * prior[j]
+    return [max(0.0, value) for value in _solve(matrix, vector)]
+
+
+def fit_history(history: List[Dict]) -> Dict:
+    """
+    从历史记录拟合各项系数
+
+    只使用记录了设备规格行数的记录（旧记录没有这一列），并排除复用了已生成文件的记录
+（几乎不耗时，会把每份文件的耗时拉向 0）。
+
+    Returns:
+        {系数名: 值, 'history': 使用的记录数}
+    """
+    records = [r for r in history
+               if r.get("equipment_rows") is not None and r.get("total_seconds") is not None and r.get("bid_count")
+               and not r.get("reused")]
+    time_features = [[r["bid_count"], r["certs_rendered"] or 0, r["certs_cached"] or 0, r["equipment_rows"]]
+                     for r in records]
+    time_values = fit_coefficients(time_features, [r["total_seconds"] for r in records],
+                                   [ESTIMATE_CONFIG[name] for name in TIME_COEFFICIENTS])
+
+    sized = [r for r in records if r.get("output_bytes")]
+    size_features = [[r["bid_count"], (r["certs_rendered"] or 0) + (r["certs_cached"] or 0)] for r in sized]
+    size_values = fit_coefficients(size_features, [r["output_bytes"] for r in sized],
+                                   [ESTIMATE_CONFIG[name] for name in SIZE_COEFFICIENTS])
+
+    coefficients = dict(zip(TIME_COEFFICIENTS, time_values))
+    coefficients.update(zip(SIZE_COEFFICIENTS, size_values))
+    coefficients["history"] = len(records)
+    return coefficients
+
+
+def count_equipment_rows(data_dir: Path) -> int:
+    """设备说明一览表行数（equipment_specs.json）"""
+    equipment_file = data_dir / "equipment_specs.json"
+    if not equipment_file.exists():
+        return 0
+    try:
+        with open(equipment_file, "r", encoding="utf-8") as f:
+            return len(json.load(f).get("equipment_specs", []))
+    except (OSError, ValueError):
+        return 0
+
+
+def estimate_generation(qualifications: List[Dict], data_dir: Path, separate_bids: bool = True,
+                        compression_profile: Optional[str] = None, cert_cache_dir: Optional[Path] = None,
+                        history: Optional[List[Dict]] = None, coefficients: Optional[Dict] = None) -> Dict:
+    """
+    预估本次生成的耗时和文件大小
+
+    Args:
+        qualifications: 匹配的资质
+        data_dir: 数据目录
+        separate_bids: 是否分开生成技术标和商务标
+        compression_profile: 证书图片压缩方案
+        cert_cache_dir: 证书渲染缓存目录（同生成器），默认见 CERT_CACHE_DIR
+        history: 历史生成记录（MetricsStore.records()），为空时使用默认系数
+        coefficients: 已拟合的系数（fit_history 的结果），给出时不再拟合 history
+
+    Returns:
+        {'seconds', 'bytes', 'bids', 'cert_pages', 'cached_pages', 'equipment_rows', 'history', 'coefficients'}
+    """
+    from cert_images import CertificateImageConverter
+
+    layouts = [get_layout(name) for name in (["技术标", "商务标"] if separate_bids else ["单一文件"])]
+    section_keys = [{spec.key for spec in layout.sections} for layout in layouts]
+    cert_bids = sum(1 for keys in section_keys if "qualifications" in keys)
+    equipment_bids = sum(1 for keys in section_keys if "equipment_specs" in keys)
+
+    # 与生成时相同的转换参数，才能对应到同一份渲染缓存
+    converter = CertificateImageConverter(dpi=200, cache_dir=cert_cache_dir, profile=compression_profile)
+    cache = {"pages": 0, "cached": 0, "cached_bytes": 0}
+    if cert_bids:
+        cache = converter.cache_status(qualifications, data_dir)
+    equipment_rows = count_equipment_rows(data_dir) * equipment_bids
+
+    if coefficients is None:
+        coefficients = fit_history(history or [])
+    # 第一份文件转换缓存缺失的页面，之后的文件全部命中缓存
+    rendered = cache["pages"] - cache["cached"]
+    cached = cache["cached"] + cache["pages"] * max(0, cert_bids - 1)
+    seconds = (coefficients["seconds_per_bid"] * len(layouts)
+               + coefficients["seconds_per_rendered_page"] * rendered
+               + coefficients["seconds_per_cached_page"] * cached
+               + coefficients["seconds_per_equipment_row"] * equipment_rows)
+
+    page_bytes = cache["cached_bytes"] / cache["cached"] if cache["cached"] else coefficients["bytes_per_page"]
+    image_bytes = cache["cached_bytes"] + page_bytes * rendered
+    target_mb = converter.profile.get("target_size_mb")
+    if target_mb:
+        # 设置了目标大小的方案会降低图片质量以满足目标
+        image_bytes = min(image_bytes, target_mb * 1024 * 1024)
+    size = coefficients["bytes_per_bid"] * len(layouts) + image_bytes * cert_bids
+
+    return {
+        "seconds": seconds,
+        "bytes": int(size),
+        "bids": len(layouts),
+        "cert_pages": cache["pages"],
+        "cached_pages": cache["cached"],
+        "equipment_rows": equipment_rows,
+        "history": coefficients["history"],
+        "coefficients": coefficients,
+    }
+
+
+def compare_to_actual(estimate: Dict, seconds: float, size: int) -> Dict:
+    """
+    预估与实际对比
+
+    Returns:
+        {'seconds': (预估, 实际, 相对误差), 'bytes': (预估, 实际, 相对误差)}，误差为 (预估 - 实际) / 实际
+    """
+    def error(predicted: float, actual: float) -> Optional[float]:
+        return (predicted - actual) / actual if actual else None
+
+    return {
+        "seconds": (estimate["seconds"], seconds, error(estimate["seconds"], seconds)),
+        "bytes": (estimate["bytes"], size, error(estimate["bytes"], size)),
+    }
+
+
+def format_duration(seconds: float) -> str:
+    """格式化耗时（12 秒、2 分 30 秒）"""
+    seconds = max(0, round(seconds))
+    if seconds < 60:
+        return f"{seconds} 秒"
+    return f"{seconds // 60} 分 {seconds % 60} 秒"
+
+
+def format_comparison(comparison: Dict) -> str:
+    """预估与实际对比的说明（compare_to_actual 的结果）"""
+    from cert_images import format_size
+
+    def deviation(error: Optional[float]) -> str:
+        return f"（偏差 {error:+.0%}）" if error is not None else ""
+
+    predicted, actual, error = comparison["seconds"]
+    line = f"⏱️ 耗时 预估 {format_duration(predicted)} / 实际 {format_duration(actual)}{deviation(error)}"
+    predicted, actual, error = comparison["bytes"]
+    return line + f"；大小 预估 {format_size(predicted)} / 实际 {format_size(actual)}{deviation(error)}"
@@ -14,10 +14,12 @@
 3. 在生成投标文件时，勾选"显示证书图片"选项
 """
 
+import importlib.util
+import os
 import subprocess
 import tempfile
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
 from datetime import datetime
 from docx import Document
 from docx.shared import Pt, RGBColor, Inches, Cm
@@ -25,23 +27,38 @@ from docx.enum.text import WD_ALIGN_PARAGRAPH
 from docx.oxml.ns import qn
 from docx.oxml import OxmlElement
 
-# PDF 转图片相关导入
-try:
-    from pdf2image import convert_from_path
-    from PIL import Image as PILImage
-    PDF_TO_IMAGE_AVAILABLE = True
-except ImportError as e:
-    PDF_TO_IMAGE_AVAILABLE = False
-    PILImage = None
-    print(f"✗ 错误: pdf2image 或 Pillow 未安装")
-    print(f"详细信息: {e}")
+from cert_images import CertificateImageConverter, format_size, get_compression_profile
+from bid_layout import BidLayout, TEMPLATE_VERSION, get_layout, build_fragments, iter_fragments, assemble_fragments
+from section_cache import SectionCache, file_signature, hash_inputs
+from docx_writer import save_docx
+from docx_stream import StreamingDocxWriter
+from output_store import OutputStore, BidArtifact
+from bid_preview import ThumbnailCache, render_preview_html
+from config import BID_BUILD_CONFIG
+from metrics_exporter import GENERATIONS, GENERATION_SECONDS, GENERATIONS_IN_PROGRESS, OUTPUT_BYTES, timed
+from tracing import current_span, span
+
+# PDF 转图片依赖 Pillow（证书转换见 cert_images.py，已不再使用 pdf2image）
+# 导入时只检查是否安装，首次使用时才导入
+PDF_TO_IMAGE_AVAILABLE = importlib.util.find_spec("PIL") is not None
+if not PDF_TO_IMAGE_AVAILABLE:
+    print("✗ 错误: Pillow 未安装")
     print("安装命令:")
-    print("  pip install pdf2image Pillow")
+    print("  pip install Pillow")
     print("")
     print("请先安装这些库，然后重启应用")
     import sys
     sys.exit(1)  # 退出程序，因为现在默认启用PDF转图片功能
 
+
+def __getattr__(name):
+    """兼容旧代码的 generator.PILImage（延迟导入）"""
+    if name == "PILImage":
+        from PIL import Image as PILImage
+        return PILImage
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 # 导入公司通用内容生成方法
 try:
     from company_content import (
@@ -52,9 +69,23 @@ try:
         add_quality_control_plan,
         add_safety_guarantee,
         add_delivery_plan,
-        add_training_and_service
+        add_training_and_service,
+        read_temp_file,
+        COMPANY_CONTENT_VERSION,
     )
     COMPANY_CONTENT_AVAILABLE = True
+
+    # 公司通用内容章节 {章节标识: (生成方法, 内容来源文件)}
+    COMPANY_CONTENT_SECTIONS = {
+        "legal_authorization": (add_legal_authorization, "legal_authorization.txt"),
+        "bid_guarantee": (add_bid_guarantee, "bid_guarantee.txt"),
+        "warranty_commitment": (add_warranty_commitment, "warranty_commitment.txt"),
+        "compliance_statement": (add_compliance_statement, "compliance_statement.txt"),
+        "quality_control": (add_quality_control_plan, "quality_control_plan.txt"),
+        "safety_guarantee": (add_safety_guarantee, "safety_guarantee.txt"),
+        "delivery_plan": (add_delivery_plan, "delivery_plan.txt"),
+        "training_service": (add_training_and_service, "training_and_service.txt"),
+    }
 except ImportError as e:
     COMPANY_CONTENT_AVAILABLE = False
     print(f"⚠️ 警告: company_content 模块未安装: {e}")
@@ -69,6 +100,21 @@ except ImportError as e:
     print(f"⚠️ 警告: add_chapter_numbers 模块未安装: {e}")
     print("章节标题将不会自动添加编号")
 
+# 证书呈现方式
+CERT_MODE_IMAGE = "image"        # 证书PDF转图片后嵌入Word
+CERT_MODE_APPENDIX = "appendix"  # 正文导出PDF，证书原件作为附录合并（不栅格化）
+
+# 资质证书分类（小节标题, 匹配关键词）
+QUALIFICATION_CATEGORIES = [
+    ("体系认证证书", ("体系", "认证")),
+    ("信用等级证书", ("AAA", "信用")),
+    ("重点荣誉证书", ("重点", "质量奖")),
+    ("合作伙伴证书", ("授权", "合作")),
+]
+
+# 按目标大小压缩证书图片时，为正文及其他内容预留的大小（字节）
+DOCUMENT_OVERHEAD_BYTES = 512 * 1024
+
 
 class BidDocumentGenerator:
     """投标文件生成器 - V2 (PDF转图片版）"""
@@ -77,10 +123,17 @@ class BidDocumentGenerator:
         self.templates_dir = templates_dir
         self.output_dir = output_dir
         self.image_width_inches = 4.5  # 自动调整的图片大小（4.5英寸，约11.4厘米）
+        self.section_cache = SectionCache() if BID_BUILD_CONFIG["section_cache"] else None
+        self.deterministic = BID_BUILD_CONFIG["deterministic"]
+        self.streaming = BID_BUILD_CONFIG["streaming"]
+        self.output_store = OutputStore()
+        self.cert_cache_dir: Optional[Path] = None  # 证书渲染缓存目录，默认见 CERT_CACHE_DIR
 
     def generate_bid(self, tender_info: Dict, company_info: Dict,
-                    matched_data: Dict, quote_data: Dict = None,
-                    show_cert_images: bool = False) -> Path:
+                     matched_data: Dict, quote_data: Dict = None,
+                     show_cert_images: bool = False,
+                     cert_mode: str = CERT_MODE_IMAGE,
+                     compression_profile: Optional[str] = None) -> Path:
         """
         生成投标文件
 
@@ -90,172 +143,231 @@ class BidDocumentGenerator:
             matched_data: 匹配的数据（资质、案例、产品等）
             quote_data: 报价数据
             show_cert_images: 是否显示证书图片
+            cert_mode: 证书呈现方式（image: 转图片嵌入; appendix: 原件PDF附录，返回PDF路径，导出失败时改为嵌入图片）
+            compression_profile: 证书图片压缩方案（print/screen/portal），为空时使用默认方案
 
         Returns:
             生成的文件路径
         """
-        bid_type = "单一文件"
-        
-        # 创建新文档
-        doc = Document()
-
-        # 生成各个章节
-        self._add_cover_v2(doc, tender_info, company_info, bid_type="投标文件")
-        self._add_table_of_contents(doc, separate_bids=False, bid_type=bid_type)  # 修改：添加目录
-        self._add_company_proof(doc, company_info, bid_type)
-        self._add_bid纲领_v2(doc, company_info, tender_info, bid_type)
-        self._add_deviation_table(doc, tender_info, table_type="技术", bid_type=bid_type)
-        self._add_company_intro_v2(doc, company_info, bid_type)
-        self._add_tech_solution(doc, tender_info, matched_data, bid_type)
-        
-        # 添加公司通用内容
-        if COMPANY_CONTENT_AVAILABLE:
-            add_legal_authorization(doc, bid_type)
-            add_bid_guarantee(doc, bid_type)
-            add_warranty_commitment(doc, bid_type)
-        
-        self._add_equipment_specs_table(doc, self.templates_dir.parent / "data", bid_type)
-        
-        # 添加更多公司通用内容
-        if COMPANY_CONTENT_AVAILABLE:
-            add_quality_control_plan(doc, bid_type)
-            add_safety_guarantee(doc, bid_type)
-            add_delivery_plan(doc, bid_type)
-            add_training_and_service(doc, bid_type)
-        
-        self._add_quotation(doc, quote_data if quote_data else {}, bid_type)
-        self._add_qualifications_with_images(doc, matched_data.get("qualifications", []), self.templates_dir.parent / "data", show_cert_images, bid_type)
-        self._add_performance(doc, matched_data.get("cases", []), bid_type)
-        self._add_after_sales(doc, company_info, bid_type)
-
-        # 设置页码
-        self._setup_page_numbers(doc)
-
-        # 保存文件
-        project_name = tender_info.get("project_info", {}).get("project_name", "未知项目")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"投标文件_{project_name}_{timestamp}.docx"
-
-        # 清理文件名
-        filename = "".join(c for c in filename if c not in '\/:*?"<>|')
-
-        output_path = self.output_dir / filename
-        doc.save(output_path)
-
-        return output_path
+        return self._generate(get_layout("单一文件"), tender_info, company_info, matched_data, quote_data,
+                              show_cert_images, cert_mode, compression_profile)
 
     def generate_tech_bid(self, tender_info: Dict, company_info: Dict,
                           matched_data: Dict, quote_data: Dict = None,
-                          show_cert_images: bool = False) -> Path:
+                          show_cert_images: bool = False,
+                          cert_mode: str = CERT_MODE_IMAGE,
+                          compression_profile: Optional[str] = None) -> Path:
         """
         生成技术标
 
         Args:
             tender_info: 招标信息
             company_info: 公司信息
-            matched_data: 匹配的数据
+            matched_data: 匹配的数据（资质、案例、产品等）
             quote_data: 报价数据
             show_cert_images: 是否显示证书图片
+            cert_mode: 证书呈现方式（image: 转图片嵌入; appendix: 原件PDF附录，返回PDF路径，导出失败时改为嵌入图片）
+            compression_profile: 证书图片压缩方案（print/screen/portal），为空时使用默认方案
 
         Returns:
             生成的文件路径
         """
-        bid_type = "技术标"
-        
-        # 创建新文档
-        doc = Document()
-
-        # 生成技术标章节
-        self._add_cover_v2(doc, tender_info, company_info, bid_type="技术投标文件")
-        self._add_table_of_contents(doc, separate_bids=True, bid_type="技术标")  # 修改：添加目录
-        self._add_company_proof(doc, company_info, bid_type)
-        self._add_bid纲领_v2(doc, company_info, tender_info, bid_type)
-        self._add_deviation_table(doc, tender_info, table_type="技术", bid_type=bid_type)
-        self._add_company_intro_v2(doc, company_info, bid_type)
-        self._add_tech_solution(doc, tender_info, matched_data, bid_type)
-        
-        # 添加公司通用内容
-        if COMPANY_CONTENT_AVAILABLE:
-            add_compliance_statement(doc, bid_type)
-            add_quality_control_plan(doc, bid_type)
-            add_safety_guarantee(doc, bid_type)
-        
-        self._add_equipment_specs_table(doc, self.templates_dir.parent / "data", bid_type)
-        
-        # 添加更多公司通用内容
-        if COMPANY_CONTENT_AVAILABLE:
-            add_delivery_plan(doc, bid_type)
-            add_training_and_service(doc, bid_type)
-        
-        self._add_qualifications_with_images(doc, matched_data.get("qualifications", []), self.templates_dir.parent / "data", show_cert_images, bid_type)
-        self._add_performance(doc, matched_data.get("cases", []), bid_type)
-        self._add_tech_commitment(doc, bid_type)
-        self._add_response_commitment(doc, bid_type)
-
-        # 保存文件
-        project_name = tender_info.get("project_info", {}).get("project_name", "未知项目")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"技术标_{project_name}_{timestamp}.docx"
-
-        # 清理文件名
-        filename = "".join(c for c in filename if c not in '\/:*?"<>|')
-
-        output_path = self.output_dir / filename
-        doc.save(output_path)
-
-        return output_path
+        return self._generate(get_layout("技术标"), tender_info, company_info, matched_data, quote_data,
+                              show_cert_images, cert_mode, compression_profile)
 
     def generate_commercial_bid(self, tender_info: Dict, company_info: Dict,
                                 matched_data: Dict, quote_data: Dict = None,
-                                show_cert_images: bool = False) -> Path:
+                                show_cert_images: bool = False,
+                                cert_mode: str = CERT_MODE_IMAGE,
+                                compression_profile: Optional[str] = None) -> Path:
         """
         生成商务标
 
         Args:
             tender_info: 招标信息
             company_info: 公司信息
-            matched_data: 匹配的数据
+            matched_data: 匹配的数据（资质、案例、产品等）
             quote_data: 报价数据
             show_cert_images: 是否显示证书图片
+            cert_mode: 证书呈现方式（image: 转图片嵌入; appendix: 原件PDF附录，返回PDF路径，导出失败时改为嵌入图片）
+            compression_profile: 证书图片压缩方案（print/screen/portal），为空时使用默认方案
 
         Returns:
             生成的文件路径
         """
-        bid_type = "商务标"
-        
-        # 创建新文档
-        doc = Document()
+        return self._generate(get_layout("商务标"), tender_info, company_info, matched_data, quote_data,
+                              show_cert_images, cert_mode, compression_profile)
+
+    def _generate(self, layout: BidLayout, tender_info: Dict, company_info: Dict,
+                  matched_data: Dict, quote_data: Dict = None,
+                  show_cert_images: bool = False,
+                  cert_mode: str = CERT_MODE_IMAGE,
+                  compression_profile: Optional[str] = None) -> Path:
+        """
+        按布局生成投标文件：各章节并发构建为片段（输入未变的章节读取缓存），再按顺序组装或流式写出
+        """
+        with span(f"生成{layout.bid_type}", bid_type=layout.bid_type) as bid_span, \
+                GENERATIONS_IN_PROGRESS.track(), \
+                timed(GENERATIONS, GENERATION_SECONDS, bid_type=layout.bid_type) as outcome:
+            args = (layout, tender_info, company_info, matched_data, quote_data,
+                    show_cert_images, cert_mode, compression_profile)
+            section_inputs = self._section_inputs(*args)
+
+            # 确定性模式：全部输入相同的文件已生成过时直接返回
+            bid_key = None
+            if self.deterministic:
+                bid_key = hash_inputs(TEMPLATE_VERSION, layout.bid_type, str(self.output_dir), section_inputs)
+                existing = self.output_store.get(bid_key)
+                if existing is not None:
+                    # 更新修改时间，使其成为最新生成的文件
+                    os.utime(existing)
+                    print(f"✓ 输入未变化，复用已生成的文件: {existing.name}")
+                    bid_span.set(cached=True)
+                    outcome["status"] = "reused"
+                    return existing
+
+            # 确定性模式下文件名使用输入哈希代替时间戳
+            project_name = tender_info.get("project_info", {}).get("project_name", "未知项目")
+            suffix = bid_key[:12] if bid_key else datetime.now().strftime("%Y%m%d_%H%M%S")
+            filename = f"{layout.filename_prefix}_{project_name}_{suffix}.docx"
+
+            # 清理文件名
+            filename = "".join(c for c in filename if c not in '\/:*?"<>|')
+
+            output_path = self.output_dir / filename
+            builders = self._section_builders(*args)
+
+            if self.streaming:
+                # 流式写出：每个章节写入临时文件后即释放
+                with StreamingDocxWriter() as writer:
+                    with span("构建章节", streaming=True):
+                        for fragment in iter_fragments(layout, builders, inputs=section_inputs, cache=self.section_cache):
+                            writer.add_fragment(fragment)
+                    if layout.page_numbers:
+                        self._setup_page_numbers(writer.doc)
+                    with span("保存文件") as save_span:
+                        writer.save(output_path, deterministic=self.deterministic)
+            else:
+                with span("构建章节"):
+                    fragments = build_fragments(layout, builders, inputs=section_inputs, cache=self.section_cache)
+                with span("组装章节"):
+                    doc = assemble_fragments(fragments)
+                    if layout.page_numbers:
+                        self._setup_page_numbers(doc)
+                with span("保存文件") as save_span:
+                    save_docx(doc, output_path, deterministic=self.deterministic)
+            save_span.set(size=output_path.stat().st_size)
+            OUTPUT_BYTES.observe(output_path.stat().st_size, bid_type=layout.bid_type)
+            print(f"✓ 文件已保存: {output_path.name}（{format_size(output_path.stat().st_size)}）")
+
+            if cert_mode == CERT_MODE_APPENDIX:
+                with span("导出证书附录"):
+                    output_path = self._export_with_cert_appendix(output_path, matched_data.get("qualifications", []))
+
+            if output_path is not None and bid_key:
+                self.output_store.put(bid_key, output_path)
+            if output_path is not None:
+                return output_path
+            outcome["status"] = "fallback"
+
+        # 附录导出失败：正文写的是"证书原件见附录"，不能交付没有附录的docx，改为嵌入证书图片
+        return self._generate(layout, tender_info, company_info, matched_data, quote_data,
+                              show_cert_images, CERT_MODE_IMAGE, compression_profile)
+
+    def _section_builders(self, layout: BidLayout, tender_info: Dict, company_info: Dict,
+                          matched_data: Dict, quote_data: Dict = None,
+                          show_cert_images: bool = False,
+                          cert_mode: str = CERT_MODE_IMAGE,
+                          compression_profile: Optional[str] = None) -> Dict[str, Callable]:
+        """
+        各章节的构建函数 {章节标识: 构建函数(doc)}
 
-        # 生成商务标章节
-        self._add_cover_v2(doc, tender_info, company_info, bid_type="商务投标文件")
-        self._add_table_of_contents(doc, separate_bids=True, bid_type="商务标")  # 修改：添加目录
-        self._add_company_proof(doc, company_info, bid_type)
-        self._add_bid纲领_v2(doc, company_info, tender_info, bid_type)
-        self._add_deviation_table(doc, tender_info, table_type="商务", bid_type=bid_type)
-        self._add_company_intro_v2(doc, company_info, bid_type)
-        self._add_response_commitment(doc, bid_type)
-        self._add_quotation(doc, quote_data if quote_data else {}, bid_type)
-        self._add_qualifications_with_images(doc, matched_data.get("qualifications", []), self.templates_dir.parent / "data", show_cert_images, bid_type)
-        self._add_performance(doc, matched_data.get("cases", []), bid_type)
-        self._add_after_sales(doc, company_info, bid_type)
-        self._add_commercial_commitment(doc, bid_type)
+        每个构建函数只向传入的片段文档写入自己的章节，互不依赖，可以并发执行。
+        """
+        bid_type = layout.bid_type
+        data_dir = self.templates_dir.parent / "data"
+        qualifications = matched_data.get("qualifications", [])
+
+        builders = {
+            "cover": lambda doc: self._add_cover_v2(doc, tender_info, company_info, bid_type=layout.cover_title),
+            "toc": lambda doc: self._add_table_of_contents(doc, separate_bids=bid_type != "单一文件", bid_type=bid_type),
+            "company_proof": lambda doc: self._add_company_proof(doc, company_info, bid_type),
+            "bid_outline": lambda doc: self._add_bid纲领_v2(doc, company_info, tender_info, bid_type),
+            "tech_deviation": lambda doc: self._add_deviation_table(doc, tender_info, table_type="技术",
+                                                                    bid_type=bid_type),
+            "commercial_deviation": lambda doc: self._add_deviation_table(doc, tender_info, table_type="商务",
+                                                                          bid_type=bid_type),
+            "company_intro": lambda doc: self._add_company_intro_v2(doc, company_info, bid_type),
+            "tech_solution": lambda doc: self._add_tech_solution(doc, tender_info, matched_data, bid_type),
+            "equipment_specs": lambda doc: self._add_equipment_specs_table(doc, data_dir, bid_type),
+            "quotation": lambda doc: self._add_quotation(doc, quote_data if quote_data else {}, bid_type),
+            "qualifications": lambda doc: self._add_qualifications_with_images(
+                doc, qualifications, data_dir, show_cert_images, bid_type, cert_mode, compression_profile),
+            "performance": lambda doc: self._add_performance(doc, matched_data.get("cases", []), bid_type),
+            "after_sales": lambda doc: self._add_after_sales(doc, company_info, bid_type),
+            "tech_commitment": lambda doc: self._add_tech_commitment(doc, bid_type),
+            "response_commitment": lambda doc: self._add_response_commitment(doc, bid_type),
+            "commercial_commitment": lambda doc: self._add_commercial_commitment(doc, bid_type),
+        }
 
-        # 保存文件
-        project_name = tender_info.get("project_info", {}).get("project_name", "未知项目")
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"商务标_{project_name}_{timestamp}.docx"
+        # 公司通用内容（company_content 模块不可用时这些章节为空）
+        if COMPANY_CONTENT_AVAILABLE:
+            for key, (func, _) in COMPANY_CONTENT_SECTIONS.items():
+                builders[key] = lambda doc, func=func: func(doc, bid_type)
 
-        # 清理文件名
-        filename = "".join(c for c in filename if c not in '\/:*?"<>|')
+        return builders
 
-        output_path = self.output_dir / filename
-        doc.save(output_path)
+    def _section_inputs(self, layout: BidLayout, tender_info: Dict, company_info: Dict,
+                        matched_data: Dict, quote_data: Dict = None,
+                        show_cert_images: bool = False,
+                        cert_mode: str = CERT_MODE_IMAGE,
+                        compression_profile: Optional[str] = None) -> Dict[str, list]:
+        """
+        各章节的实际输入 {章节标识: 输入}，用作章节缓存键
 
-        return output_path
+        只列出章节真正用到的数据（例如技术方案只依赖招标文件的产品需求），
+        这样修改报价后只有报价说明需要重新构建。
+        """
+        data_dir = self.templates_dir.parent / "data"
+        qualifications = matched_data.get("qualifications", [])
+        cert_files = [
+            file_signature(data_dir / cert['cert_file'])
+            for cert in qualifications if cert.get('cert_file')
+        ]
+
+        inputs = {
+            # 封面包含当天日期
+            "cover": [tender_info.get("project_info", {}), company_info, layout.cover_title,
+                      datetime.now().strftime('%Y-%m-%d')],
+            "toc": [],
+            "company_proof": [company_info],
+            "bid_outline": [],
+            "tech_deviation": [],
+            "commercial_deviation": [],
+            "company_intro": [],
+            "tech_solution": [tender_info.get("product_requirements", [])],
+            "equipment_specs": [file_signature(data_dir / "equipment_specs.json")],
+            "quotation": [quote_data or {}],
+            "qualifications": [qualifications, cert_files, show_cert_images, cert_mode, self.image_width_inches,
+                               get_compression_profile(compression_profile)],
+            "performance": [matched_data.get("cases", [])],
+            "after_sales": [company_info],
+            "tech_commitment": [],
+            "response_commitment": [],
+            "commercial_commitment": [],
+        }
+
+        if COMPANY_CONTENT_AVAILABLE:
+            for key, (_, filename) in COMPANY_CONTENT_SECTIONS.items():
+                inputs[key] = [COMPANY_CONTENT_VERSION, read_temp_file(filename)]
+
+        return inputs
 
     def generate_separate_bids(self, tender_info: Dict, company_info: Dict,
                                matched_data: Dict, quote_data: Dict = None,
-                               show_cert_images: bool = False) -> Dict[str, Path]:
+                               show_cert_images: bool = False,
+                               cert_mode: str = CERT_MODE_IMAGE,
+                               compression_profile: Optional[str] = None) -> Dict[str, Path]:
         """
         生成分开的技术标和商务标
 
@@ -265,26 +377,81 @@ class BidDocumentGenerator:
             matched_data: 匹配的数据（资质、案例、产品等）
             quote_data: 报价数据
             show_cert_images: 是否显示证书图片
+            cert_mode: 证书呈现方式（image: 转图片嵌入; appendix: 原件PDF附录，返回PDF路径，导出失败时改为嵌入图片）
+            compression_profile: 证书图片压缩方案（print/screen/portal），为空时使用默认方案
 
         Returns:
             包含技术标和商务标路径的字典
         """
         # 生成技术标
-        tech_path = self.generate_tech_bid(tender_info, company_info, matched_data, quote_data, show_cert_images)
+        tech_path = self.generate_tech_bid(tender_info, company_info, matched_data, quote_data, show_cert_images,
+                                           cert_mode, compression_profile)
 
         # 生成商务标
-        commercial_path = self.generate_commercial_bid(tender_info, company_info, matched_data, quote_data, show_cert_images)
+        commercial_path = self.generate_commercial_bid(tender_info, company_info, matched_data, quote_data,
+                                                       show_cert_images, cert_mode, compression_profile)
 
         return {
             "tech": tech_path,
             "commercial": commercial_path
         }
 
+    def generate_artifacts(self, tender_info: Dict, company_info: Dict,
+                           matched_data: Dict, quote_data: Dict = None,
+                           separate_bids: bool = True,
+                           show_cert_images: bool = False,
+                           cert_mode: str = CERT_MODE_IMAGE,
+                           compression_profile: Optional[str] = None) -> List[BidArtifact]:
+        """
+        生成投标文件并返回生成结果句柄（供界面直接提供下载）
+
+        Args:
+            separate_bids: 是否分开生成技术标和商务标
+            其余参数同 generate_bid
+
+        Returns:
+            生成结果列表
+        """
+        options = (show_cert_images, cert_mode, compression_profile)
+        if separate_bids:
+            paths = self.generate_separate_bids(tender_info, company_info, matched_data, quote_data, *options)
+            return [
+                BidArtifact.from_path("技术标", paths["tech"]),
+                BidArtifact.from_path("商务标", paths["commercial"]),
+            ]
+
+        path = self.generate_bid(tender_info, company_info, matched_data, quote_data, *options)
+        return [BidArtifact.from_path("投标文件", path)]
+
+    def generate_preview_html(self, tender_info: Dict, company_info: Dict, matched_data: Dict,
+                              separate_bids: bool = True,
+                              thumbnails: Optional[ThumbnailCache] = None) -> str:
+        """
+        渲染界面内预览（HTML，不生成 docx）
+
+        目录由与正式生成相同的布局推导，资质按正式文件的分类列出。
+
+        Args:
+            separate_bids: 是否分开生成技术标和商务标
+            thumbnails: 证书缩略图缓存
+
+        Returns:
+            HTML 字符串
+        """
+        bid_types = ["技术标", "商务标"] if separate_bids else ["单一文件"]
+        qualification_groups = self._split_qualifications(matched_data.get("qualifications", []))
+        data_dir = self.templates_dir.parent / "data"
+        return render_preview_html([get_layout(bid_type) for bid_type in bid_types],
+                                   tender_info, company_info, matched_data,
+                                   qualification_groups, data_dir, thumbnails)
+
     def generate_separate_bids_preview(self, tender_info: Dict, company_info: Dict,
                                       matched_data: Dict) -> Dict[str, Path]:
         """
         生成分开的技术标和商务标（预览版本，简化内容）
 
+        界面内预览请使用 generate_preview_html（不生成 docx）。
+
         Args:
             tender_info: 招标信息
             company_info: 公司信息
@@ -403,6 +570,8 @@ class BidDocumentGenerator:
         """
         生成投标文件（预览版本，简化内容）
 
+        界面内预览请使用 generate_preview_html（不生成 docx）。
+
         Args:
             tender_info: 招标信息
             company_info: 公司信息
@@ -898,7 +1067,9 @@ class BidDocumentGenerator:
 
         doc.add_page_break()
 
-    def _add_qualifications_with_images(self, doc: Document, qualifications: List[Dict], data_dir: Path, show_cert_images: bool = False, bid_type: str = "单一文件"):
+    def _add_qualifications_with_images(self, doc: Document, qualifications: List[Dict], data_dir: Path,
+                                        show_cert_images: bool = False, bid_type: str = "单一文件",
+                                        cert_mode: str = CERT_MODE_IMAGE, compression_profile: Optional[str] = None):
         """
         添加企业资质（支持PDF转图片）
 
@@ -910,13 +1081,37 @@ class BidDocumentGenerator:
         缺点：
         - 需要安装额外库（pdf2image + Pillow + Ghostscript）
         - 文件会大一些
+
+        cert_mode 为 appendix 时只列出证书清单，原件在导出 PDF 后作为附录合并。
         """
+        if cert_mode == CERT_MODE_APPENDIX:
+            self._add_qualifications_index(doc, qualifications, bid_type)
+            return
+
         # 直接使用PDF转图片版本
-        self._add_qualifications_with_pdf_images(doc, qualifications, data_dir, bid_type)
+        self._add_qualifications_with_pdf_images(doc, qualifications, data_dir, bid_type, compression_profile)
 
-    def _add_qualifications_with_pdf_images(self, doc: Document, qualifications: List[Dict], data_dir: Path, bid_type: str = "单一文件"):
+    def _split_qualifications(self, qualifications: List[Dict]) -> List[tuple]:
         """
-        添加企业资质（PDF转图片）
+        按类别拆分资质证书
+
+        Returns:
+            [(小节标题, 证书列表), ...]，前四类每类最多10个，最后一项为有PDF但未分类的“其他证书”
+        """
+        groups = []
+        classified_ids = set()
+        for title, keywords in QUALIFICATION_CATEGORIES:
+            certs = [q for q in qualifications if any(kw in q.get("name", "") for kw in keywords)]
+            classified_ids.update(cert['id'] for cert in certs)
+            groups.append((title, certs[:10]))  # 最多显示10个
+
+        other_certs = [q for q in qualifications if q['id'] not in classified_ids and q.get('cert_file')]
+        groups.append(("其他证书", other_certs))
+        return groups
+
+    def _add_qualifications_index(self, doc: Document, qualifications: List[Dict], bid_type: str = "单一文件"):
+        """
+        添加企业资质清单（附录模式，不插入图片）
         """
         p = doc.add_paragraph()
         title = "资质证书"
@@ -934,91 +1129,99 @@ class BidDocumentGenerator:
             doc.add_page_break()
             return
 
-        # 创建临时目录用于保存转换后的图片（不会被自动删除）
-        import tempfile
-        import json
-        import uuid
-        
-        # 创建持久化的临时目录
-        temp_dir = Path(tempfile.mkdtemp(prefix='bid_gen_certs_'))
-        
-        converted_images = {}
-        total = 0
-        success = 0
-        failed = 0
-        
-        for i, cert in enumerate(qualifications, 1):
-            if not cert.get('cert_file'):
-                continue
-            
-            cert_path = data_dir / cert['cert_file']
-            if not cert_path.exists():
-                print(f"✗ 证书文件不存在: {cert['cert_file']}")
-                failed += 1
-                total += 1
+        doc.add_paragraph("以下证书原件按类别附于本文件末尾“附录：资质证书原件”，可通过PDF书签直接定位。")
+        doc.add_paragraph()
+
+        for i, (group_title, certs) in enumerate(self._split_qualifications(qualifications), 1):
+            if not certs:
                 continue
-            
-            # 转换PDF为图片
-            try:
-                # 不使用 output_folder 参数，返回图片对象
-                images = convert_from_path(
-                    str(cert_path),
-                    first_page=1, last_page=1,
-                    dpi=200,  # 分辨率，200dpi打印效果较好
-                    fmt='jpg',  # 输出为JPG格式
-                    use_cropbox=True
-                )
-                
-                if images:
-                    # 调整图片大小
-                    img = images[0]
-                    img_width, img_height = img.size
-                    
-                    # 如果图片太宽，调整宽度
-                    target_width = 500  # 目标宽度500像素
-                    if img_width > target_width:
-                        ratio = target_width / img_width
-                        new_height = int(img_height * ratio)
-                        img = img.resize((target_width, new_height), PILImage.LANCZOS)
-                    
-                    # 保存到临时目录（使用唯一文件名）
-                    img_filename = f"{cert['id']}_{uuid.uuid4().hex[:8]}.jpg"
-                    img_path = temp_dir / img_filename
-                    img.save(img_path, quality=85)
-                    
-                    converted_images[cert['id']] = {
-                        'name': cert['name'],
-                        'level': cert['level'],
-                        'images': [img_path]  # 保存图片路径
-                    }
-                    success += 1
-                    print(f"✓ 证书 {i} 转换成功: {cert['name']}")
-                else:
-                    converted_images[cert['id']] = {
-                        'name': cert['name'],
-                        'level': cert['level'],
-                        'images': [],
-                        'error': '转换失败'
-                    }
-                    failed += 1
-            except Exception as e:
-                print(f"✗ 证书 {i} 转换失败: {e}")
-                import traceback
-                traceback.print_exc()
-                converted_images[cert['id']] = {
-                    'name': cert['name'],
-                    'level': cert['level'],
-                    'images': [],
-                    'error': str(e)
-                }
-                failed += 1
-            
-            total += 1
-            
-            if total > 0 and total % 5 == 0:
-                print(f"进度: {i}/{len(qualifications)}")
-        
-        print(f"转换完成: 总计 {total}, 成功 {success}, 失败 {failed}")
+
+            p = doc.add_paragraph()
+            run = p.add_run(f"3.{i} {group_title}")
+            run.bold = True
+            run.font.size = Pt(14)
+            run.font.name = "宋体"
+
+            doc.add_paragraph()
+
+            for cert in certs:
+                p = doc.add_paragraph()
+                run = p.add_run(f"• {cert['name']}（{cert.get('level', '')}）")
+                run.bold = True
+                if cert.get('cert_no'):
+                    doc.add_paragraph(f"  证书编号：{cert['cert_no']}")
+                if cert.get('valid_until'):
+                    doc.add_paragraph(f"  有效期至：{cert['valid_until']}")
+                if cert.get('cert_file'):
+                    doc.add_paragraph("  （证书原件见附录）")
+
+            doc.add_paragraph()
+
+        doc.add_page_break()
+
+    def _export_with_cert_appendix(self, docx_path: Path, qualifications: List[Dict]) -> Optional[Path]:
+        """
+        将投标文件导出为PDF，并把证书原件PDF作为带书签的附录合并到末尾
+
+        Returns:
+            合并后的PDF路径；正文导出失败（如未安装 LibreOffice）时删除docx并返回 None
+        """
+        from pdf_appendix import export_docx_to_pdf, build_certificate_appendix
+
+        data_dir = self.templates_dir.parent / "data"
+        export_dir = Path(tempfile.mkdtemp(prefix='bid_gen_pdf_'))
+        try:
+            body_pdf = export_docx_to_pdf(docx_path, export_dir)
+            if not body_pdf:
+                print("⚠️ 正文导出PDF失败，改为嵌入证书图片重新生成")
+                docx_path.unlink(missing_ok=True)
+                return None
+
+            output_path = docx_path.with_suffix('.pdf')
+            groups = [group for group in self._split_qualifications(qualifications) if group[1]]
+            build_certificate_appendix(body_pdf, groups, data_dir, output_path)
+            return output_path
+        finally:
+            import shutil
+            shutil.rmtree(export_dir, ignore_errors=True)
+
+    def _add_qualifications_with_pdf_images(self, doc: Document, qualifications: List[Dict], data_dir: Path,
+                                            bid_type: str = "单一文件", compression_profile: Optional[str] = None):
+        """
+        添加企业资质（PDF转图片）
+
+        图片编码由压缩方案决定；方案设置了目标文档大小时，逐张降低图片质量以满足目标。
+        """
+        p = doc.add_paragraph()
+        title = "资质证书"
+        if CHAPTER_NUMBERS_AVAILABLE:
+            title = get_chapter_title(title, bid_type)
+        run = p.add_run(title)
+        run.bold = True
+        run.font.size = Pt(16)
+        run.font.name = "黑体"
+
+        doc.add_paragraph()
+
+        if not qualifications:
+            doc.add_paragraph("（具体资质文件详见附件）")
+            doc.add_page_break()
+            return
+
+        # 优先直接提取扫描件内嵌图片，矢量/多对象页面才栅格化
+        # 图片按页缓存在渲染缓存目录，只转换各证书选中的页面
+        converter = CertificateImageConverter(dpi=200, cache_dir=self.cert_cache_dir, profile=compression_profile)
+        converted_images = converter.convert_certificates(qualifications, data_dir)
+
+        if converter.profile.get("target_size_mb"):
+            budget = int(converter.profile["target_size_mb"] * 1024 * 1024) - DOCUMENT_OVERHEAD_BYTES
+            all_images = [img for result in converted_images.values() for img in result['images']]
+            adjusted = converter.fit_to_budget(all_images, budget)
+            for result in converted_images.values():
+                result['images'] = [adjusted[img] for img in result['images']]
+
+        sections = self._split_qualifications(qualifications)
+        (_, system_certs), (_, credit_certs), (_, honor_certs), (_, partner_certs), (_, other_certs_with_images) = sections
 
         # 3.1 体系认证证书
         p = doc.add_paragraph()
@@ -1029,10 +1232,7 @@ class BidDocumentGenerator:
 
         doc.add_paragraph()
 
-        # 过滤出体系认证
-        system_certs = [q for q in qualifications if "体系" in q.get("name", "") or "认证" in q.get("name", "")]
-
-        for cert in system_certs[:10]:  # 最多显示10个
+        for cert in system_certs:  # 最多显示10个
             images = converted_images.get(cert['id'], {}).get('images', [])
             
             # 显示证书名称
@@ -1067,10 +1267,7 @@ class BidDocumentGenerator:
 
         doc.add_paragraph()
 
-        # 过滤出信用等级
-        credit_certs = [q for q in qualifications if "AAA" in q.get("name", "") or "信用" in q.get("name", "")]
-
-        for cert in credit_certs[:10]:
+        for cert in credit_certs:
             images = converted_images.get(cert['id'], {}).get('images', [])
             
             p = doc.add_paragraph()
@@ -1102,10 +1299,7 @@ class BidDocumentGenerator:
 
         doc.add_paragraph()
 
-        # 过滤出省级荣誉
-        honor_certs = [q for q in qualifications if "重点" in q.get("name", "") or "质量奖" in q.get("name", "")]
-
-        for cert in honor_certs[:10]:
+        for cert in honor_certs:
             images = converted_images.get(cert['id'], {}).get('images', [])
             
             p = doc.add_paragraph()
@@ -1137,10 +1331,7 @@ class BidDocumentGenerator:
 
         doc.add_paragraph()
 
-        # 过滤出合作伙伴
-        partner_certs = [q for q in qualifications if "授权" in q.get("name", "") or "合作" in q.get("name", "")]
-
-        for cert in partner_certs[:10]:
+        for cert in partner_certs:
             images = converted_images.get(cert['id'], {}).get('images', [])
             
             p = doc.add_paragraph()
@@ -1158,11 +1349,7 @@ class BidDocumentGenerator:
         
         doc.add_paragraph()
 
-        # 3.5 其他证书
-        # 找出没有被分类的证书，但需要有 PDF 的才显示图片
-        classified_ids = set(cert['id'] for cert in system_certs + credit_certs + honor_certs + partner_certs)
-        other_certs_with_images = [q for q in qualifications if q['id'] not in classified_ids and q.get('cert_file')]
-
+        # 3.5 其他证书（没有被分类、但有 PDF 的证书）
         if other_certs_with_images:
             p = doc.add_paragraph()
             run = p.add_run("3.5 其他证书")
@@ -1194,16 +1381,23 @@ class BidDocumentGenerator:
                         doc.add_paragraph(f"  （图片插入失败: {e}）")
                         print(f"✗ 图片插入失败: {img_path} - {e}")
 
-        # 清理临时图片目录
-        try:
-            import shutil
-            shutil.rmtree(temp_dir, ignore_errors=True)
-            print("✓ 已清理临时图片文件")
-        except Exception as e:
-            print(f"✗ 清理临时目录失败: {e}")
+        self._report_cert_image_sizes(sections, converted_images, converter.profile)
 
         doc.add_page_break()
 
+    def _report_cert_image_sizes(self, sections: List[tuple], converted_images: Dict, profile: Dict):
+        """输出各证书小节嵌入图片的大小"""
+        print(f"证书图片大小（压缩方案: {profile['label']}）:")
+        total = 0
+        for number, (title, certs) in enumerate(sections, 1):
+            images = [img for cert in certs for img in converted_images.get(cert['id'], {}).get('images', [])]
+            if not images:
+                continue
+            size = sum(Path(img).stat().st_size for img in images)
+            total += size
+            print(f"  3.{number} {title}: {len(images)} 张, {format_size(size)}")
+        print(f"  合计: {format_size(total)}")
+
     def _add_equipment_specs_table(self, doc: Document, data_dir: Path, bid_type: str = "单一文件"):
         """添加设备说明一览表"""
         p = doc.add_paragraph()
@@ -1232,6 +1426,9 @@ class BidDocumentGenerator:
                     doc.add_page_break()
                     return
                 
+                # 行数记入生成指标（耗时预估）
+                current_span().set(equipment_rows=len(equipment_specs))
+
                 # 按类别分组
                 categories = {}
                 for equipment in equipment_specs:
@@ -1635,11 +1832,11 @@ class BidDocumentGenerator:
         doc.add_page_break()
 
     def _add_table_of_contents(self, doc: Document, separate_bids: bool = False, bid_type: str = "单一文件"):
-        """添加目录（动态生成）
+        """添加目录（由 bid_layout 中的章节布局生成）
         
         Args:
             doc: 文档对象
-            separate_bids: 是否分开技术标和商务标
+            separate_bids: 是否分开技术标和商务标（保留参数，目录只由 bid_type 决定）
             bid_type: 投标类型（单一文件、技术标、商务标）
         """
         doc.add_page_break()
@@ -1654,66 +1851,8 @@ class BidDocumentGenerator:
 
         doc.add_paragraph()
 
-        # 动态生成目录内容
-        contents = []
-        
-        if separate_bids and bid_type == "技术标":
-            # 技术标目录
-            contents.extend([
-                ("1.1", "封面", "1"),
-                ("1.2", "目录", "2"),
-                ("1.3", "公司概况", "3"),
-                ("1.4", "投标纲领", "4"),
-                ("1.5", "技术偏离表", "5"),
-                ("1.6", "公司简介", "6"),
-                ("1.7", "技术方案", "7"),
-                ("1.8", "近三年无重大违法记录声明", "8"),
-                ("1.9", "质量控制专项方案", "9"),
-                ("1.10", "安全保证", "10"),
-                ("1.11", "设备说明一览表", "11"),
-                ("1.12", "供货组织及进度计划", "12"),
-                ("1.13", "技术培训、售后服务", "13"),
-                ("1.14", "资质证书", "14"),
-                ("1.15", "项目案例", "15"),
-                ("1.16", "技术承诺", "16"),
-                ("1.17", "响应承诺", "17"),
-            ])
-        elif separate_bids and bid_type == "商务标":
-            # 商务标目录
-            contents.extend([
-                ("1.1", "封面", "1"),
-                ("1.2", "公司概况", "2"),
-                ("1.3", "投标纲领", "3"),
-                ("1.4", "商务偏离表", "4"),
-                ("1.5", "公司简介", "5"),
-                ("1.6", "响应承诺", "6"),
-                ("1.7", "报价说明", "7"),
-                ("1.8", "资质证书", "8"),
-                ("1.9", "项目案例", "9"),
-                ("1.10", "售后服务", "10"),
-                ("1.11", "商务承诺", "11"),
-            ])
-        else:
-            # 单一文件
-            contents.extend([
-                ("1.", "封面", "1"),
-                ("2.", "公司概况", "2"),
-                ("3.", "公司简介", "3"),
-                ("4.", "公司资质", "4"),
-                ("5.", "公司业绩", "5"),
-                ("6.", "投标纲领", "6"),
-                ("7.", "技术偏离表", "7"),
-                ("8.", "公司概况", "8"),
-                ("9.", "技术方案", "9"),
-                ("10.", "设备说明一览表", "10"),
-                ("11.", "资质证书", "11"),
-                ("12.", "项目案例", "12"),
-                ("13.", "报价说明", "13"),
-                ("14.", "售后服务", "14"),
-                ("15.", "技术承诺", "15"),
-                ("16.", "响应承诺", "16"),
-                ("17.", "商务承诺", "17"),
-            ])
+        # 目录条目由布局推导，与章节标题编号一致
+        contents = get_layout(bid_type).toc_entries()
 
         # 创建表格形式的目录
         table = doc.add_table(rows=0, cols=3)
@@ -1763,9 +1902,10 @@ class BidDocumentGenerator:
             run._r.append(instrText)
             run._r.append(fldChar2)
 
-            # 添加页码前后缀
-            run._element.insertbefore(footer_para.add_run("第 ")._element, run._element[0])
-            run._element.append(footer_para.add_run(" 页")._element)
+            # 添加页码前后缀（作为页码域前后的同级 run）
+            prefix = footer_para.add_run("第 ")
+            run._r.addprevious(prefix._r)
+            footer_para.add_run(" 页")
 
 
 # 测试代码
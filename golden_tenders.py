@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+端到端性能回归测试（固定招标文件包）
+
+按固定随机种子在本地生成几套有代表性的招标文件包（多个 PDF/DOCX，页数接近实际）
+和一份包含几十个证书 PDF 的公司资料，对每个文件包运行完整的 解析 → 匹配 → 分开生成技术标和商务标，
+记录总耗时、峰值内存、输出大小，与提交在仓库中的基准（golden_baseline.json）对比：
+- 任一指标超过基准的容差（见 GOLDEN_CONFIG）视为退化
+- 输出结构（章节标题、各表格行数、图片数量）与基准不同视为退化
+
+每次运行在新的子进程中进行（峰值内存互不影响），证书渲染缓存、章节缓存为空。
+基准中记录了运行环境，环境不同时耗时和内存只作提示，不判为退化。
+
+用法：
+    python golden_tenders.py                    # 运行并与基准对比，有退化时退出码为 1
+    python golden_tenders.py --update-baseline  # 运行并更新基准（有意的改动之后）
+    python golden_tenders.py substation         # 只运行指定文件包
+    python golden_tenders.py --repeat 1         # 每个文件包运行次数
+"""
+
+import difflib
+import json
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import BASE_DIR, GOLDEN_BASELINE_PATH, GOLDEN_CONFIG, GOLDEN_DIR
+from synthetic_data import build_company_data, cjk_font, write_tender
+
+# 测试数据生成方式变化时加一，已生成的文件包会重新生成
+CORPUS_VERSION = 2
+
+# 招标文件包 {名称: {'project_name', 'files': [(文件名, 页数), ...], 'compression_profile': 证书压缩方案}}
+GOLDEN_PACKAGES = {
+    "substation": {
+        "project_name": "城南110kV变电站配电设备采购项目",
+        "files": [("招标公告.pdf", 8), ("技术规范书.docx", 40), ("商务条款.pdf", 20)],
+        "compression_profile": "print",
+    },
+    "distribution": {
+        "project_name": "工业园区配电房改造工程",
+        "files": [("招标文件.docx", 60)],
+        "compression_profile": None,
+    },
+    "prefab": {
+        "project_name": "新能源场站预制舱式二次设备采购项目",
+        "files": [("招标文件.pdf", 80), ("技术要求.docx", 15)],
+        "compression_profile": "portal",
+    },
+}
+
+# 公司资料规模（资质数见 GOLDEN_CONFIG['certificates']，均有证书 PDF）
+GOLDEN_COMPANY = {"cases": 40, "products": 30, "personnel": 4, "equipment_rows": 200}
+
+
+def build_corpus(corpus_dir: Optional[Path] = None, seed: Optional[int] = None) -> Path:
+    """
+    生成招标文件包和公司资料（种子和版本相同的已生成过时直接复用）
+
+    目录结构：data/（公司资料）、templates/（空，生成器据此定位 data/）、tenders/<文件包>/、manifest.json
+    """
+    seed = seed if seed is not None else GOLDEN_CONFIG["seed"]
+    corpus_dir = corpus_dir or GOLDEN_DIR / f"seed{seed}"
+    manifest_path = corpus_dir / "manifest.json"
+    if manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest.get("version") == CORPUS_VERSION:
+            return corpus_dir
+
+    print(f"🔄 生成测试数据: {corpus_dir}")
+    shutil.rmtree(corpus_dir, ignore_errors=True)
+    (corpus_dir / "templates").mkdir(parents=True)
+    build_company_data(corpus_dir / "data", seed=seed, qualifications=GOLDEN_CONFIG["certificates"],
+                       **GOLDEN_COMPANY)
+
+    font = cjk_font()
+    for name, package in GOLDEN_PACKAGES.items():
+        package_dir = corpus_dir / "tenders" / name
+        package_dir.mkdir(parents=True)
+        rng = random.Random(f"{seed}:{name}")
+        for filename, pages in package["files"]:
+            write_tender(package_dir / filename, package["project_name"], pages, rng, font)
+
+    manifest = {"version": CORPUS_VERSION, "seed": seed, "pdf_font": font}
+    manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return corpus_dir
+
+
+def document_structure(path: Path) -> Dict:
+    """
+    输出文件结构
+
+    Returns:
+        {'headings': 章节标题（加粗且不小于 14 磅的段落）, 'tables': 各表格行数, 'images': 图片数量}
+    """
+    from docx import Document
+
+    doc = Document(str(path))
+    headings = []
+    for paragraph in doc.paragraphs:
+        runs = [run for run in paragraph.runs if run.text.strip()]
+        if runs and all(run.bold and run.font.size and run.font.size.pt >= 14 for run in runs):
+            headings.append(paragraph.text.strip())
+    return {
+        "headings": headings,
+        "tables": [len(table.rows) for table in doc.tables],
+        "images": len(doc.inline_shapes),
+    }
+
+
+def run_package(corpus_dir: Path, package: str, work_dir: Path) -> Dict:
+    """
+    在当前进程中运行一个文件包（由子进程调用）
+
+    Returns:
+        {'wall_seconds', 'timings', 'peak_rss_mb', 'requirements', 'qualifications', 'outputs': {标签: {'bytes', 'structure'}}}
+    """
+    from database import CompanyDatabase
+    from generator import BidDocumentGenerator
+    from memory_profile import peak_rss_mb
+    from output_store import OutputStore
+    from parser import TenderParser
+    from pipeline import run_pipeline
+
+    spec = GOLDEN_PACKAGES[package]
+    package_dir = corpus_dir / "tenders" / package
+    files = [package_dir / filename for filename, _ in spec["files"]]
+
+    generator = BidDocumentGenerator(corpus_dir / "templates", work_dir / "output")
+    generator.section_cache = None
+    generator.output_store = OutputStore(work_dir / "store")
+    generator.cert_cache_dir = work_dir / "cert_cache"
+    (work_dir / "output").mkdir(parents=True, exist_ok=True)
+    db = CompanyDatabase(corpus_dir / "data")
+    parser = TenderParser(corpus_dir / "data")
+
+    start = time.perf_counter()
+    result = run_pipeline(files, parser, db, generator, compression_profile=spec["compression_profile"])
+    wall_seconds = time.perf_counter() - start
+
+    return {
+        "wall_seconds": wall_seconds,
+        "timings": result["timings"],
+        "peak_rss_mb": peak_rss_mb(),
+        "requirements": len(result["tender_info"]["requirements"]),
+        "qualifications": len(result["matched_data"]["qualifications"]),
+        "outputs": {
+            artifact.label: {"bytes": artifact.size, "structure": document_structure(artifact.path)}
+            for artifact in result["artifacts"]
+        },
+    }
+
+
+_RESULT_PREFIX = "GOLDEN_RESULT "
+
+
+def measure_package(corpus_dir: Path, package: str, repeat: Optional[int] = None) -> Dict:
+    """
+    在新的子进程中多次运行一个文件包
+
+    Returns:
+        同 run_package，耗时和内存取各次的中位数，另有 'runs': 各次总耗时
+    """
+    repeat = repeat or GOLDEN_CONFIG["repeat"]
+    runs = []
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as work_dir:
+            completed = subprocess.run(
+                [sys.executable, str(Path(__file__).resolve()), "--worker", str(corpus_dir), package, work_dir],
+                cwd=BASE_DIR, capture_output=True, text=True, timeout=1800
+            )
+        lines = [line for line in completed.stdout.splitlines() if line.startswith(_RESULT_PREFIX)]
+        if completed.returncode != 0 or not lines:
+            raise RuntimeError(f"{package} 运行失败:\n{completed.stderr[-2000:]}")
+        runs.append(json.loads(lines[-1][len(_RESULT_PREFIX):]))
+
+    result = dict(runs[0])
+    result["wall_seconds"] = statistics.median(run["wall_seconds"] for run in runs)
+    result["peak_rss_mb"] = statistics.median(run["peak_rss_mb"] for run in runs)
+    result["timings"] = {stage: statistics.median(run["timings"][stage] for run in runs) for stage in runs[0]["timings"]}
+    result["runs"] = [run["wall_seconds"] for run in runs]
+    return result
+
+
+def environment() -> Dict:
+    """影响耗时和输出的运行环境"""
+    from cert_images import find_rasterizer
+
+    rasterizer = find_rasterizer()
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "rasterizer": rasterizer[0] if rasterizer else None,
+    }
+
+
+def run_golden(packages: Optional[List[str]] = None, repeat: Optional[int] = None,
+               corpus_dir: Optional[Path] = None) -> Dict:
+    """
+    运行固定文件包
+
+    Returns:
+        {'environment', 'corpus': manifest, 'packages': {文件包: measure_package()}}
+    """
+    corpus_dir = build_corpus(corpus_dir)
+    results = {}
+    for package in packages or list(GOLDEN_PACKAGES):
+        result = measure_package(corpus_dir, package, repeat)
+        results[package] = result
+        sizes = "、".join(f"{label} {output['bytes'] / 1024:.0f}KB" for label, output in result["outputs"].items())
+        print(f"✓ {package}: {result['wall_seconds']:.2f}s，峰值内存 {result['peak_rss_mb']:.0f}MB，{sizes}")
+    return {
+        "environment": environment(),
+        "corpus": json.loads((corpus_dir / "manifest.json").read_text(encoding="utf-8")),
+        "packages": results,
+    }
+
+
+def _structure_diff(base: Dict, current: Dict) -> List[str]:
+    """结构差异的说明"""
+    diffs = []
+    if base["headings"] != current["headings"]:
+        changes = [line for line in difflib.unified_diff(base["headings"], current["headings"], lineterm="", n=0)
+                   if line[:1] in "+-" and not line.startswith(("+++", "---"))]
+        diffs.append(f"章节标题变化: {'；'.join(changes[:6])}{' …' if len(changes) > 6 else ''}")
+    if base["tables"] != current["tables"]:
+        diffs.append(f"表格行数 {base['tables']} → {current['tables']}")
+    if base["images"] != current["images"]:
+        diffs.append(f"图片数量 {base['images']} → {current['images']}")
+    return diffs
+
+
+def _output_diffs(base_outputs: Dict, outputs: Dict) -> List[str]:
+    """逐个输出文件对比大小和结构"""
+    diffs = []
+    for label, output in outputs.items():
+        base_output = base_outputs.get(label)
+        if base_output is None:
+            diffs.append(f"基准中没有{label}")
+            continue
+        if output["bytes"] > base_output["bytes"] * (1 + GOLDEN_CONFIG["size_tolerance"]):
+            diffs.append(f"{label}大小 {base_output['bytes'] / 1024:.0f}KB → {output['bytes'] / 1024:.0f}KB")
+        diffs.extend(f"{label}{diff}" for diff in _structure_diff(base_output["structure"], output["structure"]))
+    for label in set(base_outputs) - set(outputs):
+        diffs.append(f"缺少{label}")
+    return diffs
+
+
+def compare_to_baseline(results: Dict, baseline: Dict) -> Dict:
+    """
+    与基准对比
+
+    Returns:
+        {'regressions': [退化说明, ...], 'warnings': [提示, ...]}
+    """
+    regressions, warnings = [], []
+    same_environment = results["environment"] == baseline.get("environment")
+    if not same_environment:
+        warnings.append("基准在不同环境下生成，耗时和内存只作提示（可用 --update-baseline 在本机重新生成）")
+    if results["corpus"] != baseline.get("corpus"):
+        warnings.append(f"测试数据与基准不同（基准 {baseline.get('corpus')}，本次 {results['corpus']}）")
+
+    checks = [("wall_seconds", "总耗时", "time_tolerance", "{:.2f}s", same_environment),
+              ("peak_rss_mb", "峰值内存", "memory_tolerance", "{:.0f}MB", same_environment)]
+    for package, current in results["packages"].items():
+        base = baseline.get("packages", {}).get(package)
+        if base is None:
+            warnings.append(f"{package}: 基准中没有此文件包")
+            continue
+
+        for key, label, tolerance_key, fmt, enforce in checks:
+            limit = base[key] * (1 + GOLDEN_CONFIG[tolerance_key])
+            if current[key] > limit:
+                message = (f"{package}: {label} {fmt.format(base[key])} → {fmt.format(current[key])}"
+                           f"（+{(current[key] / base[key] - 1) * 100:.0f}%，容差 {GOLDEN_CONFIG[tolerance_key] * 100:.0f}%）")
+                (regressions if enforce else warnings).append(message)
+
+        regressions.extend(f"{package}: {diff}" for diff in _output_diffs(base["outputs"], current["outputs"]))
+    return {"regressions": regressions, "warnings": warnings}
+
+
+def load_baseline(path: Optional[Path] = None) -> Optional[Dict]:
+    path = path or GOLDEN_BASELINE_PATH
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def save_baseline(results: Dict, path: Optional[Path] = None) -> Path:
+    path = path or GOLDEN_BASELINE_PATH
+    path.write_text(json.dumps(results, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+    return path
+
+
+def main():
+    args = sys.argv[1:]
+    if args[:1] == ["--worker"]:
+        corpus_dir, package, work_dir = args[1:4]
+        result = run_package(Path(corpus_dir), package, Path(work_dir))
+        print(_RESULT_PREFIX + json.dumps(result, ensure_ascii=False))
+        return
+
+    repeat = None
+    if "--repeat" in args:
+        index = args.index("--repeat")
+        repeat = int(args[index + 1])
+        del args[index:index + 2]
+    update = "--update-baseline" in args
+    packages = [arg for arg in args if arg != "--update-baseline"]
+    unknown = [name for name in packages if name not in GOLDEN_PACKAGES]
+    if unknown:
+        print(f"✗ 未知的文件包: {', '.join(unknown)}，可选: {', '.join(GOLDEN_PACKAGES)}")
+        sys.exit(2)
+
+    results = run_golden(packages or None, repeat)
+    baseline = load_baseline()
+
+    if update:
+        if baseline is not None and packages:
+            # 只运行了部分文件包时保留其余文件包的基准
+            baseline["packages"].update(results["packages"])
+            results["packages"] = baseline["packages"]
+        print(f"✓ 基准已更新: {save_baseline(results)}")
+        return
+
+    if baseline is None:
+        print(f"⚠️ 没有基准文件 {GOLDEN_BASELINE_PATH.name}，请先运行 --update-baseline")
+        sys.exit(1)
+
+    report = compare_to_baseline(results, baseline)
+    for warning in report["warnings"]:
+        print(f"⚠️ {warning}")
+    for regression in report["regressions"]:
+        print(f"✗ {regression}")
+    if report["regressions"]:
+        sys.exit(1)
+    print("✓ 与基准一致")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+并发压力测试
+
+模拟多个销售同时使用：N 个用户线程共用同一套解析器、数据库和生成器（与 Streamlit 同一进程内的多个会话相同），
+每个用户反复执行 思考 → 上传解析 → 匹配 → 分开生成技术标和商务标，思考时间按指数分布随机。
+并发用户数逐级增加（见 LOAD_TEST_CONFIG），每级报告：
+- 吞吐量（每分钟完成的流程数）、延迟分位数（p50/p90/p95/p99）和各步骤耗时中位数
+- CPU 使用率（本进程及其子进程，按 CPU 核数折算）
+- 证书转换队列长度、同时运行的栅格化进程数、正在生成的文件数（采样 metrics_exporter 中的指标）
+最后给出拐点：吞吐量仍随用户数增长、p95 延迟未明显上升的最大并发用户数。
+
+测试数据由 synthetic_data.py 按随机种子生成；开始前先运行一次流程预热证书渲染缓存（同服务预热）。
+
+用法：
+    python load_test.py                           # 默认逐级 1/2/4/8/16 个用户，每级 60 秒
+    python load_test.py --users 1,2,4 --duration 30 --think 2
+    python load_test.py --output result.json      # 结果文件，默认写入 cache/load_tests/
+"""
+
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from contextlib import redirect_stdout
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import LOAD_TEST_CONFIG, LOAD_TEST_DIR
+from metrics_store import percentile
+
+
+def _cpu_seconds() -> float:
+    """本进程及已结束子进程（pdftoppm/Ghostscript）的 CPU 时间"""
+    times = os.times()
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class Workload:
+    """压力测试的测试数据和共用的服务（解析器、数据库、生成器）"""
+
+    def __init__(self, work_dir: Path, seed: Optional[int] = None, certificates: Optional[int] = None,
+                 tenders: Optional[int] = None, tender_pages: Optional[int] = None):
+        from database import CompanyDatabase
+        from generator import BidDocumentGenerator
+        from output_store import OutputStore
+        from parser import TenderParser
+        from section_cache import SectionCache
+        from synthetic_data import build_company_data, build_tenders
+
+        seed = seed if seed is not None else LOAD_TEST_CONFIG["seed"]
+        data_dir = build_company_data(work_dir / "data", seed=seed,
+                                      qualifications=certificates or LOAD_TEST_CONFIG["certificates"])
+        paths = build_tenders(work_dir / "tenders", seed=seed, formats=["pdf", "docx"],
+                              pages=tender_pages or LOAD_TEST_CONFIG["tender_pages"],
+                              count=tenders or LOAD_TEST_CONFIG["tenders"])
+        # 同名的 PDF 和 DOCX 为一个招标文件包
+        packages: Dict[str, List[Path]] = {}
+        for path in paths:
+            packages.setdefault(path.stem, []).append(path)
+        self.packages = list(packages.values())
+
+        (work_dir / "templates").mkdir(exist_ok=True)
+        (work_dir / "output").mkdir(exist_ok=True)
+        self.db = CompanyDatabase(data_dir)
+        self.parser = TenderParser(data_dir)
+        self.generator = BidDocumentGenerator(work_dir / "templates", work_dir / "output")
+        self.generator.section_cache = SectionCache(work_dir / "sections")
+        self.generator.output_store = OutputStore(work_dir / "store")
+        self.generator.cert_cache_dir = work_dir / "cert_cache"
+
+    def run_once(self, files: List[Path], project_name: str) -> Dict:
+        """
+        运行一次完整流程；生成的文件随即删除（相当于用户已下载）
+
+        Returns:
+            {'timings', 'bytes'}
+        """
+        from pipeline import run_pipeline
+
+        result = run_pipeline(files, self.parser, self.db, self.generator, project_name=project_name)
+        size = 0
+        for artifact in result["artifacts"]:
+            size += artifact.size
+            if artifact.path:
+                artifact.path.unlink(missing_ok=True)
+        return {"timings": result["timings"], "bytes": size}
+
+
+class _Sampler(threading.Thread):
+    """定期采样 CPU 使用率、证书转换队列、栅格化进程数和正在生成的文件数"""
+
+    def __init__(self, interval: float):
+        super().__init__(name="load-test-sampler", daemon=True)
+        self.interval = interval
+        self.samples: List[Dict] = []
+        self._stop_event = threading.Event()
+
+    def run(self):
+        from metrics_exporter import CERT_QUEUE_DEPTH, GENERATIONS_IN_PROGRESS, RASTERIZER_PROCESSES
+
+        cpu_count = os.cpu_count() or 1
+        last_wall, last_cpu = time.monotonic(), _cpu_seconds()
+        while not self._stop_event.wait(self.interval):
+            wall, cpu = time.monotonic(), _cpu_seconds()
+            self.samples.append({
+                "cpu": (cpu - last_cpu) / max(wall - last_wall, 1e-6) / cpu_count,
+                "cert_queue": CERT_QUEUE_DEPTH.value(source="generate") + CERT_QUEUE_DEPTH.value(source="prerender"),
+                "rasterizers": RASTERIZER_PROCESSES.value(),
+                "generating": GENERATIONS_IN_PROGRESS.value(),
+            })
+            last_wall, last_cpu = wall, cpu
+
+    def stop(self) -> List[Dict]:
+        self._stop_event.set()
+        self.join()
+        return self.samples
+
+
+def _simulate_user(workload: Workload, user: int, deadline: float, think_seconds: float,
+                   rng: random.Random, records: List[Dict], lock: threading.Lock):
+    """一个用户：思考后选一个招标文件包运行完整流程，直到到达截止时间"""
+    iteration = 0
+    while True:
+        think = rng.expovariate(1 / think_seconds) if think_seconds > 0 else 0
+        if time.monotonic() + think >= deadline:
+            return
+        time.sleep(think)
+        iteration += 1
+        files = rng.choice(workload.packages)
+        # 每次的项目名称不同，避免确定性模式直接复用之前生成的文件
+        project_name = f"压力测试项目-用户{user + 1}-{iteration}"
+        record = {"user": user}
+        start = time.perf_counter()
+        try:
+            record.update(workload.run_once(files, project_name), status="ok")
+        except Exception as e:
+            record.update(status="error", error=str(e))
+        record["latency"] = time.perf_counter() - start
+        with lock:
+            records.append(record)
+
+
+def summarize_level(users: int, elapsed: float, records: List[Dict], samples: List[Dict], cpu_seconds: float) -> Dict:
+    """
+    汇总一级的结果
+
+    Returns:
+        {'users', 'elapsed', 'completed', 'errors', 'throughput'（次/分钟）, 'latency': {'p50', 'p90', 'p95', 'p99', 'max'},
+         'stages': {步骤: 中位数}, 'cpu': {'utilization', 'p95'}, 'cert_queue': {'mean', 'max'},
+         'rasterizers_max', 'generating_max'}
+    """
+    ok = [record for record in records if record["status"] == "ok"]
+    latencies = [record["latency"] for record in ok]
+    stages = {}
+    for stage in ("parse", "match", "generate"):
+        values = [record["timings"][stage] for record in ok]
+        stages[stage] = statistics.median(values) if values else None
+    cpu_samples = [sample["cpu"] for sample in samples]
+    queue_samples = [sample["cert_queue"] for sample in samples]
+    return {
+        "users": users,
+        "elapsed": elapsed,
+        "completed": len(ok),
+        "errors": len(records) - len(ok),
+        "throughput": len(ok) / elapsed * 60 if elapsed else 0.0,
+        "latency": {
+            "p50": percentile(latencies, 50), "p90": percentile(latencies, 90),
+            "p95": percentile(latencies, 95), "p99": percentile(latencies, 99),
+            "max": max(latencies) if latencies else None,
+        },
+        "stages": stages,
+        "cpu": {
+            "utilization": cpu_seconds / elapsed / (os.cpu_count() or 1) if elapsed else 0.0,
+            "p95": percentile(cpu_samples, 95),
+        },
+        "cert_queue": {
+            "mean": statistics.mean(queue_samples) if queue_samples else 0.0,
+            "max": max(queue_samples, default=0.0),
+        },
+        "rasterizers_max": max((sample["rasterizers"] for sample in samples), default=0.0),
+        "generating_max": max((sample["generating"] for sample in samples), default=0.0),
+    }
+
+
+def run_level(workload: Workload, users: int, duration: float, think_seconds: float,
+              seed: int = 0, sample_interval: Optional[float] = None) -> Dict:
+    """
+    以指定并发用户数运行一级
+
+    Returns:
+        summarize_level 的结果
+    """
+    records: List[Dict] = []
+    lock = threading.Lock()
+    sampler = _Sampler(sample_interval or LOAD_TEST_CONFIG["sample_interval"])
+    start_wall, start_cpu = time.monotonic(), _cpu_seconds()
+    deadline = start_wall + duration
+    threads = [
+        threading.Thread(target=_simulate_user, name=f"load-test-user-{user + 1}",
+                         args=(workload, user, deadline, think_seconds,
+                               random.Random(f"{seed}:{users}:{user}"), records, lock))
+        for user in range(users)
+    ]
+    sampler.start()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    samples = sampler.stop()
+    elapsed = time.monotonic() - start_wall
+    return summarize_level(users, elapsed, records, samples, _cpu_seconds() - start_cpu)
+
+
+def find_knee(levels: List[Dict], latency_factor: Optional[float] = None,
+              min_throughput_gain: Optional[float] = None) -> Optional[int]:
+    """
+    拐点：吞吐量仍随用户数增长、p95 延迟不超过第一级的 latency_factor 倍的最大并发用户数
+
+    Returns:
+        并发用户数，没有结果时返回 None
+    """
+    latency_factor = latency_factor or LOAD_TEST_CONFIG["latency_factor"]
+    if min_throughput_gain is None:
+        min_throughput_gain = LOAD_TEST_CONFIG["min_throughput_gain"]
+    if not levels or levels[0]["latency"]["p95"] is None:
+        return None
+
+    base_p95 = levels[0]["latency"]["p95"]
+    knee = levels[0]["users"]
+    for previous, level in zip(levels, levels[1:]):
+        p95 = level["latency"]["p95"]
+        if p95 is None or p95 > base_p95 * latency_factor:
+            break
+        if level["throughput"] < previous["throughput"] * (1 + min_throughput_gain):
+            break
+        knee = level["users"]
+    return knee
+
+
+def run_load_test(users: Optional[List[int]] = None, duration: Optional[float] = None,
+                  think_seconds: Optional[float] = None, seed: Optional[int] = None,
+                  workload: Optional[Workload] = None, quiet: bool = True) -> Dict:
+    """
+    逐级增加并发用户数运行压力测试
+
+    Args:
+        users: 各级并发用户数，默认见 LOAD_TEST_CONFIG
+        duration: 每级持续时间（秒）
+        think_seconds: 平均思考时间（秒）
+        seed: 随机种子
+        workload: 测试数据和服务，默认在临时目录中生成
+        quiet: 运行期间不输出解析器、生成器的打印信息
+
+    Returns:
+        {'environment', 'config', 'levels': [summarize_level(), ...], 'knee': 拐点用户数}
+    """
+    from golden_tenders import environment
+
+    users = users or LOAD_TEST_CONFIG["users"]
+    duration = duration if duration is not None else LOAD_TEST_CONFIG["duration_seconds"]
+    think_seconds = think_seconds if think_seconds is not None else LOAD_TEST_CONFIG["think_seconds"]
+    seed = seed if seed is not None else LOAD_TEST_CONFIG["seed"]
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with open(os.devnull, "w", encoding="utf-8") as devnull:
+            output = devnull if quiet else sys.stdout
+            if workload is None:
+                print("🔄 生成测试数据")
+                with redirect_stdout(output):
+                    workload = Workload(Path(temp_dir), seed=seed)
+
+            print("🔄 预热证书渲染缓存")
+            with redirect_stdout(output):
+                workload.run_once(workload.packages[0], "压力测试项目-预热")
+
+            levels = []
+            for count in users:
+                print(f"🔄 {count} 个并发用户，{duration:.0f} 秒")
+                with redirect_stdout(output):
+                    level = run_level(workload, count, duration, think_seconds, seed=seed)
+                levels.append(level)
+                _print_level(level)
+
+    return {
+        "environment": dict(environment(), cpu_count=os.cpu_count()),
+        "config": {"users": users, "duration_seconds": duration, "think_seconds": think_seconds, "seed": seed},
+        "levels": levels,
+        "knee": find_knee(levels),
+    }
+
+
+def _format(seconds: Optional[float]) -> str:
+    return "-" if seconds is None else f"{seconds:.2f}s"
+
+
+def _print_level(level: Dict):
+    latency = level["latency"]
+    errors = f"，失败 {level['errors']}" if level["errors"] else ""
+    print(f"  完成 {level['completed']}{errors}，吞吐量 {level['throughput']:.1f} 次/分钟，"
+          f"延迟 p50 {_format(latency['p50'])} / p95 {_format(latency['p95'])} / p99 {_format(latency['p99'])}")
+    print(f"  CPU {level['cpu']['utilization'] * 100:.0f}%（采样 p95 {(level['cpu']['p95'] or 0) * 100:.0f}%），"
+          f"证书转换队列 平均 {level['cert_queue']['mean']:.1f} / 最大 {level['cert_queue']['max']:.0f}，"
+          f"栅格化进程最多 {level['rasterizers_max']:.0f}，同时生成最多 {level['generating_max']:.0f}")
+
+
+def save_results(results: Dict, path: Optional[Path] = None) -> Path:
+    """保存结果为 JSON，默认写入 cache/load_tests/"""
+    if path is None:
+        LOAD_TEST_DIR.mkdir(parents=True, exist_ok=True)
+        path = LOAD_TEST_DIR / f"load_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+    path.write_text(json.dumps(results, ensure_ascii=False, indent=2), encoding="utf-8")
+    return path
+
+
+def main():
+    args = sys.argv[1:]
+    options = {}
+    for name in ("--users", "--duration", "--think", "--seed", "--output"):
+        if name in args:
+            index = args.index(name)
+            options[name] = args[index + 1]
+            del args[index:index + 2]
+    if args:
+        print(__doc__)
+        sys.exit(2)
+
+    users = [int(count) for count in options["--users"].split(",")] if "--users" in options else None
+    results = run_load_test(
+        users=users,
+        duration=float(options["--duration"]) if "--duration" in options else None,
+        think_seconds=float(options["--think"]) if "--think" in options else None,
+        seed=int(options["--seed"]) if "--seed" in options else None,
+    )
+    path = save_results(results, Path(options["--output"]) if "--output" in options else None)
+
+    print("\n并发用户  吞吐量(次/分)  p50      p95      p99      CPU")
+    for level in results["levels"]:
+        latency = level["latency"]
+        print(f"{level['users']:>8}  {level['throughput']:>12.1f}  {_format(latency['p50']):<8} "
+              f"{_format(latency['p95']):<8} {_format(latency['p99']):<8} {level['cpu']['utilization'] * 100:.0f}%")
+    if results["knee"] is None:
+        print("⚠️ 没有完成的流程，无法确定拐点")
+    elif results["knee"] == results["levels"][-1]["users"]:
+        print(f"⚠️ {results['knee']} 个并发用户时仍未饱和，可用 --users 增加用户数")
+    else:
+        print(f"✓ 拐点: {results['knee']} 个并发用户（再增加用户吞吐量不再增长或 p95 延迟明显上升）")
+    print(f"✓ 结果已保存: {path}")
+
+
+if __name__ == "__main__":
+    main()
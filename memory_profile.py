@@ -0,0 +1,210 @@
+"""
+内存占用采样
+
+证书很多时生成过程中出现过内存不足，需要分清是 PIL 图片、python-docx 文档树还是 PDF 解析占用的内存。
+开启内存采样的追踪（start_trace(..., memory=True)，见 tracing.py）为每个区间记录：
+- peak_mb: 区间内 tracemalloc 统计的内存峰值，相对区间开始时的增量
+- retained_mb: 区间结束时比开始时多占用的内存（区间结束后仍未释放）
+- rss_mb / rss_peak_mb: 结束时的常驻内存和进程启动以来的峰值常驻内存
+- top_sites: 较浅的区间（解析文件、各项匹配、构建/组装/保存各阶段）前后快照对比，新增内存最多的分配位置
+
+tracemalloc 统计整个进程，并发的区间（如并发构建的章节）互相包含对方的分配；
+多个同时开启内存采样的追踪（如两个用户同时排查）共用 tracemalloc，峰值同样互相包含，
+最后一个追踪结束时才停止 tracemalloc。
+开启后程序明显变慢（生成约慢 2 倍，每个记录分配位置的区间还要做两次快照），只在排查内存问题时使用。
+"""
+
+import os
+import sys
+import sysconfig
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import BASE_DIR, TRACE_CONFIG
+
+_MB = 1024 * 1024
+
+# 进程级采样状态：tracemalloc 和它的峰值由所有开启内存采样的追踪共用
+_lock = threading.Lock()
+_active: List["MemoryTracker"] = []  # 正在采样的追踪
+_owns_tracing = False  # tracemalloc 是否由采样开启（结束时才需要停止）
+
+
+def current_rss_mb() -> Optional[float]:
+    """当前常驻内存（MB），只支持 Linux，其他平台返回 None"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / _MB
+
+
+def peak_rss_mb() -> Optional[float]:
+    """进程启动以来的峰值常驻内存（MB），不支持的平台返回 None"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KB 为单位，macOS 以字节为单位
+    return peak / _MB if sys.platform == "darwin" else peak / 1024
+
+
+# 追踪期间的常驻内存采样（所有 RssPeakWatch 共用一个采样线程）
+_rss_lock = threading.Lock()
+_rss_watches = set()  # 进行中的 RssPeakWatch
+_rss_thread: Optional[threading.Thread] = None
+
+
+class RssPeakWatch:
+    """
+    一段时间内的峰值常驻内存（如一次生成期间）
+
+    进程级峰值（peak_rss_mb）在长时间运行的服务中只增不减，不能反映单次生成。
+    这里在开始和结束时各读取一次，期间由进程内共用的采样线程每隔
+    TRACE_CONFIG["rss_sample_interval"] 秒读取一次；不支持的平台为 None。
+    """
+
+    def __init__(self):
+        self.peak_mb: Optional[float] = None
+
+    def _observe(self, rss: Optional[float]):
+        if rss is not None and (self.peak_mb is None or rss > self.peak_mb):
+            self.peak_mb = rss
+
+    def start(self):
+        global _rss_thread
+        self._observe(current_rss_mb())
+        with _rss_lock:
+            _rss_watches.add(self)
+            if _rss_thread is None:
+                _rss_thread = threading.Thread(target=_sample_rss, name="rss-sampler", daemon=True)
+                _rss_thread.start()
+
+    def stop(self) -> Optional[float]:
+        """结束采样，返回峰值（MB）"""
+        with _rss_lock:
+            _rss_watches.discard(self)
+        self._observe(current_rss_mb())
+        return self.peak_mb
+
+
+def _sample_rss():
+    """采样线程：没有进行中的 RssPeakWatch 时退出"""
+    global _rss_thread
+    while True:
+        rss = current_rss_mb()
+        with _rss_lock:
+            if not _rss_watches:
+                _rss_thread = None
+                return
+            for watch in _rss_watches:
+                watch._observe(rss)
+        time.sleep(TRACE_CONFIG["rss_sample_interval"])
+
+
+def _short_path(filename: str) -> str:
+    """项目内文件用相对路径，第三方库和标准库只保留包内路径"""
+    path = Path(filename)
+    parts = path.parts
+    if "site-packages" in parts:
+        return "/".join(parts[parts.index("site-packages") + 1:])
+    for base in (BASE_DIR, Path(sysconfig.get_paths()["stdlib"])):
+        try:
+            return str(path.relative_to(base))
+        except ValueError:
+            continue
+    return filename
+
+
+class MemoryTracker:
+    """一次追踪的内存采样（由 tracing.py 在区间开始和结束时调用）"""
+
+    def __init__(self, snapshot_depth: Optional[int] = None, top_sites: Optional[int] = None):
+        """
+        Args:
+            snapshot_depth: 不超过这个深度的区间记录主要分配位置（根区间深度为 0），默认见 TRACE_CONFIG
+            top_sites: 每个区间列出的分配位置数量，默认见 TRACE_CONFIG
+        """
+        self.snapshot_depth = snapshot_depth if snapshot_depth is not None else TRACE_CONFIG["memory_snapshot_depth"]
+        self.top_sites = top_sites or TRACE_CONFIG["memory_top_sites"]
+        self._open: Dict[str, Dict] = {}  # 进行中的区间 {区间ID: {'start', 'peak', 'snapshot'}}
+
+    def start(self):
+        """开始采样（tracemalloc 已在运行时沿用）"""
+        global _owns_tracing
+        with _lock:
+            if not _active and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _owns_tracing = True
+            _active.append(self)
+
+    def stop(self):
+        """结束采样，最后一个采样的追踪结束时停止由采样开启的 tracemalloc"""
+        global _owns_tracing
+        with _lock:
+            if self not in _active:
+                return
+            _active.remove(self)
+            if not _active and _owns_tracing:
+                tracemalloc.stop()
+                _owns_tracing = False
+
+    @staticmethod
+    def _fold_peak():
+        """把当前峰值计入所有追踪中进行中的区间后重置峰值（调用方持有 _lock）"""
+        peak = tracemalloc.get_traced_memory()[1]
+        for tracker in _active:
+            for state in tracker._open.values():
+                state["peak"] = max(state["peak"], peak)
+        tracemalloc.reset_peak()
+
+    def begin(self, span, depth: int):
+        """区间开始"""
+        snapshot = self._snapshot() if depth <= self.snapshot_depth else None
+        with _lock:
+            self._fold_peak()
+            current = tracemalloc.get_traced_memory()[0]
+            self._open[span.span_id] = {"start": current, "peak": current, "snapshot": snapshot}
+
+    def end(self, span) -> Dict:
+        """区间结束，返回内存记录"""
+        with _lock:
+            self._fold_peak()
+            state = self._open.pop(span.span_id)
+            current = tracemalloc.get_traced_memory()[0]
+
+        memory = {
+            "peak_mb": round((state["peak"] - state["start"]) / _MB, 3),
+            "retained_mb": round((current - state["start"]) / _MB, 3),
+            "rss_mb": current_rss_mb(),
+            "rss_peak_mb": peak_rss_mb(),
+        }
+        if state["snapshot"] is not None:
+            memory["top_sites"] = self._top_sites(state["snapshot"], self._snapshot())
+        return memory
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, __file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+        ])
+
+    def _top_sites(self, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot) -> List[Dict]:
+        """新增内存最多的分配位置 [{'site', 'size_mb', 'count'}, ...]"""
+        sites = []
+        for stat in after.compare_to(before, "lineno")[:self.top_sites]:
+            if stat.size_diff <= 0:
+                break
+            frame = stat.traceback[0]
+            sites.append({
+                "site": f"{_short_path(frame.filename)}:{frame.lineno}",
+                "size_mb": round(stat.size_diff / _MB, 3),
+                "count": stat.count_diff,
+            })
+        return sites
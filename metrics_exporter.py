@@ -0,0 +1,318 @@
+"""
+实时监控指标（Prometheus 文本格式）
+
+生成服务跑在局域网共用的机器上，由现有的监控系统抓取吞吐量和延迟。
+解析、匹配、生成、证书转换等处在进程内累计计数器和直方图（开销只是一次加锁计数）：
+
+    with timed(PARSES, PARSE_SECONDS, format="pdf") as outcome:
+        ...
+        outcome["status"] = "error"   # 默认 ok，抛出异常时为 error
+
+导出默认关闭，METRICS_EXPORTER_CONFIG 开启后由服务预热时启动（见 start_exporter）：
+- 本机 HTTP 端口：GET /metrics 返回 Prometheus 文本格式
+- 文本文件：定期原子写入，供 node_exporter 的 textfile collector 读取
+"""
+
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence
+
+from config import METRICS_EXPORTER_CONFIG
+
+# 已创建的全部指标，按创建顺序导出
+_REGISTRY: List["_Metric"] = []
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value))
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    """指标基类：名称、说明、标签名，按标签值分别记录"""
+
+    type_name = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), register: bool = True):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        if register:
+            _REGISTRY.append(self)
+
+    def _key(self, labels: Dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} 的标签应为 {self.labelnames}，实际为 {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        documentation = self.documentation.replace("\\", "\\\\").replace("\n", "\\n")
+        lines = [f"# HELP {self.name} {documentation}", f"# TYPE {self.name} {self.type_name}"]
+        lines.extend(self._samples())
+        return "\n".join(lines) + "\n"
+
+
+class Counter(_Metric):
+    """只增不减的计数"""
+
+    type_name = "counter"
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # 没有标签的指标从 0 开始导出
+        self._values: Dict[tuple, float] = {} if self.labelnames else {(): 0}
+
+    def inc(self, amount: float = 1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}"
+                for key, value in items]
+
+
+class Gauge(Counter):
+    """可增可减的当前值（队列长度、进行中的任务数）"""
+
+    type_name = "gauge"
+
+    def dec(self, amount: float = 1, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    @contextmanager
+    def track(self, **labels) -> Iterator[None]:
+        """代码块执行期间加一"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+
+class Histogram(_Metric):
+    """分布（按上界分桶计数，另记总和与次数）"""
+
+    type_name = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = (0.1, 0.5, 1, 2, 5, 10, 30, 60), register: bool = True):
+        super().__init__(name, documentation, labelnames, register)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._values: Dict[tuple, Dict] = {}
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        index = next(i for i, bound in enumerate(self.buckets) if value <= bound)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            state["buckets"][index] += 1
+            state["sum"] += value
+            state["count"] += 1
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            state = self._values.get(self._key(labels))
+            return state["count"] if state else 0
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, {"buckets": list(state["buckets"]), "sum": state["sum"], "count": state["count"]})
+                           for key, state in self._values.items())
+        lines = []
+        names = self.labelnames + ("le",)
+        for key, state in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets, state["buckets"]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_format_labels(names, key + (_format_value(bound),))} {cumulative}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+            lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+@contextmanager
+def timed(counter: Counter, histogram: Histogram, **labels) -> Iterator[Dict]:
+    """
+    统计一次操作：结束后计数器按结果加一（标签另加 status），直方图记录耗时
+
+    Yields:
+        {'status': 'ok'}，调用方可以改为其他结果（如 reused）；抛出异常时为 error
+    """
+    outcome = {"status": "ok"}
+    start = time.perf_counter()
+    try:
+        yield outcome
+    except BaseException:
+        outcome["status"] = "error"
+        raise
+    finally:
+        histogram.observe(time.perf_counter() - start, **labels)
+        counter.inc(status=outcome["status"], **labels)
+
+
+# 解析（parser.py）
+PARSES = Counter("bidgen_parses_total", "解析的招标文件数", ["format", "status"])
+PARSE_SECONDS = Histogram("bidgen_parse_seconds", "解析招标文件耗时（秒）", ["format"],
+                          buckets=(0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60, 120))
+
+# 匹配（database.py）
+MATCHES = Counter("bidgen_matches_total", "资质/案例/产品匹配次数", ["kind", "status"])
+MATCH_SECONDS = Histogram("bidgen_match_seconds", "匹配耗时（秒）", ["kind"],
+                          buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5))
+
+# 生成（generator.py）
+GENERATIONS = Counter("bidgen_generations_total",
+                      "生成的投标文件数（reused 为复用已生成的文件，fallback 为证书附录导出失败后改为嵌入图片）",
+                      ["bid_type", "status"])
+GENERATION_SECONDS = Histogram("bidgen_generation_seconds", "生成一份投标文件的耗时（秒）", ["bid_type"],
+                               buckets=(0.5, 1, 2, 5, 10, 20, 30, 60, 120, 300))
+GENERATIONS_IN_PROGRESS = Gauge("bidgen_generations_in_progress", "正在生成的投标文件数")
+OUTPUT_BYTES = Histogram("bidgen_output_bytes", "生成的投标文件大小（字节）", ["bid_type"],
+                         buckets=tuple(mb * 1024 * 1024 for mb in (1, 2, 5, 10, 20, 50, 100)))
+SECTION_CACHE = Counter("bidgen_section_cache_total", "章节片段缓存查询（hit/miss）", ["result"])
+
+# 证书转换（cert_images.py、cert_prerender.py）
+CERT_PAGES = Counter("bidgen_cert_pages_total",
+                     "证书页面获取次数，按转换路径（cached 为命中渲染缓存，其余为缓存缺失后的转换结果）", ["path"])
+CERT_RENDER_SECONDS = Histogram("bidgen_cert_render_seconds", "缓存缺失时转换一页证书的耗时（秒）", ["path"],
+                                buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30, 60))
+CERT_QUEUE_DEPTH = Gauge("bidgen_cert_queue_depth", "已提交未完成的证书转换任务（generate 为生成时，prerender 为后台预渲染）",
+                         ["source"])
+RASTERIZER_PROCESSES = Gauge("bidgen_rasterizer_processes", "正在运行的 pdftoppm/Ghostscript 进程数")
+
+
+def render_text() -> str:
+    """全部指标的 Prometheus 文本格式"""
+    return "".join(metric.render() for metric in _REGISTRY)
+
+
+def write_textfile(path: Path) -> Path:
+    """写出指标文件（先写临时文件再原子替换，抓取时不会读到半个文件）"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(render_text(), encoding="utf-8")
+    os.replace(tmp_path, path)
+    return path
+
+
+def start_http_server(port: int, host: str = "127.0.0.1"):
+    """
+    在后台线程中提供 GET /metrics
+
+    Returns:
+        HTTP 服务（server_address 为实际监听地址，port 为 0 时由系统分配端口；shutdown() 停止）
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = render_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # 不打印每次抓取
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    return server
+
+
+def start_textfile_writer(path: Path, interval: float) -> threading.Event:
+    """
+    在后台线程中定期写出指标文件
+
+    Returns:
+        停止事件（set() 后停止）
+    """
+    stop = threading.Event()
+
+    def run():
+        while True:
+            try:
+                write_textfile(path)
+            except OSError as e:
+                print(f"⚠️ 监控指标文件写入失败: {e}")
+            if stop.wait(interval):
+                return
+
+    threading.Thread(target=run, name="metrics-textfile", daemon=True).start()
+    return stop
+
+
+_started = False
+_start_lock = threading.Lock()
+
+
+def start_exporter(config: Optional[Dict] = None) -> Optional[str]:
+    """
+    按配置启动导出（进程内只启动一次）
+
+    Returns:
+        导出方式的说明，未开启或已启动返回 None
+    """
+    global _started
+    config = config or METRICS_EXPORTER_CONFIG
+    if not config.get("enabled"):
+        return None
+    with _start_lock:
+        if _started:
+            return None
+        _started = True
+
+    targets = []
+    if config.get("port") is not None:
+        try:
+            server = start_http_server(config["port"], config.get("host", "127.0.0.1"))
+            host, port = server.server_address[:2]
+            targets.append(f"http://{host}:{port}/metrics")
+        except OSError as e:
+            print(f"⚠️ 监控指标端口启动失败: {e}")
+    if config.get("textfile"):
+        path = Path(config["textfile"])
+        start_textfile_writer(path, config.get("interval_seconds", 15))
+        targets.append(str(path))
+    if targets:
+        print(f"✓ 监控指标导出: {'、'.join(targets)}")
+    return "、".join(targets) or None
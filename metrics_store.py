@@ -0,0 +1,249 @@
+"""
+生成指标历史
+
+每次生成投标文件后，从本次生成的耗时追踪（见 tracing.py）提取指标，追加到本地 SQLite：
+总耗时、各阶段耗时、证书转换/命中缓存数量、章节缓存命中数、设备规格行数、输出大小、需求数量、本次生成期间的峰值常驻内存。
+
+性能统计页面按时间段汇总这些记录（分位数、按天趋势、耗时与证书数量的关系），
+数据或代码修改后可以看出生成是否变慢。
+"""
+
+import json
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import METRICS_DB_PATH, METRICS_CONFIG
+
+# 数值指标（可以计算分位数的列）
+NUMERIC_FIELDS = ["total_seconds", "requirements", "qualifications", "certs_rendered", "certs_cached",
+                  "sections_cached", "equipment_rows", "output_bytes", "peak_rss_mb"]
+
+# 汇总的生成阶段（生成各投标文件区间下的直接子区间）及证书转换合计
+STAGE_NAMES = ["构建章节", "组装章节", "保存文件", "导出证书附录", "证书转换"]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS generations (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    created_at TEXT NOT NULL,
+    trace_id TEXT,
+    project_name TEXT,
+    bid_count INTEGER,
+    total_seconds REAL,
+    requirements INTEGER,
+    qualifications INTEGER,
+    certs_rendered INTEGER,
+    certs_cached INTEGER,
+    sections_cached INTEGER,
+    output_bytes INTEGER,
+    peak_rss_mb REAL,
+    stages TEXT,
+    equipment_rows INTEGER,
+    reused INTEGER
+)
+"""
+
+# 之后新增的列（已有数据库打开时补上，旧记录为 NULL）
+_ADDED_COLUMNS = [("equipment_rows", "INTEGER"), ("reused", "INTEGER")]
+
+
+def percentile(values: List[float], q: float) -> Optional[float]:
+    """线性插值分位数（q 取 0-100），空列表返回 None"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(values: List[float]) -> Dict:
+    """{'count', 'p50', 'p90', 'p95', 'max'}"""
+    return {
+        "count": len(values),
+        "p50": percentile(values, 50),
+        "p90": percentile(values, 90),
+        "p95": percentile(values, 95),
+        "max": max(values) if values else None,
+    }
+
+
+def generation_metrics(trace, tender_info: Dict, matched_data: Dict, output_paths: List[Path]) -> Dict:
+    """
+    从一次生成的追踪中提取指标
+
+    Args:
+        trace: 包含本次生成的耗时追踪
+        tender_info: 招标信息
+        matched_data: 匹配的数据
+        output_paths: 生成的文件
+
+    Returns:
+        可以直接传给 MetricsStore.record 的指标
+    """
+    records = trace.to_records()
+    by_id = {r["span_id"]: r for r in records}
+    stages = {}
+    certs_rendered = certs_cached = sections_cached = equipment_rows = reused = 0
+    for record in records:
+        parent = by_id.get(record["parent_id"])
+        name = record["name"]
+        seconds = record["duration_ms"] / 1000
+        if name == "证书转换":
+            stages[name] = stages.get(name, 0) + seconds
+            if record["attrs"].get("cached"):
+                certs_cached += 1
+            elif "error" not in record["attrs"]:
+                certs_rendered += 1
+        elif name in STAGE_NAMES and parent is not None and parent["name"].startswith("生成"):
+            stages[name] = stages.get(name, 0) + seconds
+        if "section" in record["attrs"] and record["attrs"].get("cached"):
+            sections_cached += 1
+        # 设备说明一览表本次实际填写的行数（章节命中缓存时为 0）
+        equipment_rows += record["attrs"].get("equipment_rows", 0)
+        # 确定性模式下直接复用已生成文件的投标文件（生成各投标文件的区间标记为 cached）
+        if "bid_type" in record["attrs"] and record["attrs"].get("cached"):
+            reused += 1
+
+    return {
+        "trace_id": trace.trace_id,
+        "project_name": tender_info.get("project_info", {}).get("project_name"),
+        "bid_count": len(output_paths),
+        "total_seconds": trace.duration,
+        "requirements": len(tender_info.get("requirements", [])),
+        "qualifications": len(matched_data.get("qualifications", [])),
+        "certs_rendered": certs_rendered,
+        "certs_cached": certs_cached,
+        "sections_cached": sections_cached,
+        "equipment_rows": equipment_rows,
+        "reused": reused,
+        "output_bytes": sum(Path(p).stat().st_size for p in output_paths if Path(p).exists()),
+        "peak_rss_mb": trace.peak_rss_mb,
+        "stages": stages,
+    }
+
+
+class MetricsStore:
+    """生成指标历史（SQLite）"""
+
+    def __init__(self, db_path: Optional[Path] = None, max_records: Optional[int] = None):
+        """
+        Args:
+            db_path: 数据库文件，默认见 METRICS_DB_PATH（首次写入时创建）
+            max_records: 最多保留的记录数，默认见 METRICS_CONFIG
+        """
+        self.db_path = db_path or METRICS_DB_PATH
+        self.max_records = max_records or METRICS_CONFIG["max_records"]
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        conn.row_factory = sqlite3.Row
+        conn.execute(_SCHEMA)
+        columns = {row["name"] for row in conn.execute("PRAGMA table_info(generations)")}
+        for column, column_type in _ADDED_COLUMNS:
+            if column not in columns:
+                conn.execute(f"ALTER TABLE generations ADD COLUMN {column} {column_type}")
+        return conn
+
+    def record(self, metrics: Dict) -> Optional[int]:
+        """
+        追加一条生成记录（写入失败只打印警告，不影响生成）
+
+        Returns:
+            记录 ID，失败返回 None
+        """
+        row = {key: metrics.get(key) for key in ["trace_id", "project_name", "bid_count", "reused"] + NUMERIC_FIELDS}
+        row["created_at"] = metrics.get("created_at") or datetime.now().isoformat(timespec="seconds")
+        row["stages"] = json.dumps(metrics.get("stages", {}), ensure_ascii=False)
+        columns = ", ".join(row)
+        placeholders = ", ".join(f":{key}" for key in row)
+        try:
+            with self._lock:
+                conn = self._connect()
+                try:
+                    with conn:
+                        cursor = conn.execute(f"INSERT INTO generations ({columns}) VALUES ({placeholders})", row)
+                        conn.execute("DELETE FROM generations WHERE id <= ?", (cursor.lastrowid - self.max_records,))
+                    return cursor.lastrowid
+                finally:
+                    conn.close()
+        except sqlite3.Error as e:
+            print(f"⚠️ 生成指标写入失败: {e}")
+            return None
+
+    def records(self, days: Optional[int] = None, limit: Optional[int] = None) -> List[Dict]:
+        """按时间倒序的记录（stages 已解析为字典）"""
+        query = "SELECT * FROM generations"
+        params = []
+        if days is not None:
+            query += " WHERE created_at >= ?"
+            params.append((datetime.now() - timedelta(days=days)).isoformat(timespec="seconds"))
+        query += " ORDER BY id DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._lock:
+            conn = self._connect()
+            try:
+                rows = conn.execute(query, params).fetchall()
+            finally:
+                conn.close()
+
+        results = []
+        for row in rows:
+            record = dict(row)
+            record["stages"] = json.loads(record["stages"] or "{}")
+            results.append(record)
+        return results
+
+    def latest_id(self) -> Optional[int]:
+        """最新一条记录的 ID（没有记录时为 None），用于判断是否有新的生成记录"""
+        with self._lock:
+            conn = self._connect()
+            try:
+                return conn.execute("SELECT MAX(id) FROM generations").fetchone()[0]
+            finally:
+                conn.close()
+
+    def summary(self, days: Optional[int] = None) -> Dict:
+        """
+        分位数汇总
+
+        Returns:
+            {'count', 'fields': {指标: summarize()}, 'stages': {阶段: summarize()}}
+        """
+        records = self.records(days)
+        fields = {
+            field: summarize([r[field] for r in records if r[field] is not None])
+            for field in NUMERIC_FIELDS
+        }
+        stage_names = [name for name in STAGE_NAMES if any(name in r["stages"] for r in records)]
+        stages = {name: summarize([r["stages"][name] for r in records if name in r["stages"]])
+                  for name in stage_names}
+        return {"count": len(records), "fields": fields, "stages": stages}
+
+    def daily_trend(self, days: Optional[int] = None) -> List[Dict]:
+        """按天汇总 [{'date', 'count', 'p50_seconds', 'p90_seconds', 'p50_output_mb'}, ...]，日期升序"""
+        by_date = {}
+        for record in self.records(days):
+            by_date.setdefault(record["created_at"][:10], []).append(record)
+
+        trend = []
+        for date in sorted(by_date):
+            records = by_date[date]
+            seconds = [r["total_seconds"] for r in records if r["total_seconds"] is not None]
+            sizes = [r["output_bytes"] / (1024 * 1024) for r in records if r["output_bytes"] is not None]
+            trend.append({
+                "date": date,
+                "count": len(records),
+                "p50_seconds": percentile(seconds, 50),
+                "p90_seconds": percentile(seconds, 90),
+                "p50_output_mb": percentile(sizes, 50),
+            })
+        return trend
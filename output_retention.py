@@ -0,0 +1,139 @@
+"""
+输出目录清理
+
+output/ 中的投标文件只增不减，这里按保留策略在后台定期清理：
+1. 删除超过保留天数的文件
+2. 总大小超过上限时，从最旧的文件开始删除
+3. 删除异常中断遗留的临时文件
+
+最近生成的文件（min_age_minutes 内）不会被删除，避免删掉用户正在下载的文件。
+删除文件后输出存储中对应的索引会在下次查找时自动失效（见 output_store.py）。
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from config import OUTPUT_DIR, OUTPUT_RETENTION_CONFIG
+from cert_images import format_size
+
+# 参与清理的文件类型
+_OUTPUT_SUFFIXES = {".docx", ".pdf"}
+
+
+class OutputRetention:
+    """输出目录保留策略"""
+
+    def __init__(self, output_dir: Optional[Path] = None, max_age_days: Optional[float] = None,
+                 max_total_mb: Optional[float] = None, min_age_minutes: Optional[float] = None):
+        self.output_dir = output_dir or OUTPUT_DIR
+        self.max_age_days = max_age_days if max_age_days is not None else OUTPUT_RETENTION_CONFIG["max_age_days"]
+        self.max_total_mb = max_total_mb if max_total_mb is not None else OUTPUT_RETENTION_CONFIG["max_total_mb"]
+        self.min_age_minutes = (min_age_minutes if min_age_minutes is not None
+                                else OUTPUT_RETENTION_CONFIG["min_age_minutes"])
+
+    def _remove(self, path: Path) -> int:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+            return size
+        except FileNotFoundError:
+            return 0
+
+    def _sweep_expired(self, protect_after: float, expire_before: float) -> Tuple[int, int, List]:
+        """删除过期文件和遗留的临时文件，返回 (删除数, 释放字节数, [(mtime, 保留的文件), ...])"""
+        removed = 0
+        freed = 0
+        files = []
+        for path in self.output_dir.iterdir():
+            if not path.is_file():
+                continue
+            try:
+                mtime = path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+
+            # 保存中断遗留的临时文件
+            if path.name.endswith(".tmp"):
+                if mtime < protect_after:
+                    freed += self._remove(path)
+                    removed += 1
+                continue
+
+            if path.suffix.lower() not in _OUTPUT_SUFFIXES:
+                continue
+
+            if mtime < expire_before:
+                freed += self._remove(path)
+                removed += 1
+            else:
+                files.append((mtime, path))
+        return removed, freed, files
+
+    def sweep(self, now: Optional[float] = None) -> Dict:
+        """
+        执行一次清理
+
+        Returns:
+            清理结果 {'removed': 删除文件数, 'freed': 释放字节数, 'remaining': 剩余文件数}
+        """
+        now = now or time.time()
+        protect_after = now - self.min_age_minutes * 60
+        removed, freed, files = self._sweep_expired(protect_after, now - self.max_age_days * 86400)
+
+        # 超出总大小上限时从最旧的文件开始删除
+        limit = self.max_total_mb * 1024 * 1024
+        files.sort()
+        total = sum(path.stat().st_size for _, path in files if path.exists())
+        remaining = len(files)
+        for mtime, path in files:
+            if total <= limit or mtime >= protect_after:
+                break
+            size = self._remove(path)
+            total -= size
+            freed += size
+            removed += 1
+            remaining -= 1
+
+        if removed:
+            print(f"🧹 清理输出目录: 删除 {removed} 个文件, 释放 {format_size(freed)}")
+
+        return {'removed': removed, 'freed': freed, 'remaining': remaining}
+
+
+_cleanup_thread = None
+_cleanup_lock = threading.Lock()
+
+
+def start_background_cleanup(retention: Optional[OutputRetention] = None,
+                             interval_minutes: Optional[float] = None) -> threading.Thread:
+    """
+    启动后台清理线程（每个进程只启动一次，重复调用返回已有线程）
+
+    Args:
+        retention: 保留策略，默认按 OUTPUT_RETENTION_CONFIG
+        interval_minutes: 清理间隔（分钟）
+
+    Returns:
+        后台线程
+    """
+    global _cleanup_thread
+    with _cleanup_lock:
+        if _cleanup_thread is not None and _cleanup_thread.is_alive():
+            return _cleanup_thread
+
+        retention = retention or OutputRetention()
+        interval = (interval_minutes or OUTPUT_RETENTION_CONFIG["interval_minutes"]) * 60
+
+        def run():
+            while True:
+                try:
+                    retention.sweep()
+                except Exception as e:
+                    print(f"⚠️ 输出目录清理失败: {e}")
+                time.sleep(interval)
+
+        _cleanup_thread = threading.Thread(target=run, name="output-retention", daemon=True)
+        _cleanup_thread.start()
+        return _cleanup_thread
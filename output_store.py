@@ -0,0 +1,112 @@
+"""
+投标文件输出存储
+
+按全部生成输入的哈希记录已生成的文件。输入完全相同的重新生成直接返回已有文件，
+不再重新构建和保存（需要确定性输出，见 docx_writer.py）。
+
+BidArtifact 是生成结果的句柄，界面直接用它提供下载，不再扫描输出目录。
+"""
+
+import json
+import os
+import uuid
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from config import OUTPUT_STORE_DIR
+
+# 下载时使用的 MIME 类型
+MIME_TYPES = {
+    ".docx": "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+    ".pdf": "application/pdf",
+}
+
+
+class BidArtifact:
+    """生成结果句柄（文件路径或内存中的字节）"""
+
+    def __init__(self, label: str, path: Optional[Path] = None, data: Optional[bytes] = None,
+                 name: Optional[str] = None):
+        """
+        Args:
+            label: 显示名称（如 技术标、商务标）
+            path: 文件路径
+            data: 内存中的文件内容（没有落盘的结果）
+            name: 下载文件名，默认使用路径中的文件名
+        """
+        if path is None and data is None:
+            raise ValueError("生成结果必须包含文件路径或文件内容")
+        self.label = label
+        self.path = Path(path) if path is not None else None
+        self.data = data
+        self.name = name or self.path.name
+        self.created = datetime.now()
+
+    @classmethod
+    def from_path(cls, label: str, path: Path) -> "BidArtifact":
+        return cls(label, path=path)
+
+    @property
+    def size(self) -> int:
+        if self.data is not None:
+            return len(self.data)
+        return self.path.stat().st_size
+
+    @property
+    def mime(self) -> str:
+        return MIME_TYPES.get(Path(self.name).suffix.lower(), "application/octet-stream")
+
+    def exists(self) -> bool:
+        """结果是否仍然可以下载（文件可能已被清理）"""
+        return self.data is not None or self.path.exists()
+
+    def read_bytes(self) -> bytes:
+        if self.data is not None:
+            return self.data
+        return self.path.read_bytes()
+
+    def __repr__(self):
+        return f"BidArtifact({self.label!r}, {self.name!r})"
+
+
+class OutputStore:
+    """已生成文件的索引 {输入哈希: 文件}"""
+
+    def __init__(self, store_dir: Optional[Path] = None):
+        self.store_dir = store_dir or OUTPUT_STORE_DIR
+
+    def _index_path(self, key: str) -> Path:
+        return self.store_dir / f"{key}.json"
+
+    def get(self, key: str) -> Optional[Path]:
+        """
+        查找已生成的文件
+
+        文件被删除或被修改（大小不一致）时视为未命中并删除索引。
+        """
+        index_path = self._index_path(key)
+        try:
+            record = json.loads(index_path.read_text(encoding="utf-8"))
+        except (FileNotFoundError, ValueError):
+            return None
+
+        path = Path(record["path"])
+        if not path.exists() or path.stat().st_size != record["size"]:
+            index_path.unlink(missing_ok=True)
+            return None
+        return path
+
+    def put(self, key: str, path: Path) -> Dict:
+        """记录已生成的文件"""
+        self.store_dir.mkdir(parents=True, exist_ok=True)
+        record = {
+            "path": str(path.resolve()),
+            "size": path.stat().st_size,
+            "created": datetime.now().isoformat(timespec="seconds"),
+        }
+        index_path = self._index_path(key)
+        tmp_path = index_path.with_name(f"{key}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp_path.write_text(json.dumps(record, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp_path, index_path)
+        return record
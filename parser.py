@@ -8,10 +8,12 @@ import os
 from pathlib import Path
 from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
-import PyPDF2
 import docx
 import subprocess
 
+from metrics_exporter import PARSES, PARSE_SECONDS, timed
+from tracing import span, traced
+
 
 class ParseResult:
     """解析结果类"""
@@ -93,18 +95,24 @@ class TenderParser:
         if not filepath.exists():
             return ParseResult([], confidence_score=0.0)
 
-        try:
-            if filepath.suffix.lower() == '.pdf':
-                return self._parse_pdf(filepath)
-            elif filepath.suffix.lower() == '.docx':
-                return self._parse_docx(filepath)
-            elif filepath.suffix.lower() == '.doc':
-                return self._parse_doc(filepath)
-            else:
-                return ParseResult([], confidence_score=0.0)
-        except Exception as e:
-            print(f"✗ 文件解析失败: {e}")
-            return ParseResult([], confidence_score=0.0)
+        file_format = filepath.suffix.lower().lstrip('.') or "unknown"
+        with span("解析文件", file=filepath.name) as s, timed(PARSES, PARSE_SECONDS, format=file_format) as outcome:
+            try:
+                if filepath.suffix.lower() == '.pdf':
+                    result = self._parse_pdf(filepath)
+                elif filepath.suffix.lower() == '.docx':
+                    result = self._parse_docx(filepath)
+                elif filepath.suffix.lower() == '.doc':
+                    result = self._parse_doc(filepath)
+                else:
+                    result = ParseResult([], confidence_score=0.0)
+            except Exception as e:
+                print(f"✗ 文件解析失败: {e}")
+                s.set(error=str(e))
+                outcome["status"] = "error"
+                result = ParseResult([], confidence_score=0.0)
+            s.set(requirements=len(result.requirements))
+            return result
 
     def _parse_pdf(self, filepath: Path) -> ParseResult:
         """解析PDF文件"""
@@ -113,6 +121,8 @@ class TenderParser:
         requirements = []
         
         try:
+            # PyPDF2 导入较慢，解析 PDF 时才导入
+            import PyPDF2
             reader = PyPDF2.PdfReader(filepath)
             
             # 提取文本
@@ -256,6 +266,7 @@ class TenderParser:
             traceback.print_exc()
             return ParseResult([], confidence_score=0.0)
 
+    @traced("提取需求")
     def _extract_requirements_from_text(self, text: str) -> List[str]:
         """从文本中提取需求"""
         requirements = []
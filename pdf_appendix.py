@@ -0,0 +1,220 @@
+"""
+证书原件附录（矢量模式）
+
+将生成的投标文件正文导出为 PDF，再把证书原始 PDF 逐页追加到末尾，
+按证书类别（体系认证/信用等级/荣誉/合作伙伴）生成书签和索引页。
+整个过程不做任何栅格化，证书保持原始矢量/扫描质量。
+"""
+
+import math
+import shutil
+import subprocess
+from io import BytesIO
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from pypdf import PdfReader, PdfWriter
+
+from cert_images import get_page_count, parse_page_selection
+
+# 索引页每页可容纳的行数
+INDEX_LINES_PER_PAGE = 38
+
+# 附录顶层书签标题
+APPENDIX_TITLE = "附录：资质证书原件"
+
+
+def find_office_converter() -> Optional[str]:
+    """查找可用于 docx → pdf 转换的 LibreOffice 可执行文件"""
+    for name in ("soffice", "libreoffice"):
+        path = shutil.which(name)
+        if path:
+            return path
+    return None
+
+
+def export_docx_to_pdf(docx_path: Path, output_dir: Path, timeout: int = 180) -> Optional[Path]:
+    """
+    使用 LibreOffice 将 docx 导出为 PDF
+
+    Args:
+        docx_path: docx 文件路径
+        output_dir: PDF 输出目录
+        timeout: 转换超时时间（秒）
+
+    Returns:
+        导出的 PDF 路径，失败时返回 None
+    """
+    converter = find_office_converter()
+    if not converter:
+        print("✗ 未找到 LibreOffice，无法将正文导出为 PDF")
+        print("  Mac 安装命令: brew install --cask libreoffice")
+        print("  Linux 安装命令: sudo apt-get install libreoffice")
+        return None
+
+    output_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        result = subprocess.run(
+            [converter, '--headless', '--convert-to', 'pdf',
+             '--outdir', str(output_dir), str(docx_path)],
+            capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        print(f"✗ 正文导出 PDF 超时: {docx_path.name}")
+        return None
+
+    pdf_path = output_dir / docx_path.with_suffix('.pdf').name
+    if result.returncode != 0 or not pdf_path.exists():
+        print(f"✗ 正文导出 PDF 失败: {result.stderr.strip()}")
+        return None
+
+    return pdf_path
+
+
+def _collect_appendix_entries(groups: List[Tuple[str, List[Dict]]], data_dir: Path) -> List[Tuple[str, List[Dict]]]:
+    """过滤出有证书原件的条目，并确定每个证书要附上的页面"""
+    entries = []
+    for category, certs in groups:
+        items = []
+        for cert in certs:
+            if not cert.get('cert_file'):
+                continue
+            cert_path = data_dir / cert['cert_file']
+            if not cert_path.exists() or cert_path.suffix.lower() != '.pdf':
+                print(f"✗ 证书原件不存在或不是 PDF: {cert['cert_file']}")
+                continue
+            try:
+                # 附录默认附上证书原件全部页面，资质的 "pages" 字段可指定页面
+                pages = parse_page_selection(cert.get('pages') or 'all', get_page_count(cert_path))
+            except Exception as e:
+                print(f"✗ 证书原件读取失败: {cert['cert_file']} - {e}")
+                continue
+            if pages:
+                items.append({'cert': cert, 'path': cert_path, 'pages': pages, 'page_count': len(pages)})
+        if items:
+            entries.append((category, items))
+    return entries
+
+
+def _render_index_pages(entries: List[Tuple[str, List[Dict]]], first_cert_page: int) -> bytes:
+    """
+    使用 reportlab 生成附录索引页
+
+    Args:
+        entries: 附录条目（按类别分组）
+        first_cert_page: 第一个证书在最终 PDF 中的页码（从 1 开始）
+
+    Returns:
+        索引页 PDF 字节
+    """
+    from reportlab.lib.pagesizes import A4
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    from reportlab.pdfgen import canvas
+
+    font_name = 'STSong-Light'
+    pdfmetrics.registerFont(UnicodeCIDFont(font_name))
+
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=A4)
+    width, height = A4
+    left, right, top, line_height = 60, width - 60, height - 70, 18
+
+    y = top
+    lines = 0
+
+    def new_page():
+        nonlocal y, lines
+        c.showPage()
+        y = top
+        lines = 0
+
+    c.setFont(font_name, 16)
+    c.drawCentredString(width / 2, y, APPENDIX_TITLE)
+    y -= line_height * 2
+    lines += 2
+
+    page_no = first_cert_page
+    for category, items in entries:
+        if lines >= INDEX_LINES_PER_PAGE:
+            new_page()
+        c.setFont(font_name, 13)
+        c.drawString(left, y, category)
+        y -= line_height
+        lines += 1
+
+        c.setFont(font_name, 11)
+        for item in items:
+            if lines >= INDEX_LINES_PER_PAGE:
+                new_page()
+                c.setFont(font_name, 11)
+            cert = item['cert']
+            c.drawString(left + 20, y, f"{cert['name']}（{cert.get('level', '')}）")
+            c.drawRightString(right, y, f"第 {page_no} 页")
+            y -= line_height
+            lines += 1
+            page_no += item['page_count']
+
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+
+def _count_index_pages(entries: List[Tuple[str, List[Dict]]]) -> int:
+    """估算索引页页数（与 _render_index_pages 的分页规则一致）"""
+    total_lines = 2 + sum(1 + len(items) for _, items in entries)
+    return max(1, math.ceil(total_lines / INDEX_LINES_PER_PAGE))
+
+
+def build_certificate_appendix(body_pdf: Path, groups: List[Tuple[str, List[Dict]]],
+                               data_dir: Path, output_path: Path) -> Dict:
+    """
+    将证书原件 PDF 作为附录合并到正文 PDF 之后
+
+    Args:
+        body_pdf: 正文 PDF 路径
+        groups: 按类别分组的证书 [(类别标题, 证书列表), ...]
+        data_dir: 数据目录（证书文件相对该目录）
+        output_path: 合并后的 PDF 路径
+
+    Returns:
+        合并结果 {'output_path', 'body_pages', 'appendix_pages', 'certificates': {证书ID: 起始页码}}
+    """
+    entries = _collect_appendix_entries(groups, data_dir)
+
+    writer = PdfWriter()
+    writer.append(str(body_pdf), import_outline=False)
+    body_pages = len(writer.pages)
+
+    cert_pages = {}
+    if entries:
+        index_pages = _count_index_pages(entries)
+        index_start = body_pages
+        first_cert_page = body_pages + index_pages + 1
+
+        writer.append(PdfReader(BytesIO(_render_index_pages(entries, first_cert_page))), import_outline=False)
+        root = writer.add_outline_item(APPENDIX_TITLE, index_start)
+
+        for category, items in entries:
+            parent = None
+            for item in items:
+                start = len(writer.pages)
+                writer.append(str(item['path']), pages=item['pages'], import_outline=False)
+                if parent is None:
+                    parent = writer.add_outline_item(category, start, parent=root)
+                writer.add_outline_item(item['cert']['name'], start, parent=parent)
+                cert_pages[item['cert']['id']] = start + 1
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'wb') as f:
+        writer.write(f)
+
+    total_certs = sum(len(items) for _, items in entries)
+    print(f"✓ 证书附录合并完成: {total_certs} 个证书, 共 {len(writer.pages)} 页")
+
+    return {
+        'output_path': output_path,
+        'body_pages': body_pages,
+        'appendix_pages': len(writer.pages) - body_pages,
+        'certificates': cert_pages,
+    }
@@ -8,75 +8,40 @@ PDF 转图片服务
 import sys
 import os
 from pathlib import Path
-import tempfile
-from datetime import datetime
 
+from cert_images import CertificateImageConverter, get_page_count, parse_page_selection
 
-def pdf_to_images(pdf_path: Path, output_dir: Path, dpi: int = 200, max_width: int = 500):
+
+def pdf_to_images(pdf_path: Path, output_dir: Path, dpi: int = 200, max_width: int = 500, pages="1"):
     """
     将 PDF 转换为图片
     
+    扫描件证书直接提取内嵌图片，矢量页面才使用 Ghostscript 渲染。
+    
     Args:
         pdf_path: PDF 文件路径
         output_dir: 输出目录
         dpi: 分辨率（默认 200）
         max_width: 最大宽度（像素，默认 500）
+        pages: 页面选择（默认第 1 页，支持 "1-3"、"1,3"、"all"）
     
     Returns:
         转换后的图片路径列表
     """
-    try:
-        from pdf2image import convert_from_path
-        from PIL import Image as PILImage
-    except ImportError as e:
-        print(f"✗ 导入错误: {e}")
-        print("请安装: pip install pdf2image Pillow")
-        print("还需要安装 Ghostscript")
-        return []
+    converter = CertificateImageConverter(dpi=dpi, max_width=max_width)
+    page_indexes = parse_page_selection(pages, get_page_count(pdf_path))
     
     images = []
+    for page_index in page_indexes:
+        output_path = output_dir / f"{pdf_path.stem}_{page_index + 1}.jpg"
+        if converter.convert_page(pdf_path, output_path, page_index):
+            images.append(output_path)
     
-    try:
-        # 创建临时目录
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # 转换 PDF 为图片（只转换第一页）
-            # 不使用 output_folder，直接返回 PIL Image 对象
-            converted = convert_from_path(
-                str(pdf_path),
-                first_page=1,
-                last_page=1,
-                dpi=dpi,
-                fmt='jpg',
-                use_cropbox=True
-            )
-
-            if not converted:
-                print(f"✗ PDF 转换失败: {pdf_path.name}")
-                return []
-
-            # 调整图片大小并保存
-            for img in converted:
-                img_width, img_height = img.size
-
-                # 如果图片太宽，调整宽度
-                if img_width > max_width:
-                    ratio = max_width / img_width
-                    new_height = int(img_height * ratio)
-                    img = img.resize((max_width, new_height), PILImage.LANCZOS)
-
-                # 保存到输出目录
-                output_filename = f"{pdf_path.stem}_{len(images) + 1}.jpg"
-                output_path = output_dir / output_filename
-                img.save(output_path, quality=85)
-                images.append(output_path)
-                
-            print(f"✓ PDF 转换成功: {pdf_path.name} -> {len(images)} 张图片")
-            
-    except Exception as e:
-        print(f"✗ PDF 转换失败: {pdf_path.name} - {e}")
-        import traceback
-        traceback.print_exc()
+    if not images:
+        print(f"✗ PDF 转换失败: {pdf_path.name}")
+        return []
     
+    print(f"✓ PDF 转换成功: {pdf_path.name} -> {len(images)} 张图片（{converter.format_stats()}）")
     return images
 
 
@@ -92,50 +57,11 @@ def convert_certificates(qualifications: list, data_dir: Path, output_dir: Path)
     Returns:
         转换结果字典 {证书ID: 图片路径列表}
     """
-    results = {}
-    total = 0
-    success = 0
-    failed = 0
-    
     print(f"开始转换 {len(qualifications)} 个证书...")
     
-    for i, cert in enumerate(qualifications, 1):
-        cert_file = cert.get('cert_file')
-        if not cert_file:
-            continue
-        
-        cert_path = data_dir / cert_file
-        if not cert_path.exists():
-            print(f"✗ 证书文件不存在: {cert_file}")
-            failed += 1
-            continue
-        
-        # 转换 PDF 为图片
-        images = pdf_to_images(cert_path, output_dir)
-        
-        if images:
-            results[cert['id']] = {
-                'name': cert['name'],
-                'level': cert['level'],
-                'images': images
-            }
-            success += 1
-        else:
-            results[cert['id']] = {
-                'name': cert['name'],
-                'level': cert['level'],
-                'images': [],
-                'error': '转换失败'
-            }
-            failed += 1
-        
-        total += 1
-        
-        if total > 0 and total % 5 == 0:
-            print(f"进度: {i}/{len(qualifications)}")
-    
+    converter = CertificateImageConverter()
+    results = converter.convert_certificates(qualifications, data_dir, output_dir)
     print()
-    print(f"转换完成: 总计 {total}, 成功 {success}, 失败 {failed}")
     
     return results
 
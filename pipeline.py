@@ -0,0 +1,95 @@
+"""
+无界面生成流程
+
+按 app.py 三个步骤的相同调用顺序运行 解析 → 匹配 → 生成，不依赖 Streamlit，
+供性能回归测试（golden_tenders.py）、并发压力测试（load_test.py）等在命令行中运行完整流程：
+
+    result = run_pipeline(files, parser, db, generator)
+    result["artifacts"]   # 生成结果（BidArtifact）
+    result["timings"]     # 各步骤耗时（秒）
+"""
+
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from config import COMPANY_INFO
+
+
+def parse_tender_files(parser, files: List[Path]) -> Dict:
+    """
+    解析多个招标文件并合并结果（第一步）
+
+    Returns:
+        招标信息 {'requirements', 'project_info', 'confidence_scores'}
+    """
+    requirements = []
+    confidence_scores = []
+    project_names = []
+    for path in files:
+        result = parser.parse_file(path)
+        requirements.extend(result.requirements)
+        confidence_scores.append(result.confidence_score)
+        if result.project_name:
+            project_names.append(result.project_name)
+
+    tender_info = {"requirements": requirements, "confidence_scores": confidence_scores}
+    if project_names:
+        # 使用第一个文件的项目名称
+        tender_info["project_info"] = {"project_name": project_names[0]}
+    return tender_info
+
+
+def match_company_data(db, requirements: List[str]) -> Dict:
+    """按需求匹配资质、案例、产品和人员（第二步）"""
+    return {
+        "qualifications": db.match_qualifications(requirements),
+        "cases": db.match_cases(requirements),
+        "products": db.match_products(requirements),
+        "personnel": db.get_personnel(),
+    }
+
+
+def run_pipeline(files: List[Path], parser, db, generator, company_info: Optional[Dict] = None,
+                 separate_bids: bool = True, compression_profile: Optional[str] = None,
+                 project_name: Optional[str] = None) -> Dict:
+    """
+    运行完整流程
+
+    Args:
+        files: 招标文件
+        parser: TenderParser
+        db: CompanyDatabase
+        generator: BidDocumentGenerator
+        company_info: 公司信息，默认见 COMPANY_INFO
+        separate_bids: 是否分开生成技术标和商务标
+        compression_profile: 证书图片压缩方案
+        project_name: 项目名称（同界面第三步中填写的项目名称），为空时使用解析出的名称
+
+    Returns:
+        {'tender_info', 'matched_data', 'artifacts', 'timings': {'parse', 'match', 'generate'}}
+    """
+    timings = {}
+
+    start = time.perf_counter()
+    tender_info = parse_tender_files(parser, files)
+    timings["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    matched_data = match_company_data(db, tender_info["requirements"])
+    timings["match"] = time.perf_counter() - start
+
+    # 第三步：与界面相同，始终显示证书图片
+    tender_info["show_cert_images"] = True
+    tender_info["generate_time"] = datetime.now().isoformat()
+    if project_name:
+        tender_info["project_info"] = {"project_name": project_name}
+    start = time.perf_counter()
+    artifacts = generator.generate_artifacts(
+        tender_info, company_info or COMPANY_INFO, matched_data,
+        separate_bids=separate_bids, show_cert_images=True, compression_profile=compression_profile
+    )
+    timings["generate"] = time.perf_counter() - start
+
+    return {"tender_info": tender_info, "matched_data": matched_data, "artifacts": artifacts, "timings": timings}
@@ -0,0 +1,167 @@
+"""
+性能分析（cProfile）
+
+某个招标文件特别慢时，在调试面板打开性能分析，对这一次解析/匹配/生成运行 cProfile：
+
+    with profile_run("生成投标文件") as run:
+        generator.generate_separate_bids(...)
+    run.top_functions(30)   # 累计耗时最多的函数
+    run.path                # 保存的 .prof 文件（可用 snakeviz 查看）
+
+cProfile 只分析启用它的线程。章节构建和证书转换在线程池中进行，这些任务由
+tracing.bind_context 提交，经 profile_task 在工作线程中单独分析，结束后合并到本次结果。
+"""
+
+import contextvars
+import cProfile
+import pstats
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from config import BASE_DIR, PROFILE_DIR, PROFILE_CONFIG
+
+# 当前线程所属的分析
+_current_run = contextvars.ContextVar("profile_run", default=None)
+
+
+class ProfileRun:
+    """一次性能分析"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.started_at = datetime.now()
+        self.seconds: Optional[float] = None
+        self.path: Optional[Path] = None  # 保存的 .prof 文件
+        self._profile = cProfile.Profile()
+        self._thread_id = threading.get_ident()
+        self._workers: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._stats = None
+
+    def run_task(self, func: Callable, *args, **kwargs):
+        """在工作线程中分析一个任务，结果合并到本次分析"""
+        if threading.get_ident() == self._thread_id:
+            # 在启用分析的线程中直接调用，已被主分析覆盖
+            return func(*args, **kwargs)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:
+            # Python 3.12 起同一时间只能启用一个 cProfile（基于 sys.monitoring，主分析已包含所有线程）
+            return func(*args, **kwargs)
+        try:
+            return func(*args, **kwargs)
+        finally:
+            profile.disable()
+            with self._lock:
+                self._workers.append(profile)
+
+    def stats(self) -> pstats.Stats:
+        """合并主线程和工作线程的统计"""
+        if self._stats is None:
+            stats = pstats.Stats(self._profile)
+            with self._lock:
+                for profile in self._workers:
+                    stats.add(profile)
+            self._stats = stats
+        return self._stats
+
+    def top_functions(self, limit: Optional[int] = None, sort: str = "cumulative") -> List[Dict]:
+        """
+        耗时最多的函数
+
+        Args:
+            limit: 条数，默认见 PROFILE_CONFIG
+            sort: cumulative（累计耗时，含调用的函数）或 tottime（自身耗时）
+
+        Returns:
+            [{'function', 'calls', 'tottime', 'cumtime'}, ...]
+        """
+        limit = limit or PROFILE_CONFIG["top_n"]
+        entries = []
+        for (filename, line, name), (_, calls, tottime, cumtime, _) in self.stats().stats.items():
+            entries.append({
+                "function": _format_function(filename, line, name),
+                "calls": calls,
+                "tottime": tottime,
+                "cumtime": cumtime,
+            })
+        key = "tottime" if sort == "tottime" else "cumtime"
+        entries.sort(key=lambda entry: entry[key], reverse=True)
+        return entries[:limit]
+
+    def save(self, path: Optional[Path] = None) -> Path:
+        """保存为 .prof 文件，默认写入 cache/profiles/"""
+        if path is None:
+            safe_name = "".join(c for c in self.name if c not in '\\/:*?"<>| ')
+            path = PROFILE_DIR / f"{self.started_at:%Y%m%d_%H%M%S}_{safe_name}.prof"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.stats().dump_stats(str(path))
+        self.path = path
+        return path
+
+
+def _format_function(filename: str, line: int, name: str) -> str:
+    """函数位置，项目内文件用相对路径，第三方库只保留包内路径"""
+    if filename == "~":
+        return name  # 内置函数，如 <built-in method time.sleep>
+    path = Path(filename)
+    try:
+        filename = str(path.relative_to(BASE_DIR))
+    except ValueError:
+        parts = path.parts
+        if "site-packages" in parts:
+            filename = "/".join(parts[parts.index("site-packages") + 1:])
+    return f"{filename}:{line}({name})"
+
+
+def profile_task(func: Callable, *args, **kwargs):
+    """运行线程池任务；当前有进行中的分析时在工作线程中一并分析"""
+    run = _current_run.get()
+    if run is None:
+        return func(*args, **kwargs)
+    return run.run_task(func, *args, **kwargs)
+
+
+@contextmanager
+def profile_run(name: str) -> Iterator[Optional[ProfileRun]]:
+    """
+    分析代码块，结束后保存 .prof 文件（只保留最近的若干个）
+
+    已有其他分析在运行而无法启用时（Python 3.12 起同一时间只能启用一个 cProfile，
+    如两个调试用户同时分析），打印警告并照常运行代码块，得到 None。
+    """
+    run = ProfileRun(name)
+    try:
+        run._profile.enable()
+    except ValueError as e:
+        print(f"⚠️ 性能分析未启用: {e}")
+        yield None
+        return
+    token = _current_run.set(run)
+    start = time.perf_counter()
+    try:
+        yield run
+    finally:
+        run._profile.disable()
+        run.seconds = time.perf_counter() - start
+        _current_run.reset(token)
+        try:
+            run.save()
+            prune_profiles()
+        except OSError as e:
+            print(f"⚠️ 性能分析结果保存失败: {e}")
+
+
+def prune_profiles(profile_dir: Optional[Path] = None, keep: Optional[int] = None) -> int:
+    """只保留最近的 .prof 文件，返回删除的数量"""
+    profile_dir = profile_dir or PROFILE_DIR
+    keep = keep if keep is not None else PROFILE_CONFIG["keep"]
+    files = sorted(profile_dir.glob("*.prof"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in files[keep:]:
+        path.unlink(missing_ok=True)
+    return max(0, len(files) - keep)
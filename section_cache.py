@@ -0,0 +1,90 @@
+"""
+章节片段缓存
+
+每个章节片段序列化为 docx 字节，按章节实际输入的哈希缓存在磁盘上：
+招标信息中该章节用到的字段、匹配到的记录、公司通用内容版本、模板版本等。
+重新生成时只有输入变化的章节会重新构建，其余章节直接读取缓存。
+"""
+
+import hashlib
+import json
+import os
+import uuid
+from io import BytesIO
+from pathlib import Path
+from typing import Optional
+
+from docx import Document
+
+from config import SECTION_CACHE_DIR, BID_BUILD_CONFIG
+from docx_writer import save_docx
+
+
+def file_signature(path: Path) -> Optional[list]:
+    """文件签名（路径 + 大小 + 修改时间），文件不存在时返回 None"""
+    path = Path(path)
+    if not path.exists():
+        return None
+    stat = path.stat()
+    return [str(path.resolve()), stat.st_size, stat.st_mtime_ns]
+
+
+def hash_inputs(*parts) -> str:
+    """对任意可 JSON 序列化的输入计算稳定哈希（字典按键排序）"""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SectionCache:
+    """章节片段磁盘缓存"""
+
+    def __init__(self, cache_dir: Optional[Path] = None, max_entries: Optional[int] = None):
+        self.cache_dir = cache_dir or SECTION_CACHE_DIR
+        self.max_entries = max_entries or BID_BUILD_CONFIG["section_cache_max_entries"]
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.docx"
+
+    def get(self, key: str) -> Optional[Document]:
+        """读取缓存的章节片段，未命中或文件损坏时返回 None"""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        try:
+            fragment = Document(BytesIO(data))
+        except Exception as e:
+            print(f"⚠️ 章节缓存损坏，重新生成: {path.name} - {e}")
+            path.unlink(missing_ok=True)
+            return None
+
+        # 更新访问时间，清理时保留最近使用的片段
+        os.utime(path)
+        return fragment
+
+    def put(self, key: str, fragment: Document):
+        """保存章节片段（先写临时文件再原子替换）"""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        # 缓存追求写入速度，XML 使用最快的压缩级别
+        buffer = BytesIO()
+        save_docx(fragment, buffer, compresslevel=1)
+
+        path = self._path(key)
+        tmp_path = path.with_name(f"{key}.{uuid.uuid4().hex[:8]}.tmp")
+        tmp_path.write_bytes(buffer.getvalue())
+        os.replace(tmp_path, path)
+
+    def prune(self) -> int:
+        """超过最大数量时删除最久未使用的片段，返回删除数量"""
+        entries = sorted(self.cache_dir.glob("*.docx"), key=lambda p: p.stat().st_mtime)
+        excess = entries[:max(0, len(entries) - self.max_entries)]
+        for path in excess:
+            path.unlink(missing_ok=True)
+        return len(excess)
+
+    def clear(self):
+        """清空章节缓存"""
+        for path in self.cache_dir.glob("*.docx"):
+            path.unlink(missing_ok=True)
@@ -0,0 +1,153 @@
+"""
+服务容器
+
+每个进程只创建一次数据库、解析器和生成器（Streamlit 每次交互都会重新执行页面脚本，
+之前每次都会重新创建并打印数据模式横幅），并在后台预热：
+1. 加载公司资料，建立证书文件清单
+2. 读取公司通用内容
+3. 检查证书栅格化工具（只检查一次）
+4. 启动后台线程（输出目录清理、证书预渲染，开启时还有监控指标导出）
+5. 把全部证书转换进渲染缓存
+
+预热在后台线程中进行，页面不必等待；status() 返回是否就绪和各步骤耗时。
+"""
+
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from cert_images import find_rasterizer
+from cert_prerender import CertificatePrerenderer, PrerenderBatch, get_prerenderer
+from config import DATA_DIR, TEMPLATES_DIR, OUTPUT_DIR, CERT_IMAGE_CONFIG
+from database import CompanyDatabase
+from generator import BidDocumentGenerator, COMPANY_CONTENT_AVAILABLE
+from metrics_exporter import start_exporter
+from metrics_store import MetricsStore
+from output_retention import OutputRetention, start_background_cleanup
+from parser import TenderParser
+
+if COMPANY_CONTENT_AVAILABLE:
+    from generator import COMPANY_CONTENT_SECTIONS
+    from company_content import read_temp_file
+
+
+class Services:
+    """进程内共用的服务（数据库、解析器、生成器、证书预渲染、生成指标历史）"""
+
+    def __init__(self, data_dir: Optional[Path] = None, templates_dir: Optional[Path] = None,
+                 output_dir: Optional[Path] = None, prerenderer: Optional[CertificatePrerenderer] = None,
+                 metrics: Optional[MetricsStore] = None,
+                 start_cleanup: Callable[[OutputRetention], object] = start_background_cleanup):
+        self.data_dir = data_dir or DATA_DIR
+        self.output_dir = output_dir or OUTPUT_DIR
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+
+        self.db = CompanyDatabase(self.data_dir)
+        self.parser = TenderParser(self.data_dir)
+        self.generator = BidDocumentGenerator(templates_dir or TEMPLATES_DIR, self.output_dir)
+        self.prerenderer = prerenderer or get_prerenderer()
+        self.metrics = metrics or MetricsStore()
+        self.start_cleanup = start_cleanup  # 启动输出目录清理线程（测试时可替换）
+
+        self.ready = threading.Event()
+        self.steps: List[tuple] = []  # [(步骤, 耗时秒数, 说明), ...]
+        self.warmup_seconds: Optional[float] = None
+        self.error: Optional[str] = None
+        self.prerender_batch: Optional[PrerenderBatch] = None  # 预热证书缓存的批次
+        self._qualifications: List[Dict] = []
+        self._thread = None
+
+    def start_warmup(self, background: bool = True):
+        """开始预热（重复调用无效）"""
+        if self._thread is not None or self.ready.is_set():
+            return
+        if not background:
+            self._warmup()
+            return
+        self._thread = threading.Thread(target=self._warmup, name="services-warmup", daemon=True)
+        self._thread.start()
+
+    def _step(self, name: str, func):
+        start = time.perf_counter()
+        detail = func()
+        self.steps.append((name, time.perf_counter() - start, detail))
+        return detail
+
+    def _load_company_data(self) -> str:
+        qualifications = self.db.get_qualifications()
+        self._qualifications = qualifications
+        counts = (len(qualifications), len(self.db.get_cases()),
+                  len(self.db.get_products()), len(self.db.get_personnel()))
+        with_files = sum(1 for q in qualifications if q.get("cert_file")
+                         and (self.data_dir / q["cert_file"]).exists())
+        return f"资质 {counts[0]}（证书文件 {with_files}）、案例 {counts[1]}、产品 {counts[2]}、人员 {counts[3]}"
+
+    def _load_company_content(self) -> str:
+        if not COMPANY_CONTENT_AVAILABLE:
+            return "company_content 模块不可用"
+        loaded = sum(1 for _, filename in COMPANY_CONTENT_SECTIONS.values() if read_temp_file(filename))
+        return f"{loaded}/{len(COMPANY_CONTENT_SECTIONS)} 个章节有内容"
+
+    def _check_rasterizer(self) -> str:
+        rasterizer = find_rasterizer()
+        if rasterizer is None:
+            return "未安装 pdftoppm/Ghostscript，只能提取扫描件内嵌图片"
+        return f"{rasterizer[0]}（{rasterizer[1]}）"
+
+    def _start_workers(self) -> str:
+        self.start_cleanup(OutputRetention(self.output_dir))
+        exporter = start_exporter()
+        return "输出目录清理、证书预渲染" + (f"、监控指标（{exporter}）" if exporter else "")
+
+    def _warm_cert_cache(self) -> str:
+        if not CERT_IMAGE_CONFIG.get("prerender"):
+            return "已关闭"
+        self.prerender_batch = self.prerenderer.schedule(self._qualifications, self.data_dir)
+        return f"后台转换 {self.prerender_batch.submitted} 个证书"
+
+    def _warmup(self):
+        start = time.perf_counter()
+        try:
+            self._step("加载公司资料", self._load_company_data)
+            self._step("读取公司通用内容", self._load_company_content)
+            self._step("检查栅格化工具", self._check_rasterizer)
+            self._step("启动后台线程", self._start_workers)
+            self._step("预热证书缓存", self._warm_cert_cache)
+        except Exception as e:
+            self.error = str(e)
+            print(f"⚠️ 服务预热失败: {e}")
+        finally:
+            self.warmup_seconds = time.perf_counter() - start
+            self.ready.set()
+            if self.error is None:
+                print(f"✓ 服务就绪（预热 {self.warmup_seconds:.2f}s）")
+
+    def status(self) -> Dict:
+        """
+        就绪状态
+
+        Returns:
+            {'ready', 'warmup_seconds', 'steps', 'error', 'prerender'}，prerender 为预热证书缓存的进度（未预热时为 None）
+        """
+        return {
+            "ready": self.ready.is_set(),
+            "warmup_seconds": self.warmup_seconds,
+            "steps": list(self.steps),
+            "error": self.error,
+            "prerender": self.prerender_batch.status() if self.prerender_batch else None,
+        }
+
+
+_services = None
+_services_lock = threading.Lock()
+
+
+def get_services() -> Services:
+    """进程内共用的服务容器（首次调用时创建并开始后台预热）"""
+    global _services
+    with _services_lock:
+        if _services is None:
+            _services = Services()
+            _services.start_warmup()
+        return _services
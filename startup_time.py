@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+启动耗时报告
+
+在新的 Python 进程中冷启动导入应用模块（python -X importtime），
+报告总耗时、各依赖包的导入耗时，以及不应在启动时导入的重量级依赖是否被提前导入。
+
+用法：
+    python startup_time.py                 # 应用模块
+    python startup_time.py generator       # 指定模块
+    python startup_time.py --top 20        # 列出耗时最多的 20 个包
+"""
+
+import json
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List
+
+# 页面脚本（app.py / app_fixed.py）在绘制第一个组件前导入的模块
+APP_MODULES = ["config", "database", "parser", "generator", "services",
+               "bid_preview", "cert_prerender", "output_store", "output_retention"]
+
+# 首次使用时才导入的重量级依赖（PDF 解析、图片处理）
+LAZY_MODULES = ["pypdf", "PyPDF2", "pdf2image", "PIL", "reportlab"]
+
+# 冷启动导入应用模块的时间预算（秒）
+IMPORT_BUDGET_SECONDS = 2.0
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{imports}
+seconds = time.perf_counter() - start
+print(json.dumps({{"seconds": seconds, "lazy_loaded": [m for m in {lazy!r} if m in sys.modules]}}))
+"""
+
+
+def measure_cold_import(modules: List[str] = None) -> Dict:
+    """
+    在新进程中导入模块并记录耗时
+
+    Returns:
+        {'seconds': 总耗时, 'lazy_loaded': 被提前导入的重量级依赖,
+         'imports': [(模块名, 自身耗时秒数, 累计耗时秒数), ...]}
+    """
+    modules = modules or APP_MODULES
+    probe = _PROBE.format(imports="\n".join(f"import {m}" for m in modules), lazy=LAZY_MODULES)
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", probe],
+        cwd=Path(__file__).parent, capture_output=True, text=True, timeout=120
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"导入失败:\n{result.stderr[-2000:]}")
+
+    imports = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        imports.append((name.strip(), int(self_us) / 1e6, int(cumulative_us) / 1e6))
+
+    summary = json.loads(result.stdout.strip().splitlines()[-1])
+    summary["imports"] = imports
+    return summary
+
+
+def package_costs(imports: List[tuple]) -> List[tuple]:
+    """按顶层包汇总导入耗时 [(包名, 耗时秒数), ...]，耗时降序"""
+    costs = defaultdict(float)
+    for name, self_seconds, _ in imports:
+        costs[name.split(".")[0]] += self_seconds
+    return sorted(costs.items(), key=lambda item: item[1], reverse=True)
+
+
+def main():
+    args = sys.argv[1:]
+    top = 15
+    if "--top" in args:
+        index = args.index("--top")
+        top = int(args[index + 1])
+        del args[index:index + 2]
+    modules = args or APP_MODULES
+
+    result = measure_cold_import(modules)
+    status = "✓" if result["seconds"] <= IMPORT_BUDGET_SECONDS else "✗"
+    print(f"{status} 冷启动导入 {', '.join(modules)}")
+    print(f"  总耗时: {result['seconds']:.3f}s（预算 {IMPORT_BUDGET_SECONDS:.1f}s）")
+    if result["lazy_loaded"]:
+        print(f"⚠️ 启动时导入了应延迟导入的依赖: {', '.join(result['lazy_loaded'])}")
+    print()
+
+    print(f"{'包':<24}{'导入耗时':>10}")
+    print("-" * 34)
+    for package, seconds in package_costs(result["imports"])[:top]:
+        print(f"{package:<24}{seconds * 1000:>8.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
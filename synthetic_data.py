@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+合成测试数据
+
+按随机种子生成任意规模的公司资料和招标文件，用于性能测试和压力测试
+（data/examples/ 中的示例数据只有几条记录，不足以暴露性能问题）：
+- 公司资料：资质（附真实的证书 PDF，扫描件/多页扫描件/矢量文件）、案例、产品、人员、设备规格，
+  格式同 data/examples/，可直接作为 CompanyDatabase 的数据目录
+- 招标文件：指定页数的 PDF/DOCX/DOC（DOC 由 LibreOffice 从 DOCX 转换，未安装时无法生成）
+
+种子和参数相同时生成的内容相同（PDF/DOCX 文件中的时间戳除外）。
+benchmark.py 和 golden_tenders.py 的测试数据均由本模块生成。
+
+用法：
+    python synthetic_data.py company out/data --qualifications 500 --cases 10000 --equipment-rows 2000
+    python synthetic_data.py tender out/tenders --pages 200 --formats pdf,docx,doc
+    python synthetic_data.py company out/data --seed 42     # 默认种子为 0
+"""
+
+import json
+import random
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# 不含任何需求关键词的正文（工程概况、现场描述等）
+FILLER_SENTENCES = ["本工程位于城区东侧", "现场道路通畅", "周边交通便利", "施工区域开阔", "附近有变电站一座",
+                    "气候温和湿润", "场地地势平坦", "供电由市政电网接入", "主体为钢结构厂房", "办公区位于北侧"]
+
+# 需求句（少于 20 条，去重后不会提前停止，整篇文本都要扫描）
+REQUIREMENT_SENTENCES = [
+    "投标人须具备有效的 ISO9001 质量管理体系认证证书",
+    "投标人须具备 ISO14001 环境管理体系认证",
+    "投标人须具备职业健康安全管理体系认证",
+    "产品须通过 CCC 强制性产品认证并提供型式试验报告",
+    "投标人须具有 AAA 级信用等级证书",
+    "近三年须有不少于 3 个同类项目业绩",
+    "项目经理须具有一级建造师执业资格",
+    "技术负责人须具有高级工程师职称",
+    "设备质保期不少于 24 个月",
+    "注册资金不低于 5000 万元",
+    "交付工期不超过 90 个日历天",
+    "所投产品须满足 GB/T 11022 标准要求",
+    "售后服务响应时间不超过 2 小时",
+    "代理商投标须提供制造商授权书",
+]
+
+_CHAPTERS = ["投标人须知", "项目概况", "技术要求", "商务要求", "评标办法", "合同条款", "投标文件格式"]
+
+# (证书名称, 页数)；按 QUALIFICATION_CATEGORIES 分布到各小节，其余为其他证书
+_CERTIFICATES = [
+    ("质量管理体系认证", 1), ("环境管理体系认证", 1), ("职业健康安全管理体系认证", 1), ("能源管理体系认证", 1),
+    ("AAA级信用等级证书", 1), ("重合同守信用企业", 1), ("省级重点新产品", 1), ("市长质量奖", 1),
+    ("断路器制造商授权书", 2), ("战略合作协议", 2), ("安全生产许可证", 1), ("承装（修、试）电力设施许可证", 2),
+    ("高新技术企业证书", 1), ("型式试验报告", 3),
+]
+
+_PRODUCT_TYPES = ["高压开关柜", "低压开关柜", "环网柜", "箱式变电站", "预制舱", "配电箱", "变压器"]
+_LEVELS = ["一级", "二级", "三级", "甲级", "乙级"]
+_PERSONNEL_GROUPS = [("management", "项目经理"), ("engineers", "电气工程师"), ("workers", "安装工")]
+
+# 扫描件尺寸（A4 150dpi / 300dpi）
+_SCAN_SIZES = {"scan": (1240, 1754), "scan_large": (2480, 3508)}
+
+# 招标文件每页行数、需求句比例
+_LINES_PER_PAGE = 32
+_REQUIREMENT_RATIO = 0.08
+
+TENDER_FORMATS = ["pdf", "docx", "doc"]
+
+
+# ==================== 公司资料 ====================
+
+def company_records(rng: random.Random, qualifications: int = 50, cases: int = 100, products: int = 50,
+                    personnel: int = 4, equipment_rows: int = 200,
+                    certificates: Optional[int] = None) -> Dict[str, Dict]:
+    """
+    公司资料 JSON 文件内容 {文件名: 内容}，格式同 data/examples/
+
+    Args:
+        qualifications / cases / products: 记录数
+        personnel: 每组（管理人员/工程师/施工人员）人数
+        equipment_rows: 设备规格行数
+        certificates: 前多少条资质带证书文件（certs/00001.pdf ...），默认全部；
+            只写入 cert_file 字段，证书 PDF 由 write_company_data 生成
+
+    Returns:
+        {'qualifications.json', 'cases.json', 'products.json', 'personnel.json', 'equipment_specs.json'}
+    """
+    certificates = qualifications if certificates is None else min(certificates, qualifications)
+    qualification_list = []
+    for i in range(qualifications):
+        name, pages = _CERTIFICATES[i % len(_CERTIFICATES)]
+        if i >= len(_CERTIFICATES):
+            name = f"{name}（{i // len(_CERTIFICATES) + 1}）"
+        has_file = i < certificates
+        qualification_list.append({
+            "id": i + 1, "name": name, "level": rng.choice(_LEVELS),
+            "cert_no": f"SYN-{i + 1:06d}", "valid_until": "2030-12-31",
+            "cert_file": f"certs/{i + 1:05d}.pdf" if has_file else "",
+            "pages": "all" if has_file and pages > 1 else None,
+            "created_at": "2024-01-01T00:00:00",
+        })
+
+    case_list = [{
+        "id": i + 1,
+        "project_name": f"{rng.choice(['城南', '城北', '开发区', '工业园'])}{rng.choice(_PRODUCT_TYPES)}项目{i + 1}",
+        "client": f"客户{rng.randint(1, 500)}",
+        "industry": rng.choice(["电力", "轨道交通", "石化", "数据中心"]),
+        "product_type": rng.choice(_PRODUCT_TYPES),
+        "amount": rng.randint(10, 5000) * 10000,
+        "year": rng.randint(2015, 2025),
+        "description": "配电设备供货及安装",
+        "created_at": "2024-01-01T00:00:00",
+    } for i in range(cases)]
+
+    product_list = [{
+        "id": i + 1,
+        "name": f"{rng.choice(_PRODUCT_TYPES)}{i + 1}",
+        "model": f"KYN28A-12/{i + 1}",
+        "category": rng.choice(_PRODUCT_TYPES),
+        "description": "标准型",
+        "base_price": rng.randint(1, 100) * 1000,
+        "created_at": "2024-01-01T00:00:00",
+    } for i in range(products)]
+
+    personnel_groups = {
+        group: [{
+            "id": index * personnel + i + 1, "name": f"{role}{i + 1}", "role": role, "title": "高级工程师",
+            "experience": rng.randint(5, 25), "certificates": ["一级建造师"], "created_at": "2024-01-01T00:00:00",
+        } for i in range(personnel)]
+        for index, (group, role) in enumerate(_PERSONNEL_GROUPS)
+    }
+
+    return {
+        "qualifications.json": {"qualifications": qualification_list, "certificates": [], "honors": []},
+        "cases.json": {"cases": case_list},
+        "products.json": {"products": product_list},
+        "personnel.json": personnel_groups,
+        "equipment_specs.json": {"equipment_specs": equipment_specs(equipment_rows, rng)},
+    }
+
+
+def equipment_specs(rows: int, rng: random.Random) -> List[Dict]:
+    """设备规格（equipment_specs.json 的 equipment_specs）"""
+    return [{
+        "sequence": i + 1,
+        "symbol": f"QF{i + 1}",
+        "name": rng.choice(["真空断路器", "隔离开关", "电流互感器", "避雷器", "母线"]),
+        "model": f"VS1-12/{rng.choice([630, 1250, 1600])}",
+        "specifications": f"{rng.choice([630, 1250, 1600])}A 31.5kA",
+        "material": rng.choice(["钢", "铜", "铝"]),
+        "thickness": f"{rng.choice([2, 3, 4])}mm",
+        "weight": round(rng.uniform(1, 500), 1),
+        "unit": rng.choice(["台", "套", "米"]),
+        "quantity": rng.randint(1, 20),
+        "manufacturer": f"厂家{rng.randint(1, 30)}",
+        "remarks": "",
+        "category": rng.choice(["一次设备", "二次设备", "辅助设备"]),
+    } for i in range(rows)]
+
+
+def write_data_dir(data_dir: Path, files: Dict[str, Dict]) -> Path:
+    """写入公司资料 JSON 文件"""
+    data_dir.mkdir(parents=True, exist_ok=True)
+    for name, content in files.items():
+        (data_dir / name).write_text(json.dumps(content, ensure_ascii=False, indent=2), encoding="utf-8")
+    return data_dir
+
+
+def scan_image(path: Path, size: tuple, rng: random.Random) -> Path:
+    """类似扫描件的 JPEG（由随机色块平滑放大，接近实际证书的压缩率）"""
+    from PIL import Image as PILImage
+
+    small = (max(1, size[0] // 32), max(1, size[1] // 32))
+    image = PILImage.frombytes("RGB", small, rng.randbytes(small[0] * small[1] * 3))
+    image.resize(size, PILImage.BILINEAR).save(path, "JPEG", quality=85)
+    return path
+
+
+def certificate_pdf(pdf_path: Path, kind: str, rng: random.Random, pages: int = 1) -> Path:
+    """
+    证书 PDF
+
+    Args:
+        kind: scan（A4 150dpi 扫描件）、scan_large（A4 300dpi 扫描件，需要缩小）、vector（文字和图形，需要栅格化）
+        pages: 页数
+    """
+    from reportlab.pdfgen import canvas
+
+    c = canvas.Canvas(str(pdf_path))
+    for page in range(pages):
+        if kind == "vector":
+            c.drawString(100, 750, f"Certificate of Conformity - page {page + 1}")
+            for _ in range(50):
+                c.rect(rng.uniform(50, 450), rng.uniform(50, 700), rng.uniform(10, 100), rng.uniform(10, 100))
+        else:
+            image_path = scan_image(pdf_path.with_name(f"{pdf_path.stem}_{page + 1}.jpg"), _SCAN_SIZES[kind], rng)
+            c.drawImage(str(image_path), 0, 0, width=595, height=842)
+            image_path.unlink()
+        c.showPage()
+    c.save()
+    return pdf_path
+
+
+def write_company_data(data_dir: Path, files: Dict[str, Dict], rng: random.Random,
+                       vector_ratio: float = 0.0) -> Path:
+    """
+    写入公司资料和其中引用的证书 PDF
+
+    Args:
+        files: company_records 的结果
+        vector_ratio: 矢量证书（需要栅格化）所占比例，其余为 150dpi 扫描件
+    """
+    (data_dir / "certs").mkdir(parents=True, exist_ok=True)
+    for i, qualification in enumerate(files["qualifications.json"]["qualifications"]):
+        if not qualification["cert_file"]:
+            continue
+        pages = _CERTIFICATES[i % len(_CERTIFICATES)][1]
+        kind = "vector" if rng.random() < vector_ratio else "scan"
+        certificate_pdf(data_dir / qualification["cert_file"], kind, rng, pages=pages)
+    return write_data_dir(data_dir, files)
+
+
+def build_company_data(data_dir: Path, seed: int = 0, vector_ratio: float = 0.0, **sizes) -> Path:
+    """
+    生成一份公司资料（含证书 PDF）
+
+    Args:
+        seed: 随机种子
+        vector_ratio: 矢量证书所占比例
+        **sizes: 各类记录数，见 company_records
+    """
+    rng = random.Random(f"{seed}:company")
+    return write_company_data(data_dir, company_records(rng, **sizes), rng, vector_ratio=vector_ratio)
+
+
+# ==================== 招标文件 ====================
+
+def _filler_sentence(rng: random.Random) -> str:
+    return f"{rng.choice(FILLER_SENTENCES)}，{rng.choice(FILLER_SENTENCES)}，面积约 {rng.randint(100, 9999)} 平方米"
+
+
+def tender_text(lines: int, rng: random.Random, requirement_ratio: float = 0.01) -> str:
+    """招标文件正文：大部分是概况描述，按比例穿插需求句"""
+    result = []
+    for i in range(lines):
+        if rng.random() < requirement_ratio:
+            result.append(rng.choice(REQUIREMENT_SENTENCES))
+        else:
+            result.append(f"{i + 1}）{_filler_sentence(rng)}")
+    return "\n".join(result)
+
+
+def tender_pages(project_name: str, pages: int, rng: random.Random) -> List[List[str]]:
+    """招标文件每页的文字行（每 5 页一章，约 8% 的行是需求）"""
+    result = []
+    for page in range(pages):
+        lines = []
+        if page == 0:
+            lines.append(f"项目名称：{project_name}")
+        if page % 5 == 0:
+            lines.append(f"第{page // 5 + 1}章 {_CHAPTERS[(page // 5) % len(_CHAPTERS)]}")
+        while len(lines) < _LINES_PER_PAGE:
+            if rng.random() < _REQUIREMENT_RATIO:
+                lines.append(rng.choice(REQUIREMENT_SENTENCES) + "。")
+            else:
+                lines.append(f"{len(lines)}）{_filler_sentence(rng)}。")
+        result.append(lines)
+    return result
+
+
+def cjk_font() -> str:
+    """
+    注册并返回写中文 PDF 的字体
+
+    优先使用系统中的 TrueType 中文字体（嵌入后 PyPDF2 可以提取文字）；
+    没有时使用 reportlab 内置的 STSong-Light（显示正常，但 PyPDF2 无法提取其中的中文）。
+    """
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    candidates = [
+        "/usr/share/fonts/truetype/wqy/wqy-microhei.ttc",
+        "/usr/share/fonts/truetype/wqy/wqy-zenhei.ttc",
+        "/usr/share/fonts/truetype/arphic/uming.ttc",
+        "/Library/Fonts/Arial Unicode.ttf",
+        "C:/Windows/Fonts/simhei.ttf",
+        "C:/Windows/Fonts/simsun.ttc",
+    ]
+    for path in candidates:
+        if Path(path).exists():
+            try:
+                pdfmetrics.registerFont(TTFont("SyntheticCJK", path))
+                return "SyntheticCJK"
+            except Exception:
+                continue
+
+    from reportlab.pdfbase.cidfonts import UnicodeCIDFont
+    pdfmetrics.registerFont(UnicodeCIDFont("STSong-Light"))
+    return "STSong-Light"
+
+
+def write_tender_pdf(path: Path, project_name: str, pages: int, rng: random.Random,
+                     font: Optional[str] = None) -> Path:
+    from reportlab.pdfgen import canvas
+
+    font = font or cjk_font()
+    c = canvas.Canvas(str(path))
+    for lines in tender_pages(project_name, pages, rng):
+        c.setFont(font, 10.5)
+        y = 800
+        for line in lines:
+            c.drawString(60, y, line)
+            y -= 23
+        c.showPage()
+    c.save()
+    return path
+
+
+def write_tender_docx(path: Path, project_name: str, pages: int, rng: random.Random) -> Path:
+    from docx import Document
+
+    doc = Document()
+    for page, lines in enumerate(tender_pages(project_name, pages, rng)):
+        for line in lines:
+            if line.startswith("第") and "章" in line[:4]:
+                doc.add_heading(line, level=1)
+            else:
+                doc.add_paragraph(line)
+        if page == 0:
+            # 货物需求一览表
+            table = doc.add_table(rows=21, cols=4)
+            for col, header in enumerate(["序号", "货物名称", "规格型号", "数量"]):
+                table.rows[0].cells[col].text = header
+            for row in range(1, 21):
+                values = [str(row), rng.choice(["高压开关柜", "低压开关柜", "环网柜", "箱式变电站"]),
+                          f"KYN28A-12/{rng.choice([630, 1250])}", str(rng.randint(1, 20))]
+                for col, value in enumerate(values):
+                    table.rows[row].cells[col].text = value
+        doc.add_page_break()
+    doc.save(path)
+    return path
+
+
+def write_tender_doc(path: Path, project_name: str, pages: int, rng: random.Random,
+                     timeout: int = 300) -> Optional[Path]:
+    """
+    DOC 招标文件（先生成 DOCX，再用 LibreOffice 转换为 Word 97-2003 格式）
+
+    Returns:
+        DOC 文件路径，未安装 LibreOffice 或转换失败时返回 None
+    """
+    from pdf_appendix import find_office_converter
+
+    converter = find_office_converter()
+    if not converter:
+        print("✗ 未找到 LibreOffice，无法生成 DOC 文件")
+        return None
+
+    docx_path = write_tender_docx(path.with_suffix(".docx"), project_name, pages, rng)
+    try:
+        result = subprocess.run(
+            [converter, "--headless", "--convert-to", "doc", "--outdir", str(path.parent), str(docx_path)],
+            capture_output=True, text=True, timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        print(f"✗ DOC 转换超时: {path.name}")
+        return None
+    finally:
+        docx_path.unlink(missing_ok=True)
+
+    converted = path.with_name(docx_path.stem + ".doc")
+    if result.returncode != 0 or not converted.exists():
+        print(f"✗ DOC 转换失败: {result.stderr.strip()}")
+        return None
+    if converted != path:
+        converted.replace(path)
+    return path
+
+
+def write_tender(path: Path, project_name: str, pages: int, rng: random.Random,
+                 font: Optional[str] = None) -> Optional[Path]:
+    """按扩展名（.pdf/.docx/.doc）生成招标文件，DOC 无法生成时返回 None"""
+    suffix = path.suffix.lower()
+    if suffix == ".pdf":
+        return write_tender_pdf(path, project_name, pages, rng, font)
+    if suffix == ".docx":
+        return write_tender_docx(path, project_name, pages, rng)
+    if suffix == ".doc":
+        return write_tender_doc(path, project_name, pages, rng)
+    raise ValueError(f"不支持的招标文件格式: {path.suffix}（可选 {', '.join(TENDER_FORMATS)}）")
+
+
+def build_tenders(output_dir: Path, seed: int = 0, pages: int = 50, formats: Optional[List[str]] = None,
+                  count: int = 1, project_name: str = "合成配电设备采购项目") -> List[Path]:
+    """
+    生成一组招标文件（tender_001.pdf、tender_001.docx ...）
+
+    Returns:
+        生成成功的文件路径
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    font = cjk_font() if "pdf" in (formats or TENDER_FORMATS) else None
+    paths = []
+    for i in range(count):
+        for fmt in formats or TENDER_FORMATS:
+            rng = random.Random(f"{seed}:tender:{i}:{fmt}")
+            path = write_tender(output_dir / f"tender_{i + 1:03d}.{fmt}", f"{project_name}{i + 1}", pages, rng, font)
+            if path:
+                paths.append(path)
+    return paths
+
+
+# ==================== 命令行 ====================
+
+_COMPANY_OPTIONS = ["qualifications", "certificates", "cases", "products", "personnel", "equipment_rows"]
+
+
+def _parse_options(args: List[str]) -> Dict[str, str]:
+    """解析 --name value 形式的参数（名称中的 - 换成 _）"""
+    options = {}
+    for i in range(0, len(args) - 1, 2):
+        if not args[i].startswith("--"):
+            raise ValueError(f"无法识别的参数: {args[i]}")
+        options[args[i][2:].replace("-", "_")] = args[i + 1]
+    if len(args) % 2:
+        raise ValueError(f"参数缺少取值: {args[-1]}")
+    return options
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("company", "tender"):
+        print(__doc__)
+        sys.exit(1)
+
+    command, output_dir = sys.argv[1], Path(sys.argv[2])
+    try:
+        options = _parse_options(sys.argv[3:])
+        seed = int(options.pop("seed", 0))
+        if command == "company":
+            vector_ratio = float(options.pop("vector_ratio", 0.0))
+            unknown = set(options) - set(_COMPANY_OPTIONS)
+            if unknown:
+                raise ValueError(f"无法识别的参数: {', '.join(sorted(unknown))}")
+            rng = random.Random(f"{seed}:company")
+            files = company_records(rng, **{name: int(value) for name, value in options.items()})
+            write_company_data(output_dir, files, rng, vector_ratio=vector_ratio)
+            print(f"✓ 公司资料: {output_dir}")
+            for name, content in files.items():
+                print(f"  {name}: {sum(len(records) for records in content.values())} 条")
+            print(f"  证书 PDF: {len(list((output_dir / 'certs').glob('*.pdf')))} 个")
+        else:
+            formats = options.pop("formats", ",".join(TENDER_FORMATS)).split(",")
+            pages = int(options.pop("pages", 50))
+            count = int(options.pop("count", 1))
+            if options:
+                raise ValueError(f"无法识别的参数: {', '.join(sorted(options))}")
+            paths = build_tenders(output_dir, seed=seed, pages=pages, formats=formats, count=count)
+            print(f"✓ 招标文件: {len(paths)} 个，每个 {pages} 页")
+            for path in paths:
+                print(f"  {path}")
+    except ValueError as e:
+        print(f"✗ {e}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
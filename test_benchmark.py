@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+微基准测试脚本的测试
+"""
+
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from benchmark import BENCHMARKS, compare_results, measure, run_benchmarks, save_results, tender_text
+
+
+def test_measure():
+    """自动确定循环次数；提供准备函数时每次调用前都执行"""
+    print("测试1: 计时")
+    result = measure(lambda: sum(range(1000)), budget=0.5)
+    assert result["number"] > 1
+    assert 3 <= len(result["runs"]) <= 7
+    assert result["min"] <= result["median"] <= max(result["runs"])
+
+    calls = {"setup": 0, "func": 0}
+    result = measure(lambda: calls.update(func=calls["func"] + 1),
+                     setup=lambda: calls.update(setup=calls["setup"] + 1), budget=0.1)
+    assert result["number"] == 1
+    assert calls["setup"] == calls["func"] == len(result["runs"]) + 1  # 含第一次（预热）
+    print(f"✓ 单次 {result['median'] * 1e6:.1f}µs")
+
+
+def test_run_and_compare():
+    """相同种子生成相同数据，结果可保存为 JSON 并与之前的结果对比"""
+    print("测试2: 运行与对比")
+    assert tender_text(500, random.Random(1)) == tender_text(500, random.Random(1))
+    assert "extract_requirements" in BENCHMARKS and "cert_convert" in BENCHMARKS
+
+    results = run_benchmarks(["calculate_confidence", "match_cases"], quick=True, budget=0.2)
+    assert [(r["name"], r["size"]) for r in results["results"]] == [("calculate_confidence", 20), ("match_cases", 100)]
+    assert all(r["median"] > 0 for r in results["results"])
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = save_results(results, Path(temp_dir) / "base.json")
+        base = json.loads(path.read_text(encoding="utf-8"))
+    assert base["results"][0]["runs"] == results["results"][0]["runs"]
+
+    # 当前结果慢一倍时视为变慢
+    slower = json.loads(json.dumps(results))
+    for result in slower["results"]:
+        result["median"] *= 2
+    rows = compare_results(base, slower)
+    assert len(rows) == 2 and all(row["regressed"] and abs(row["ratio"] - 2) < 1e-9 for row in rows)
+    assert not any(row["regressed"] for row in compare_results(base, results))
+    print(f"✓ {len(results['results'])} 项，对比 {len(rows)} 项")
+
+
+def main():
+    """主测试函数"""
+    test_measure()
+    test_run_and_compare()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+投标文件布局与章节组装测试脚本
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from docx import Document
+from docx.shared import Inches
+from PIL import Image as PILImage
+
+from add_chapter_numbers import get_chapter_title
+from bid_layout import BID_LAYOUTS, get_layout, build_fragments, assemble_fragments
+from section_cache import SectionCache
+from output_store import OutputStore
+from generator import BidDocumentGenerator
+
+
+def test_numbering_follows_layout():
+    """章节编号和目录都由布局推导"""
+    print("测试1: 章节编号")
+    assert get_chapter_title("资质证书", "技术标") == "1.14 资质证书"
+    assert get_chapter_title("九、近三年无重大违法记录声明", "技术标") == "1.8 近三年无重大违法记录声明"
+    assert get_chapter_title("商务承诺", "商务标") == "1.12 商务承诺"
+    # 布局中没有的章节不编号
+    assert get_chapter_title("商务承诺", "技术标") == "商务承诺"
+    assert get_chapter_title("2.1 工艺质量", "技术标") == "2.1 工艺质量"
+
+    for bid_type, layout in BID_LAYOUTS.items():
+        numbers = [number for number, _, _ in layout.toc_entries()]
+        assert numbers == [layout.number_of(spec.key) for spec in layout.sections]
+        assert len(set(spec.key for spec in layout.sections)) == len(layout.sections), bid_type
+    print("✓ 编号与目录一致")
+
+
+def test_assemble_fragments_with_images():
+    """片段按布局顺序组装，图片重新关联且按内容去重"""
+    print("测试2: 片段组装")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        red = Path(temp_dir) / "red.png"
+        blue = Path(temp_dir) / "blue.png"
+        PILImage.new("RGB", (40, 30), (255, 0, 0)).save(red)
+        PILImage.new("RGB", (40, 30), (0, 0, 255)).save(blue)
+
+        layout = get_layout("商务标")
+        images = {"cover": red, "quotation": blue, "qualifications": red}
+
+        def builder(key):
+            def build(doc):
+                doc.add_paragraph(key)
+                if key in images:
+                    doc.add_picture(str(images[key]), width=Inches(1))
+            return build
+
+        fragments = build_fragments(layout, {spec.key: builder(spec.key) for spec in layout.sections}, max_workers=4)
+        doc = assemble_fragments(fragments)
+
+        assert [p.text for p in doc.paragraphs if p.text] == [spec.key for spec in layout.sections]
+        assert len(doc.inline_shapes) == 3
+        image_parts = {rel.target_part.partname for rel in doc.part.rels.values() if "image" in rel.reltype}
+        assert len(image_parts) == 2
+
+        output_path = Path(temp_dir) / "assembled.docx"
+        doc.save(output_path)
+        print("✓ 顺序正确，3 张图片 2 个图片文件")
+
+
+def test_section_cache_rebuilds_changed_sections():
+    """只有输入变化的章节重新构建，缓存的片段（含图片）可以正常组装"""
+    print("测试3: 章节缓存")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        image = Path(temp_dir) / "cert.png"
+        PILImage.new("RGB", (40, 30), (0, 128, 0)).save(image)
+
+        layout = get_layout("商务标")
+        cache = SectionCache(cache_dir=Path(temp_dir) / "sections")
+        calls = []
+
+        def builder(key):
+            def build(doc):
+                calls.append(key)
+                doc.add_paragraph(key)
+                if key == "qualifications":
+                    doc.add_picture(str(image), width=Inches(1))
+            return build
+
+        builders = {spec.key: builder(spec.key) for spec in layout.sections}
+        inputs = {spec.key: [] for spec in layout.sections}
+        inputs["quotation"] = [{"products": [{"name": "开关柜", "unit_price": 100}]}]
+
+        build_fragments(layout, builders, inputs=inputs, cache=cache)
+        assert len(calls) == len(layout.sections)
+
+        calls.clear()
+        inputs["quotation"] = [{"products": [{"name": "开关柜", "unit_price": 120}]}]
+        fragments = build_fragments(layout, builders, inputs=inputs, cache=cache)
+        assert calls == ["quotation"]
+
+        doc = assemble_fragments(fragments)
+        assert [p.text for p in doc.paragraphs if p.text] == [spec.key for spec in layout.sections]
+        assert len(doc.inline_shapes) == 1
+        print("✓ 只重新构建报价说明")
+
+
+def test_generate_bid_headings_match_toc():
+    """生成的单一文件章节标题与目录编号一致"""
+    print("测试4: 生成投标文件")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / "templates").mkdir()
+        (root / "data").mkdir()
+        (root / "output").mkdir()
+
+        generator = BidDocumentGenerator(root / "templates", root / "output")
+        tender_info = {"project_info": {"project_name": "测试项目"}, "requirements": []}
+        company_info = {"name": "测试公司", "address": "地址", "phone": "1", "fax": "2", "email": "e"}
+        output_path = generator.generate_bid(tender_info, company_info, {"qualifications": [], "cases": []})
+
+        doc = Document(output_path)
+        texts = [p.text for p in doc.paragraphs]
+        layout = get_layout("单一文件")
+        # 封面和目录没有编号标题，其余章节标题按布局顺序出现
+        positions = [texts.index(get_chapter_title(spec.title)) for spec in layout.sections[2:]]
+        assert positions == sorted(positions)
+        assert [row.cells[0].text for row in doc.tables[0].rows] == [n for n, _, _ in layout.toc_entries()]
+        assert "第  页" in doc.sections[0].footer.paragraphs[0].text
+        print("✓ 章节标题与目录一致，页码正常")
+
+
+def test_deterministic_output():
+    """相同输入生成字节一致的文件（无论章节是否来自缓存），重复生成直接复用"""
+    print("测试5: 确定性输出")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / "templates").mkdir()
+        (root / "data").mkdir()
+        tender_info = {"project_info": {"project_name": "测试项目"}, "product_requirements": []}
+        company_info = {"name": "测试公司", "address": "地址", "phone": "1", "fax": "2", "email": "e"}
+        matched_data = {"qualifications": [], "cases": [{"project_name": "案例", "amount": 100}]}
+
+        section_cache = SectionCache(cache_dir=root / "sections")
+        outputs = []
+        for i in range(3):
+            output_dir = root / f"output_{i}"
+            output_dir.mkdir()
+            generator = BidDocumentGenerator(root / "templates", output_dir)
+            generator.deterministic = True
+            generator.section_cache = section_cache
+            generator.output_store = OutputStore(root / "store")
+            outputs.append(generator.generate_tech_bid(tender_info, company_info, matched_data))
+
+        # 第一次全部构建，后两次章节都来自缓存
+        data = [path.read_bytes() for path in outputs]
+        assert data[0] == data[1] == data[2]
+
+        again = generator.generate_tech_bid(tender_info, company_info, matched_data)
+        assert again == outputs[2]
+        print("✓ 字节一致，重复生成返回已有文件")
+
+
+def main():
+    """主测试函数"""
+    test_numbering_follows_layout()
+    test_assemble_fragments_with_images()
+    test_section_cache_rebuilds_changed_sections()
+    test_generate_bid_headings_match_toc()
+    test_deterministic_output()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
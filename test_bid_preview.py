@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+投标文件预览测试脚本
+"""
+
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from bid_layout import get_layout
+from bid_preview import ThumbnailCache, pending_thumbnails
+from generator import BidDocumentGenerator
+from synthetic_data import certificate_pdf
+
+
+def _wait_for_thumbnails(timeout: float = 30):
+    deadline = time.time() + timeout
+    while pending_thumbnails() and time.time() < deadline:
+        time.sleep(0.05)
+
+
+def test_preview_html():
+    """预览目录与布局一致，资质按正式文件分类，缩略图在后台生成后显示，不生成 docx"""
+    print("测试1: HTML 预览")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / "templates").mkdir()
+        (root / "data").mkdir()
+        (root / "output").mkdir()
+        certificate_pdf(root / "data" / "iso.pdf", "scan", random.Random(0))
+
+        generator = BidDocumentGenerator(root / "templates", root / "output")
+        tender_info = {"project_info": {"project_name": "测试<项目>"}, "requirements": ["需求1", "需求2"]}
+        company_info = {"name": "测试公司"}
+        matched_data = {
+            "qualifications": [
+                {"id": 1, "name": "ISO9001质量管理体系认证", "level": "国际", "cert_file": "iso.pdf",
+                 "cert_no": "Q-001"},
+                {"id": 2, "name": "AAA信用等级证书", "level": "AAA"},
+            ],
+            "cases": [{"project_name": f"案例{i}", "client": "客户", "amount": 1000} for i in range(12)],
+            "products": [{"name": "配电柜", "model": "GGD", "category": "低压"}],
+        }
+        thumbnails = ThumbnailCache(cache_dir=root / "thumbnails")
+
+        start = time.perf_counter()
+        first = generator.generate_preview_html(tender_info, company_info, matched_data,
+                                                separate_bids=True, thumbnails=thumbnails)
+        elapsed = time.perf_counter() - start
+        assert elapsed < 1, elapsed
+
+        assert "测试&lt;项目&gt;" in first
+        for bid_type in ("技术标", "商务标"):
+            for number, title, _ in get_layout(bid_type).toc_entries():
+                assert f"<td>{number}</td><td>{title}</td>" in first
+        assert "需求 2 项" in first and "案例 12 项" in first
+        assert "……还有 2 项" in first
+        assert "无证书文件" in first
+
+        _wait_for_thumbnails()
+        second = generator.generate_preview_html(tender_info, company_info, matched_data,
+                                                 separate_bids=False, thumbnails=thumbnails)
+        assert "data:image/jpeg;base64," in second and "缩略图生成中" not in second
+        assert f"<h4>{get_layout('单一文件').cover_title}</h4>" in second
+        assert list((root / "output").iterdir()) == []
+        print(f"✓ 预览耗时 {elapsed * 1000:.0f}ms，缩略图已缓存")
+
+
+def main():
+    """主测试函数"""
+    test_preview_html()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+证书图片转换测试脚本（内嵌图片提取 / 栅格化回退）
+"""
+
+import stat
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from PIL import Image as PILImage
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+
+import cert_images
+from cert_images import (
+    CertificateImageConverter, find_single_image,
+    get_page_count, parse_page_selection, MIN_QUALITY,
+    PATH_PASSTHROUGH, PATH_EXTRACTED, PATH_RASTERIZED, PATH_CACHED,
+)
+from cert_prerender import CertificatePrerenderer
+
+# 模拟 pdftoppm：记录调用次数，并在 -singlefile 前缀处写出 JPEG
+FAKE_PDFTOPPM = """#!{python}
+import sys
+from PIL import Image
+with open(sys.argv[0] + ".calls", "a") as f:
+    f.write(" ".join(sys.argv[1:]) + "\\n")
+Image.new("RGB", (500, 700), (255, 255, 255)).save(sys.argv[-1] + ".jpg", "JPEG")
+"""
+
+
+def _make_scan_pdf(pdf_path: Path, image_path: Path, size: tuple, color=(200, 30, 30)):
+    """生成“扫描件”证书：一页 PDF 只包含一张图片"""
+    PILImage.new("RGB", size, color).save(image_path)
+    c = canvas.Canvas(str(pdf_path))
+    c.drawImage(str(image_path), 0, 0, width=595, height=842)
+    c.showPage()
+    c.save()
+
+
+def _make_multipage_scan_pdf(pdf_path: Path, image_path: Path, pages: int):
+    """生成多页扫描件证书（如带附页的资质证书副本）"""
+    PILImage.new("RGB", (400, 560), (30, 30, 200)).save(image_path)
+    c = canvas.Canvas(str(pdf_path))
+    for _ in range(pages):
+        c.drawImage(str(image_path), 0, 0, width=595, height=842)
+        c.showPage()
+    c.save()
+
+
+def _make_vector_pdf(pdf_path: Path):
+    """生成矢量证书：页面包含文字和图形"""
+    c = canvas.Canvas(str(pdf_path))
+    c.drawString(100, 750, "Certificate")
+    c.rect(50, 50, 400, 400, fill=1)
+    c.showPage()
+    c.save()
+
+
+def test_passthrough_small_jpeg():
+    """尺寸合适的 JPEG 扫描件应原样写出"""
+    print("测试1: JPEG 直通")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        _make_scan_pdf(temp_dir / "scan.pdf", temp_dir / "scan.jpg", (400, 560))
+
+        converter = CertificateImageConverter(max_width=500)
+        output_path = temp_dir / "out.jpg"
+        assert converter.convert_page(temp_dir / "scan.pdf", output_path) == PATH_PASSTHROUGH
+
+        reader = PdfReader(str(temp_dir / "scan.pdf"))
+        embedded = find_single_image(reader.pages[0], reader).get_data()
+        assert output_path.read_bytes() == embedded
+        print("✓ 原始 JPEG 字节未重新编码")
+
+
+def test_extract_and_scale_large_jpeg():
+    """超宽的 JPEG 扫描件应提取后缩放"""
+    print("测试2: JPEG 提取并缩放")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        _make_scan_pdf(temp_dir / "scan.pdf", temp_dir / "scan.jpg", (1654, 2339))
+
+        converter = CertificateImageConverter(max_width=500)
+        output_path = temp_dir / "out.jpg"
+        assert converter.convert_page(temp_dir / "scan.pdf", output_path) == PATH_EXTRACTED
+        assert PILImage.open(output_path).width == 500
+        print("✓ 缩放到 500 像素")
+
+
+def test_extract_flate_image():
+    """非 JPEG 编码的扫描件（PNG → Flate）应解码后输出 JPEG"""
+    print("测试3: Flate 图片提取")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        _make_scan_pdf(temp_dir / "scan.pdf", temp_dir / "scan.png", (300, 400))
+
+        converter = CertificateImageConverter(max_width=500)
+        output_path = temp_dir / "out.jpg"
+        assert converter.convert_page(temp_dir / "scan.pdf", output_path) == PATH_EXTRACTED
+        assert PILImage.open(output_path).format == "JPEG"
+        print("✓ 输出 JPEG")
+
+
+def test_vector_page_not_extracted():
+    """矢量页面不应被识别为单图片页面"""
+    print("测试4: 矢量页面检测")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        pdf_path = Path(temp_dir) / "vector.pdf"
+        _make_vector_pdf(pdf_path)
+
+        reader = PdfReader(str(pdf_path))
+        assert find_single_image(reader.pages[0], reader) is None
+        print("✓ 矢量页面回退到栅格化")
+
+
+def test_rasterize_into_cache():
+    """矢量页面由 pdftoppm 直接写出 JPEG 到渲染缓存，第二次命中缓存"""
+    print("测试5: 栅格化渲染缓存")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        fake = temp_dir / "pdftoppm"
+        fake.write_text(FAKE_PDFTOPPM.format(python=sys.executable))
+        fake.chmod(fake.stat().st_mode | stat.S_IEXEC)
+
+        pdf_path = temp_dir / "vector.pdf"
+        _make_vector_pdf(pdf_path)
+
+        saved = cert_images._rasterizer
+        cert_images._rasterizer = ("pdftoppm", str(fake))
+        try:
+            converter = CertificateImageConverter(max_width=500, cache_dir=temp_dir / "cache")
+            for i, expected in enumerate([PATH_RASTERIZED, PATH_CACHED]):
+                output_path = temp_dir / f"out_{i}.jpg"
+                assert converter.convert_page(pdf_path, output_path) == expected
+                assert output_path.exists()
+        finally:
+            cert_images._rasterizer = saved
+
+        calls = (temp_dir / "pdftoppm.calls").read_text().splitlines()
+        assert len(calls) == 1
+        # A4 宽 595.28pt，输出 500 像素 → 约 60.48 dpi
+        assert "-r 60.476" in calls[0] and "-jpeg" in calls[0]
+        assert len(list((temp_dir / "cache").glob("*.jpg"))) == 1
+        print("✓ 只渲染一次，直接输出 JPEG")
+
+
+def test_parse_page_selection():
+    """页面选择解析"""
+    print("测试6: 页面选择解析")
+    assert parse_page_selection(None, 5) == [0]
+    assert parse_page_selection("1-3", 5) == [0, 1, 2]
+    assert parse_page_selection("1,3，9", 5) == [0, 2]
+    assert parse_page_selection("all", 3) == [0, 1, 2]
+    assert parse_page_selection("2-", 4) == [1, 2, 3]
+    assert parse_page_selection([2, 2, 1], 4) == [1, 0]
+    print("✓ 解析正确")
+
+
+def test_convert_multipage_certificate():
+    """多页证书只转换选中的页面，按页缓存"""
+    print("测试7: 多页证书")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        _make_multipage_scan_pdf(temp_dir / "copy.pdf", temp_dir / "copy.jpg", 4)
+        assert get_page_count(temp_dir / "copy.pdf") == 4
+
+        qualifications = [
+            {"id": 1, "name": "资质证书副本", "level": "一级", "cert_file": "copy.pdf", "pages": "1,3-4"},
+            {"id": 2, "name": "资质证书正本", "level": "一级", "cert_file": "copy.pdf"},
+        ]
+        converter = CertificateImageConverter(max_width=500, cache_dir=temp_dir / "cache")
+        results = converter.convert_certificates(qualifications, temp_dir)
+
+        assert len(results[1]["images"]) == 3
+        assert len(results[2]["images"]) == 1
+        # 第1页被两个证书共用，只转换一次
+        assert converter.stats[PATH_PASSTHROUGH] == 3
+        assert converter.stats[PATH_CACHED] == 1
+        # 转换结束后不保留各页的转换锁
+        assert not cert_images._inflight_locks
+        print("✓ 转换 3 页，命中缓存 1 页")
+
+
+def _make_noise_scan_pdf(pdf_path: Path, image_path: Path):
+    """生成难以压缩的彩色扫描件（随机噪点）"""
+    import random
+    rng = random.Random(30)
+    img = PILImage.new("RGB", (800, 1100))
+    img.putdata([(rng.randrange(256), rng.randrange(256), rng.randrange(256)) for _ in range(800 * 1100)])
+    img.save(image_path, quality=95)
+    c = canvas.Canvas(str(pdf_path))
+    c.drawImage(str(image_path), 0, 0, width=595, height=842)
+    c.showPage()
+    c.save()
+
+
+def test_compression_profile_mono():
+    """招标平台方案：黑白文字件转 1 位 PNG，彩色件保持 JPEG"""
+    print("测试8: 黑白扫描件压缩")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        _make_scan_pdf(temp_dir / "bw.pdf", temp_dir / "bw.jpg", (400, 560), color=(255, 255, 255))
+        _make_scan_pdf(temp_dir / "color.pdf", temp_dir / "color.jpg", (400, 560))
+
+        converter = CertificateImageConverter(profile="portal", cache_dir=temp_dir / "cache")
+        bw_path, path_used = converter.get_page_image(temp_dir / "bw.pdf")
+        # 招标平台方案不直通，统一重新编码
+        assert path_used == PATH_EXTRACTED
+        assert bw_path.suffix == ".png" and PILImage.open(bw_path).mode == "1"
+
+        color_path, _ = converter.get_page_image(temp_dir / "color.pdf")
+        with PILImage.open(color_path) as img:
+            assert img.format == "JPEG" and img.mode == "RGB"
+            assert img.info.get("progressive")
+        print("✓ 黑白件 1 位 PNG，彩色件渐进式 JPEG")
+
+
+def test_fit_to_budget():
+    """设置目标大小时逐张降低质量，直到总大小满足预算"""
+    print("测试9: 目标大小")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        _make_noise_scan_pdf(temp_dir / "noise.pdf", temp_dir / "noise.jpg")
+        _make_scan_pdf(temp_dir / "small.pdf", temp_dir / "small.jpg", (400, 560))
+
+        converter = CertificateImageConverter(profile="portal", cache_dir=temp_dir / "cache")
+        noise_path, _ = converter.get_page_image(temp_dir / "noise.pdf")
+        small_path, _ = converter.get_page_image(temp_dir / "small.pdf")
+        original = noise_path.stat().st_size + small_path.stat().st_size
+
+        budget = int(original * 0.6)
+        adjusted = converter.fit_to_budget([noise_path, small_path], budget)
+        assert sum(path.stat().st_size for path in adjusted.values()) <= budget
+        # 小图不受影响，只降低大图的质量
+        assert adjusted[small_path] == small_path
+        assert adjusted[noise_path] != noise_path
+
+        # 预算过小时降到最低质量为止
+        adjusted = converter.fit_to_budget([noise_path], 1)
+        assert adjusted[noise_path].stem.endswith(f"_q{MIN_QUALITY}")
+        print("✓ 满足预算")
+
+
+def test_prerender_certificates():
+    """后台预渲染后，生成时全部命中渲染缓存；重复提交沿用已提交的任务，进度按批次统计"""
+    print("测试10: 证书预渲染")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        _make_multipage_scan_pdf(temp_dir / "copy.pdf", temp_dir / "copy.jpg", 3)
+        _make_scan_pdf(temp_dir / "iso.pdf", temp_dir / "iso.jpg", (300, 420))
+        qualifications = [
+            {"id": 1, "name": "资质证书副本", "level": "一级", "cert_file": "copy.pdf", "pages": "all"},
+            {"id": 2, "name": "ISO9001", "level": "国际", "cert_file": "iso.pdf"},
+            {"id": 3, "name": "缺失证书", "level": "一级", "cert_file": "missing.pdf"},
+        ]
+
+        prerenderer = CertificatePrerenderer(cache_dir=temp_dir / "cache")
+        batch = prerenderer.schedule(qualifications, temp_dir)
+        assert batch.submitted == 2
+        # 只含一个证书的批次只统计这一个证书，沿用已提交的任务
+        single = prerenderer.schedule(qualifications[1:], temp_dir)
+        assert single.submitted == 0 and single.status()["queued"] == 1
+
+        deadline = time.time() + 30
+        while batch.status()["done"] < 2 and time.time() < deadline:
+            time.sleep(0.05)
+        assert batch.status() == {"queued": 2, "done": 2, "failed": 0}
+        assert single.status() == {"queued": 1, "done": 1, "failed": 0}
+
+        # 已完成的记录超过上限时被丢弃，再次提交时重新提交（直接命中渲染缓存）
+        bounded = CertificatePrerenderer(cache_dir=temp_dir / "cache", max_tracked=1)
+        first = bounded.schedule(qualifications[:1], temp_dir)
+        while first.status()["done"] < 1 and time.time() < deadline:
+            time.sleep(0.05)
+        bounded.schedule(qualifications[1:2], temp_dir)
+        assert bounded.schedule(qualifications[1:2], temp_dir).submitted == 0
+        assert bounded.schedule(qualifications[:1], temp_dir).submitted == 1
+
+        converter = CertificateImageConverter(dpi=200, cache_dir=temp_dir / "cache")
+        results = converter.convert_certificates(qualifications[:2], temp_dir)
+        assert len(results[1]["images"]) == 3
+        assert converter.stats[PATH_CACHED] == 4
+        print("✓ 生成时 4 页全部命中缓存")
+
+
+def main():
+    """主测试函数"""
+    test_passthrough_small_jpeg()
+    test_extract_and_scale_large_jpeg()
+    test_extract_flate_image()
+    test_vector_page_not_extracted()
+    test_rasterize_into_cache()
+    test_parse_page_selection()
+    test_convert_multipage_certificate()
+    test_compression_profile_mono()
+    test_fit_to_budget()
+    test_prerender_certificates()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+#!/usr/bin/env python3
+"""
+docx 保存测试脚本
+"""
+
+import sys
+import tempfile
+import zipfile
+from io import BytesIO
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from docx import Document
+from docx.shared import Inches
+from PIL import Image as PILImage
+
+from bid_layout import get_layout, iter_fragments, assemble_fragments
+from docx_stream import StreamingDocxWriter
+from docx_writer import save_docx, FIXED_ZIP_TIMESTAMP
+from generator import BidDocumentGenerator
+from output_store import OutputStore
+
+
+class UnseekableStream:
+    """模拟流式 HTTP 响应：只能顺序写入"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def getvalue(self):
+        return b"".join(self.chunks)
+
+
+def _make_doc(temp_dir: Path) -> Document:
+    image_path = temp_dir / "cert.jpg"
+    PILImage.effect_noise((300, 400), 50).convert("RGB").save(image_path, quality=85)
+    doc = Document()
+    doc.add_paragraph("资质证书")
+    doc.add_picture(str(image_path), width=Inches(2))
+    return doc
+
+
+def test_store_media_and_deflate_xml():
+    """图片原样存储，XML 部件压缩，内容与 python-docx 保存的一致"""
+    print("测试1: 压缩策略")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        doc = _make_doc(temp_dir)
+        save_docx(doc, temp_dir / "fast.docx")
+        doc.save(temp_dir / "default.docx")
+
+        fast = zipfile.ZipFile(temp_dir / "fast.docx")
+        default = zipfile.ZipFile(temp_dir / "default.docx")
+        assert fast.namelist() == default.namelist()
+        for info in fast.infolist():
+            expected = zipfile.ZIP_STORED if info.filename.endswith((".jpg", ".jpeg")) else zipfile.ZIP_DEFLATED
+            assert info.compress_type == expected, info.filename
+            assert fast.read(info.filename) == default.read(info.filename)
+
+        assert Document(temp_dir / "fast.docx").inline_shapes[0].width == Inches(2)
+        print("✓ 图片不压缩，XML 压缩")
+
+
+def test_deterministic_and_streaming():
+    """确定性输出字节一致；可写入不可 seek 的流"""
+    print("测试2: 确定性输出与流式写入")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        doc = _make_doc(Path(temp_dir))
+
+        first, second = BytesIO(), BytesIO()
+        save_docx(doc, first, deterministic=True)
+        save_docx(doc, second, deterministic=True)
+        assert first.getvalue() == second.getvalue()
+        names = zipfile.ZipFile(first).namelist()
+        assert names[0] == "[Content_Types].xml" and names[1:] == sorted(names[1:])
+        assert all(i.date_time == FIXED_ZIP_TIMESTAMP for i in zipfile.ZipFile(first).infolist())
+
+        stream = UnseekableStream()
+        save_docx(doc, stream)
+        assert Document(BytesIO(stream.getvalue())).paragraphs[0].text == "资质证书"
+        print("✓ 字节一致，流式写入可读")
+
+
+def test_streaming_writer_matches_assembled():
+    """流式写出与组装后保存的文件字节一致（图片去重、页码）"""
+    print("测试3: 流式写出")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        red = root / "red.png"
+        PILImage.new("RGB", (40, 30), (255, 0, 0)).save(red)
+        cert = root / "cert.jpg"
+        PILImage.effect_noise((300, 400), 50).convert("RGB").save(cert, quality=85)
+        layout = get_layout("商务标")
+        images = {"cover": [red], "quotation": [cert], "qualifications": [red, cert]}
+
+        def builder(key):
+            def build(doc):
+                doc.add_heading(key, level=1)
+                for image in images.get(key, []):
+                    doc.add_picture(str(image), width=Inches(1))
+            return build
+
+        builders = {spec.key: builder(spec.key) for spec in layout.sections}
+        assembled = BytesIO()
+        save_docx(assemble_fragments(list(iter_fragments(layout, builders))), assembled, deterministic=True)
+
+        with StreamingDocxWriter(work_dir=root) as writer:
+            for fragment in iter_fragments(layout, builders, prefetch=1):
+                writer.add_fragment(fragment)
+            streamed = BytesIO()
+            writer.save(streamed, deterministic=True)
+            # 不可 seek 的流使用数据描述符，zip 字节不同，条目内容相同
+            unseekable = UnseekableStream()
+            writer.save(unseekable, deterministic=True)
+
+        assert streamed.getvalue() == assembled.getvalue()
+        assert len(Document(streamed).inline_shapes) == 4
+        expected = zipfile.ZipFile(assembled)
+        actual = zipfile.ZipFile(BytesIO(unseekable.getvalue()))
+        assert actual.namelist() == expected.namelist()
+        assert all(actual.read(name) == expected.read(name) for name in expected.namelist())
+        # 临时文件随写出器关闭删除
+        assert [p.name for p in root.iterdir() if p.name.startswith("docx_stream_")] == []
+
+        # 生成器的单一文件（带页码）两种写出方式结果一致
+        (root / "templates").mkdir()
+        tender_info = {"project_info": {"project_name": "测试项目"}, "requirements": []}
+        company_info = {"name": "测试公司", "address": "地址", "phone": "1", "fax": "2", "email": "e"}
+        outputs = []
+        for streaming in (False, True):
+            output_dir = root / f"output_{streaming}"
+            output_dir.mkdir()
+            generator = BidDocumentGenerator(root / "templates", output_dir)
+            generator.deterministic = True
+            generator.streaming = streaming
+            generator.section_cache = None
+            generator.output_store = OutputStore(root / f"store_{streaming}")
+            outputs.append(generator.generate_bid(tender_info, company_info, {"qualifications": [], "cases": []}))
+
+        assert outputs[0].read_bytes() == outputs[1].read_bytes()
+        assert "第  页" in Document(outputs[1]).sections[0].footer.paragraphs[0].text
+        print("✓ 字节一致，临时文件已清理")
+
+
+def main():
+    """主测试函数"""
+    test_store_media_and_deflate_xml()
+    test_deterministic_and_streaming()
+    test_streaming_writer_matches_assembled()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
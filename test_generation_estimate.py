@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+生成耗时和大小预估的测试
+"""
+
+import json
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cert_images import CertificateImageConverter
+from config import ESTIMATE_CONFIG
+from generation_estimate import (compare_to_actual, estimate_generation, fit_coefficients, fit_history,
+                                 format_comparison, format_duration)
+from metrics_store import _SCHEMA, MetricsStore
+from synthetic_data import build_company_data
+
+
+def test_fit_coefficients():
+    """没有历史时为先验，记录足够多时接近真实系数"""
+    print("测试1: 系数拟合")
+    prior = [1.0, 0.1]
+    assert fit_coefficients([], [], prior) == prior
+
+    features = [[1, i % 100] for i in range(400)]
+    targets = [0.5 + 0.2 * pages for _, pages in features]
+    # 记录少时接近先验，记录多时接近真实系数
+    few = fit_coefficients(features[:5], targets[:5], prior, prior_weight=5)
+    assert abs(few[1] - 0.1) < abs(few[1] - 0.2)
+    fitted = fit_coefficients(features, targets, prior, prior_weight=1)
+    assert abs(fitted[0] - 0.5) < 0.1 and abs(fitted[1] - 0.2) < 0.01
+
+    # 特征始终为 0 时保持先验，结果不小于 0
+    fitted = fit_coefficients([[1, 0]] * 10, [-3.0] * 10, prior, prior_weight=1)
+    assert fitted[0] == 0.0 and fitted[1] == 0.1
+
+    # 旧记录（没有设备规格行数）不参与拟合
+    coefficients = fit_history([{"bid_count": 2, "total_seconds": 100.0, "equipment_rows": None}])
+    assert coefficients["history"] == 0
+    assert coefficients["seconds_per_bid"] == ESTIMATE_CONFIG["seconds_per_bid"]
+
+    # 复用已生成文件的记录不参与拟合
+    record = {"bid_count": 2, "total_seconds": 0.01, "equipment_rows": 0, "certs_rendered": 0, "certs_cached": 0}
+    assert fit_history([dict(record, reused=2)] * 20)["history"] == 0
+    assert fit_history([dict(record, reused=0)] * 20)["history"] == 20
+    print("✓ 拟合正确")
+
+
+def test_estimate():
+    """按证书页数、渲染缓存和设备行数预估"""
+    print("测试2: 预估")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = build_company_data(Path(temp_dir) / "data", seed=3, qualifications=4, cases=2, products=2,
+                                      equipment_rows=30, certificates=3)
+        cache_dir = Path(temp_dir) / "cache"
+        with open(data_dir / "qualifications.json", "r", encoding="utf-8") as f:
+            qualifications = json.load(f)["qualifications"]
+
+        cold = estimate_generation(qualifications, data_dir, separate_bids=True, cert_cache_dir=cache_dir)
+        assert cold["bids"] == 2 and cold["history"] == 0
+        assert cold["cert_pages"] > 0 and cold["cached_pages"] == 0
+        # 设备说明一览表只在技术标中
+        assert cold["equipment_rows"] == 30
+        assert cold["seconds"] > 0 and cold["bytes"] > 0
+
+        CertificateImageConverter(dpi=200, cache_dir=cache_dir).convert_certificates(qualifications, data_dir)
+        warm = estimate_generation(qualifications, data_dir, separate_bids=True, cert_cache_dir=cache_dir)
+        assert warm["cached_pages"] == warm["cert_pages"] == cold["cert_pages"]
+        assert warm["seconds"] < cold["seconds"]
+
+        single = estimate_generation(qualifications, data_dir, separate_bids=False, cert_cache_dir=cache_dir)
+        assert single["bids"] == 1 and single["equipment_rows"] == 30
+    print(f"✓ 未缓存 {format_duration(cold['seconds'])}，已缓存 {format_duration(warm['seconds'])}")
+
+
+def test_compare():
+    """预估与实际对比"""
+    print("测试3: 对比")
+    comparison = compare_to_actual({"seconds": 12.0, "bytes": 1100}, 10.0, 1000)
+    assert comparison["seconds"][2] == 0.2 and abs(comparison["bytes"][2] - 0.1) < 1e-9
+    assert compare_to_actual({"seconds": 1.0, "bytes": 1}, 0, 0)["seconds"][2] is None
+    assert "偏差 +20%" in format_comparison(comparison)
+    assert format_duration(12.4) == "12 秒" and format_duration(150) == "2 分 30 秒"
+    print("✓ 对比正确")
+
+
+def test_metrics_column():
+    """历史记录增加设备规格行数和复用标记，旧数据库自动补列"""
+    print("测试4: 设备规格行数记录")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        db_path = Path(temp_dir) / "metrics.db"
+        with sqlite3.connect(db_path) as conn:
+            conn.execute(_SCHEMA.replace(",\n    equipment_rows INTEGER,\n    reused INTEGER", ""))
+            conn.execute("INSERT INTO generations (created_at, bid_count) VALUES ('2026-01-01T00:00:00', 1)")
+        store = MetricsStore(db_path)
+        store.record({"bid_count": 1, "total_seconds": 2.0, "equipment_rows": 30, "reused": 0})
+        old, new = sorted(store.records(), key=lambda r: r["id"])
+        assert old["equipment_rows"] is None and new["equipment_rows"] == 30 and new["reused"] == 0
+        assert store.latest_id() == new["id"]
+    print("✓ 旧数据库补列并记录")
+
+
+def main():
+    """主测试函数"""
+    test_fit_coefficients()
+    test_estimate()
+    test_compare()
+    test_metrics_column()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
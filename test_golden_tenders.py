@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+端到端性能回归测试脚本的测试
+"""
+
+import copy
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from golden_tenders import GOLDEN_PACKAGES, compare_to_baseline, environment, run_package
+from synthetic_data import build_company_data, write_tender_docx
+
+
+def _small_corpus(root: Path) -> Path:
+    """只有 4 个证书、一个 3 页招标文件的测试数据（与 build_corpus 目录结构相同）"""
+    corpus_dir = root / "corpus"
+    (corpus_dir / "templates").mkdir(parents=True)
+    build_company_data(corpus_dir / "data", qualifications=4, cases=10, products=10)
+    package_dir = corpus_dir / "tenders" / "distribution"
+    package_dir.mkdir(parents=True)
+    filename = GOLDEN_PACKAGES["distribution"]["files"][0][0]
+    write_tender_docx(package_dir / filename, GOLDEN_PACKAGES["distribution"]["project_name"], 3, random.Random(0))
+    return corpus_dir
+
+
+def test_run_package():
+    """完整流程生成技术标和商务标，记录耗时、内存、大小和结构"""
+    print("测试1: 运行文件包")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        result = run_package(_small_corpus(root), "distribution", root / "work")
+
+    assert result["requirements"] > 0
+    assert result["qualifications"] == 4
+    assert set(result["timings"]) == {"parse", "match", "generate"}
+    assert result["wall_seconds"] >= result["timings"]["generate"] > 0
+    assert result["peak_rss_mb"] > 0
+    assert set(result["outputs"]) == {"技术标", "商务标"}
+    for output in result["outputs"].values():
+        structure = output["structure"]
+        assert output["bytes"] > 0
+        assert structure["images"] == 4  # 4 个单页证书
+        assert "目录" in structure["headings"]
+        assert structure["tables"]
+    print(f"✓ {result['wall_seconds']:.2f}s，{result['requirements']} 条需求")
+
+
+def test_compare_to_baseline():
+    """超过容差的指标和结构变化视为退化；环境不同时耗时和内存只作提示"""
+    print("测试2: 与基准对比")
+    package = {
+        "wall_seconds": 10.0, "peak_rss_mb": 200.0, "timings": {},
+        "outputs": {"技术标": {"bytes": 1000, "structure": {"headings": ["目录", "1.1 公司简介"], "tables": [3, 5], "images": 4}}},
+    }
+    baseline = {"environment": environment(), "corpus": {"version": 1, "seed": 0}, "packages": {"p": package}}
+    results = copy.deepcopy(baseline)
+    report = compare_to_baseline(results, baseline)
+    assert report == {"regressions": [], "warnings": []}
+
+    current = results["packages"]["p"]
+    current["wall_seconds"] = 11.0  # 在容差内
+    current["peak_rss_mb"] = 300.0
+    output = current["outputs"]["技术标"]
+    output["bytes"] = 2000
+    output["structure"]["headings"].append("1.2 技术方案")
+    output["structure"]["images"] = 3
+    regressions = compare_to_baseline(results, baseline)["regressions"]
+    assert any("峰值内存" in r for r in regressions)
+    assert not any("总耗时" in r for r in regressions)
+    assert any("大小" in r for r in regressions)
+    assert any("+1.2 技术方案" in r for r in regressions)
+    assert any("图片数量 4 → 3" in r for r in regressions)
+
+    # 其他机器上生成的基准：内存不判为退化，结构仍然检查
+    results["environment"] = dict(results["environment"], machine="other")
+    report = compare_to_baseline(results, baseline)
+    assert not any("峰值内存" in r for r in report["regressions"])
+    assert any("峰值内存" in w for w in report["warnings"])
+    assert any("图片数量" in r for r in report["regressions"])
+    print(f"✓ 检出 {len(regressions)} 项退化")
+
+
+def main():
+    """主测试函数"""
+    test_run_package()
+    test_compare_to_baseline()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+并发压力测试脚本的测试
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from load_test import Workload, find_knee, run_level
+
+
+def _level(users: int, throughput: float, p95: float) -> dict:
+    return {"users": users, "throughput": throughput, "latency": {"p95": p95}}
+
+
+def test_knee():
+    """吞吐量不再增长或 p95 延迟超过第一级的倍数时，前一级为拐点"""
+    print("测试1: 拐点")
+    levels = [_level(1, 10, 1.0), _level(2, 20, 1.1), _level(4, 38, 1.5), _level(8, 40, 3.0)]
+    assert find_knee(levels, latency_factor=2.0, min_throughput_gain=0.1) == 4
+    # 延迟先超过倍数
+    levels[2]["latency"]["p95"] = 2.5
+    assert find_knee(levels, latency_factor=2.0, min_throughput_gain=0.1) == 2
+    # 全部未饱和时为最后一级；第一级没有完成的流程时无法确定
+    assert find_knee(levels[:2], latency_factor=2.0, min_throughput_gain=0.1) == 2
+    assert find_knee([_level(1, 0, None)]) is None
+    print("✓ 拐点判断正确")
+
+
+def test_run_level():
+    """多个用户并发运行完整流程，记录吞吐量、延迟、CPU 和队列采样"""
+    print("测试2: 并发运行")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        workload = Workload(Path(temp_dir), seed=1, certificates=4, tenders=2, tender_pages=2)
+        assert len(workload.packages) == 2 and all(len(files) == 2 for files in workload.packages)
+        level = run_level(workload, users=2, duration=3, think_seconds=0.2, sample_interval=0.2)
+        assert not list((Path(temp_dir) / "output").glob("*.docx"))
+
+    assert level["users"] == 2 and level["errors"] == 0
+    assert level["completed"] >= 2
+    assert level["throughput"] > 0 and level["elapsed"] > 0
+    assert 0 < level["latency"]["p50"] <= level["latency"]["p95"] <= level["latency"]["max"]
+    assert set(level["stages"]) == {"parse", "match", "generate"}
+    assert level["cpu"]["utilization"] > 0
+    assert level["cert_queue"]["max"] >= level["cert_queue"]["mean"] >= 0
+    print(f"✓ 完成 {level['completed']} 次，p95 {level['latency']['p95']:.2f}s")
+
+
+def main():
+    """主测试函数"""
+    test_knee()
+    test_run_level()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+实时监控指标测试脚本
+"""
+
+import sys
+import tempfile
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from docx import Document
+
+import metrics_exporter
+from config import DATA_DIR
+from database import CompanyDatabase
+from generator import BidDocumentGenerator
+from metrics_exporter import (
+    Counter, Gauge, Histogram, GENERATIONS, GENERATIONS_IN_PROGRESS, MATCHES, MATCH_SECONDS,
+    OUTPUT_BYTES, PARSES, PARSE_SECONDS, render_text, start_exporter, start_http_server, write_textfile,
+)
+from output_store import OutputStore
+from parser import TenderParser
+
+
+def test_text_format():
+    """计数器、当前值、直方图按 Prometheus 文本格式输出"""
+    print("测试1: 文本格式")
+    counter = Counter("test_requests_total", "请求数", ["path"], register=False)
+    counter.inc(path='a"b')
+    counter.inc(2, path='a"b')
+    assert counter.value(path='a"b') == 3
+    assert 'test_requests_total{path="a\\"b"} 3.0' in counter.render()
+    try:
+        counter.inc(method="GET")
+        assert False, "标签不符时应报错"
+    except ValueError:
+        pass
+
+    gauge = Gauge("test_active", "进行中", register=False)
+    assert "test_active 0.0" in gauge.render()
+    with gauge.track():
+        assert gauge.value() == 1
+    assert gauge.value() == 0
+
+    histogram = Histogram("test_seconds", "耗时", buckets=(1, 5), register=False)
+    for value in (0.5, 3, 3, 10):
+        histogram.observe(value)
+    lines = histogram.render().splitlines()
+    assert lines[:2] == ["# HELP test_seconds 耗时", "# TYPE test_seconds histogram"]
+    assert lines[2:] == [
+        'test_seconds_bucket{le="1.0"} 1',
+        'test_seconds_bucket{le="5.0"} 3',
+        'test_seconds_bucket{le="+Inf"} 4',
+        "test_seconds_sum 16.5",
+        "test_seconds_count 4",
+    ]
+    print("✓ 标签转义、累计分桶正确")
+
+
+def test_instrumentation():
+    """解析、匹配、生成后对应的指标增加"""
+    print("测试2: 解析、匹配、生成计数")
+    parses = PARSES.value(format="docx", status="ok")
+    parse_count = PARSE_SECONDS.count(format="docx")
+    matches = MATCHES.value(kind="qualifications", status="ok")
+    generations = GENERATIONS.value(bid_type="单一文件", status="ok")
+    sizes = OUTPUT_BYTES.count(bid_type="单一文件")
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        tender_path = root / "招标文件.docx"
+        doc = Document()
+        doc.add_paragraph("投标人须具备 ISO9001 质量管理体系认证")
+        doc.save(tender_path)
+        result = TenderParser(root).parse_file(tender_path)
+
+        CompanyDatabase(DATA_DIR).match_qualifications(result.requirements or ["ISO9001"])
+
+        (root / "templates").mkdir()
+        (root / "output").mkdir()
+        generator = BidDocumentGenerator(root / "templates", root / "output")
+        generator.section_cache = None
+        generator.output_store = OutputStore(root / "store")
+        tender_info = {"project_info": {"project_name": "监控指标测试"}, "requirements": []}
+        company_info = {"name": "测试公司", "address": "地址", "phone": "1", "fax": "2", "email": "e"}
+        generator.generate_bid(tender_info, company_info, {"qualifications": [], "cases": []})
+
+    assert PARSES.value(format="docx", status="ok") == parses + 1
+    assert PARSE_SECONDS.count(format="docx") == parse_count + 1
+    assert MATCHES.value(kind="qualifications", status="ok") == matches + 1
+    assert MATCH_SECONDS.count(kind="qualifications") >= 1
+    assert GENERATIONS.value(bid_type="单一文件", status="ok") == generations + 1
+    assert OUTPUT_BYTES.count(bid_type="单一文件") == sizes + 1
+    assert GENERATIONS_IN_PROGRESS.value() == 0
+    text = render_text()
+    assert 'bidgen_generations_total{bid_type="单一文件",status="ok"}' in text
+    assert "bidgen_rasterizer_processes 0.0" in text
+    print("✓ 解析、匹配、生成均已计数")
+
+
+def test_export():
+    """HTTP 端口和文本文件导出；未开启时不启动"""
+    print("测试3: 导出")
+    assert start_exporter({"enabled": False, "port": 0}) is None
+
+    server = start_http_server(0)
+    try:
+        host, port = server.server_address[:2]
+        with urllib.request.urlopen(f"http://{host}:{port}/metrics", timeout=5) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            body = response.read().decode("utf-8")
+        assert "# TYPE bidgen_parses_total counter" in body
+        try:
+            urllib.request.urlopen(f"http://{host}:{port}/other", timeout=5)
+            assert False, "其他路径应返回 404"
+        except urllib.error.HTTPError as e:
+            assert e.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_textfile(Path(temp_dir) / "textfile" / "bidgen.prom")
+        assert "# TYPE bidgen_cert_queue_depth gauge" in path.read_text(encoding="utf-8")
+        assert [p.name for p in path.parent.iterdir()] == ["bidgen.prom"]
+    assert not metrics_exporter._started
+    print(f"✓ /metrics 返回 {len(body)} 字节")
+
+
+def main():
+    """主测试函数"""
+    test_text_format()
+    test_instrumentation()
+    test_export()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+生成指标历史测试脚本
+"""
+
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cert_images import CertificateImageConverter
+from generator import BidDocumentGenerator
+from metrics_store import MetricsStore, generation_metrics, percentile
+from output_store import OutputStore
+from synthetic_data import certificate_pdf
+from tracing import start_trace
+
+
+def test_record_and_summary():
+    """记录写入 SQLite，按分位数和按天汇总，超过上限时删除最旧的记录"""
+    print("测试1: 记录与汇总")
+    assert percentile([], 50) is None
+    assert percentile([1, 2, 3, 4], 50) == 2.5
+    assert percentile([5], 90) == 5
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        store = MetricsStore(Path(temp_dir) / "metrics" / "generations.sqlite3", max_records=20)
+        now = datetime.now()
+        for i in range(25):
+            # 依次为今天、10 天前、20 天前
+            created_at = now - timedelta(days=10 * (i % 3))
+            record_id = store.record({
+                "created_at": created_at.isoformat(timespec="seconds"),
+                "project_name": f"项目{i}",
+                "bid_count": 2,
+                "total_seconds": float(i + 1),
+                "requirements": 10,
+                "qualifications": 5,
+                "certs_rendered": i,
+                "certs_cached": 0,
+                "sections_cached": 0,
+                "output_bytes": 1024 * 1024,
+                "peak_rss_mb": 200.0,
+                "stages": {"构建章节": i * 0.5, "保存文件": 0.1},
+            })
+        assert record_id == 25
+
+        records = store.records()
+        assert len(records) == 20 and records[0]["project_name"] == "项目24"
+        assert records[0]["stages"] == {"构建章节": 12.0, "保存文件": 0.1}
+
+        summary = store.summary()
+        assert summary["count"] == 20
+        assert summary["fields"]["total_seconds"]["p50"] == 15.5
+        assert summary["fields"]["total_seconds"]["max"] == 25
+        assert list(summary["stages"]) == ["构建章节", "保存文件"]
+
+        trend = store.daily_trend()
+        assert [t["date"] for t in trend] == [(now - timedelta(days=d)).strftime("%Y-%m-%d") for d in (20, 10, 0)]
+        assert sum(t["count"] for t in trend) == 20
+        # 时间范围之外的记录不计入（保留的 6-25 号记录中今天的有 7 条）
+        assert store.summary(days=7)["count"] == 7
+        print("✓ 汇总正确，超出上限的记录已删除")
+
+
+def test_metrics_from_trace():
+    """从生成追踪中提取阶段耗时、证书转换/缓存数量和输出大小"""
+    print("测试2: 从追踪提取指标")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        data_dir = root / "data"
+        data_dir.mkdir()
+        (root / "templates").mkdir()
+        (root / "output").mkdir()
+
+        certificate_pdf(data_dir / "iso.pdf", "scan", random.Random(0))
+
+        generator = BidDocumentGenerator(root / "templates", root / "output")
+        generator.section_cache = None
+        generator.output_store = OutputStore(root / "store")
+        tender_info = {"project_info": {"project_name": "指标测试"}, "requirements": ["需求1", "需求2"]}
+        company_info = {"name": "测试公司", "address": "地址", "phone": "1", "fax": "2", "email": "e"}
+        matched_data = {"qualifications": [{"id": 1, "name": "ISO9001质量管理体系认证", "level": "国际",
+                                            "cert_file": "iso.pdf"}], "cases": []}
+
+        with start_trace("生成投标文件") as trace:
+            paths = generator.generate_separate_bids(tender_info, company_info, matched_data)
+        trace.path.unlink()
+
+        metrics = generation_metrics(trace, tender_info, matched_data, list(paths.values()))
+        assert metrics["project_name"] == "指标测试" and metrics["bid_count"] == 2
+        assert metrics["requirements"] == 2 and metrics["qualifications"] == 1
+        # 技术标和商务标各转换一次（第二次命中渲染缓存）
+        assert metrics["certs_rendered"] + metrics["certs_cached"] == 2
+        assert metrics["output_bytes"] == sum(p.stat().st_size for p in paths.values())
+        assert {"构建章节", "组装章节", "保存文件", "证书转换"} <= set(metrics["stages"])
+        assert metrics["stages"]["构建章节"] < metrics["total_seconds"]
+
+        assert metrics["reused"] == 0
+        assert metrics["peak_rss_mb"] == trace.peak_rss_mb
+
+        store = MetricsStore(root / "generations.sqlite3")
+        store.record(metrics)
+        assert store.records()[0]["trace_id"] == trace.trace_id
+
+        # 输入相同时复用已生成的文件
+        generator.deterministic = True
+        with start_trace("生成投标文件") as first:
+            generator.generate_separate_bids(tender_info, company_info, matched_data)
+        with start_trace("生成投标文件") as second:
+            paths = generator.generate_separate_bids(tender_info, company_info, matched_data)
+        first.path.unlink()
+        second.path.unlink()
+        assert generation_metrics(second, tender_info, matched_data, list(paths.values()))["reused"] == 2
+        print(f"✓ 生成 {metrics['total_seconds']:.2f}s，阶段: {', '.join(metrics['stages'])}")
+
+
+def test_failed_conversion_not_rendered():
+    """转换失败的证书页不计入已渲染数量"""
+    print("测试3: 转换失败不计为已渲染")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        certificate_pdf(root / "iso.pdf", "scan", random.Random(0))
+        certificate_pdf(root / "bad.pdf", "scan", random.Random(1))
+        qualifications = [{"id": 1, "name": "ISO9001", "level": "国际", "cert_file": "iso.pdf"},
+                          {"id": 2, "name": "损坏证书", "level": "国际", "cert_file": "bad.pdf"}]
+
+        converter = CertificateImageConverter(cache_dir=root / "cache")
+        convert_to_cache = converter._convert_to_cache
+
+        def fail_bad(pdf_path, page_index, key):
+            if pdf_path.name == "bad.pdf":
+                return None, None
+            return convert_to_cache(pdf_path, page_index, key)
+
+        converter._convert_to_cache = fail_bad
+        with start_trace("生成投标文件") as trace:
+            results = converter.convert_certificates(qualifications, root)
+        trace.path.unlink()
+        assert results[2]["error"] == "转换失败" and len(results[1]["images"]) == 1
+
+        metrics = generation_metrics(trace, {}, {"qualifications": qualifications}, [])
+        assert metrics["certs_rendered"] == 1 and metrics["certs_cached"] == 0
+    print("✓ 失败的页面未计入")
+
+
+def main():
+    """主测试函数"""
+    test_record_and_summary()
+    test_metrics_from_trace()
+    test_failed_conversion_not_rendered()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
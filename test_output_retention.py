@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+输出目录清理与生成结果测试脚本
+"""
+
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from output_retention import OutputRetention
+from output_store import BidArtifact
+
+
+def _touch(path: Path, size: int, age_minutes: float, now: float) -> Path:
+    path.write_bytes(b"x" * size)
+    mtime = now - age_minutes * 60
+    os.utime(path, (mtime, mtime))
+    return path
+
+
+def test_sweep():
+    """过期文件、超出大小上限的最旧文件、遗留临时文件被删除，最近生成的文件保留"""
+    print("测试1: 清理策略")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir)
+        now = time.time()
+        mb = 1024 * 1024
+        expired = _touch(output_dir / "旧.docx", 10, 60 * 24 * 40, now)
+        oldest = _touch(output_dir / "技术标_a.docx", mb, 600, now)
+        older = _touch(output_dir / "商务标_a.docx", mb, 300, now)
+        recent = _touch(output_dir / "技术标_b.docx", 2 * mb, 5, now)
+        stale_tmp = _touch(output_dir / "技术标_c.docx.1234.tmp", 10, 120, now)
+        other = _touch(output_dir / "说明.txt", 10, 60 * 24 * 40, now)
+
+        retention = OutputRetention(output_dir, max_age_days=30, max_total_mb=3, min_age_minutes=60)
+        stats = retention.sweep(now)
+
+        assert not expired.exists() and not stale_tmp.exists()
+        # 总大小 4MB 超过 3MB，只需删除最旧的一个
+        assert not oldest.exists() and older.exists()
+        assert recent.exists() and other.exists()
+        assert stats["removed"] == 3 and stats["remaining"] == 2
+
+        # 上限很小时也不会删除最近生成的文件
+        OutputRetention(output_dir, max_age_days=30, max_total_mb=0, min_age_minutes=60).sweep(now)
+        assert not older.exists() and recent.exists()
+        print("✓ 按保留策略清理")
+
+
+def test_artifact():
+    """生成结果句柄：文件路径或内存字节"""
+    print("测试2: 生成结果句柄")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = Path(temp_dir) / "技术标_项目.docx"
+        path.write_bytes(b"docx")
+        artifact = BidArtifact.from_path("技术标", path)
+        assert artifact.name == path.name and artifact.size == 4
+        assert artifact.mime.endswith("wordprocessingml.document")
+        assert artifact.read_bytes() == b"docx"
+        path.unlink()
+        assert not artifact.exists()
+
+        in_memory = BidArtifact("附录", data=b"%PDF", name="附录.pdf")
+        assert in_memory.exists() and in_memory.mime == "application/pdf"
+        print("✓ 下载信息正确")
+
+
+def main():
+    """主测试函数"""
+    test_sweep()
+    test_artifact()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""
+证书原件附录（矢量模式）测试脚本
+"""
+
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from docx import Document
+from pypdf import PdfReader
+from reportlab.pdfgen import canvas
+
+import pdf_appendix
+from generator import CERT_MODE_APPENDIX, BidDocumentGenerator
+from output_store import OutputStore
+from pdf_appendix import build_certificate_appendix
+from synthetic_data import certificate_pdf
+
+
+def _make_pdf(path: Path, pages: int):
+    """生成指定页数的测试 PDF"""
+    c = canvas.Canvas(str(path))
+    for i in range(pages):
+        c.drawString(100, 750, f"{path.stem} page {i + 1}")
+        c.showPage()
+    c.save()
+
+
+def test_build_certificate_appendix():
+    """测试证书原件合并、书签和起始页码"""
+    print("测试1: 证书原件合并")
+    print("=" * 60)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        temp_dir = Path(temp_dir)
+        _make_pdf(temp_dir / "body.pdf", 3)
+        _make_pdf(temp_dir / "iso9001.pdf", 1)
+        _make_pdf(temp_dir / "aaa.pdf", 2)
+
+        groups = [
+            ("体系认证证书", [{"id": 1, "name": "质量管理体系认证", "level": "一级", "cert_file": "iso9001.pdf"}]),
+            ("信用等级证书", [
+                {"id": 2, "name": "AAA信用等级", "level": "AAA", "cert_file": "aaa.pdf"},
+                {"id": 3, "name": "缺失的证书", "level": "", "cert_file": "missing.pdf"},
+            ]),
+        ]
+
+        output_path = temp_dir / "merged.pdf"
+        result = build_certificate_appendix(temp_dir / "body.pdf", groups, temp_dir, output_path)
+
+        reader = PdfReader(str(output_path))
+        # 正文3页 + 索引1页 + 证书3页
+        assert len(reader.pages) == 7
+        assert result['body_pages'] == 3
+        assert result['appendix_pages'] == 4
+        assert result['certificates'] == {1: 5, 2: 6}
+
+        outline = reader.outline
+        assert outline[0].title == "附录：资质证书原件"
+        categories = [item.title for item in outline[1] if not isinstance(item, list)]
+        assert categories == ["体系认证证书", "信用等级证书"]
+        print("✓ 合并结果正确")
+        print()
+
+
+def test_appendix_export_fallback():
+    """正文导出 PDF 失败（如未安装 LibreOffice）时改为嵌入证书图片，不交付没有附录的文件"""
+    print("测试2: 附录导出失败")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / "data").mkdir()
+        (root / "output").mkdir()
+        certificate_pdf(root / "data" / "iso.pdf", "scan", random.Random(0))
+
+        generator = BidDocumentGenerator(root / "templates", root / "output")
+        generator.section_cache = None
+        generator.cert_cache_dir = root / "cert_cache"
+        generator.output_store = OutputStore(root / "store")
+        tender_info = {"project_info": {"project_name": "附录测试"}, "requirements": []}
+        company_info = {"name": "测试公司", "address": "地址", "phone": "1", "fax": "2", "email": "e"}
+        matched_data = {"qualifications": [{"id": 1, "name": "ISO9001质量管理体系认证", "level": "国际",
+                                            "cert_file": "iso.pdf"}], "cases": []}
+
+        export = pdf_appendix.export_docx_to_pdf
+        pdf_appendix.export_docx_to_pdf = lambda docx_path, output_dir: None
+        try:
+            output_path = generator.generate_bid(tender_info, company_info, matched_data, cert_mode=CERT_MODE_APPENDIX)
+        finally:
+            pdf_appendix.export_docx_to_pdf = export
+
+        assert output_path.suffix == ".docx"
+        assert [p.name for p in (root / "output").iterdir()] == [output_path.name]
+        doc = Document(str(output_path))
+        assert len(doc.inline_shapes) == 1
+        assert not any("证书原件见附录" in p.text for p in doc.paragraphs)
+    print("✓ 已改为嵌入证书图片")
+
+
+def main():
+    """主测试函数"""
+    test_build_certificate_appendix()
+    test_appendix_export_fallback()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
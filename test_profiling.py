@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+性能分析测试脚本
+"""
+
+import cProfile
+import pstats
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from generator import BidDocumentGenerator
+from output_store import OutputStore
+import profiling
+from profiling import profile_run, prune_profiles
+from tracing import bind_context
+
+
+def _busy_worker(n: int) -> int:
+    return sum(i * i for i in range(n))
+
+
+def _busy_main(n: int) -> int:
+    return sum(i for i in range(n))
+
+
+def test_profile_threads():
+    """分析结果包含主线程和经 bind_context 提交的线程池任务，保存为 .prof 文件"""
+    print("测试1: 主线程与线程池任务")
+    with profile_run("测试") as run:
+        _busy_main(100000)
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            futures = [executor.submit(bind_context(_busy_worker), 50000) for _ in range(3)]
+            results = [future.result() for future in futures]
+    assert results == [_busy_worker(50000)] * 3
+
+    functions = {entry["function"]: entry for entry in run.top_functions(limit=1000)}
+    worker = next(entry for name, entry in functions.items() if name.endswith("(_busy_worker)"))
+    assert worker["calls"] == 3
+    assert any(name.startswith("test_profiling.py:") and name.endswith("(_busy_main)") for name in functions)
+
+    # .prof 文件可以被 pstats 读取
+    assert run.path.exists() and run.seconds > 0
+    assert pstats.Stats(str(run.path)).total_calls > 0
+    run.path.unlink()
+
+    # 没有进行中的分析时 bind_context 只绑定上下文
+    assert bind_context(_busy_worker)(10) == _busy_worker(10)
+    print(f"✓ 分析 {run.seconds:.2f}s，工作线程调用已合并")
+
+
+def test_profile_generation():
+    """生成投标文件时分析结果包含并发构建的章节函数"""
+    print("测试2: 生成投标文件")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        (root / "templates").mkdir()
+        (root / "output").mkdir()
+        generator = BidDocumentGenerator(root / "templates", root / "output")
+        generator.section_cache = None
+        generator.output_store = OutputStore(root / "store")
+        tender_info = {"project_info": {"project_name": "分析测试"}, "requirements": []}
+        company_info = {"name": "测试公司", "address": "地址", "phone": "1", "fax": "2", "email": "e"}
+
+        with profile_run("生成投标文件") as run:
+            generator.generate_bid(tender_info, company_info, {"qualifications": [], "cases": []})
+
+        top = run.top_functions(limit=20)
+        assert len(top) == 20
+        assert top == sorted(top, key=lambda entry: entry["cumtime"], reverse=True)
+        names = [entry["function"] for entry in run.top_functions(limit=5000)]
+        assert any(name.endswith("(_add_cover_v2)") for name in names)
+        assert any(name.endswith("(save_docx)") for name in names)
+        run.path.unlink()
+
+        # 只保留最近的文件
+        for i in range(3):
+            (root / f"{i}.prof").write_bytes(b"")
+        assert prune_profiles(root, keep=1) == 2
+        assert len(list(root.glob("*.prof"))) == 1
+        print(f"✓ 累计耗时最多: {top[0]['function']}")
+
+
+class _ActiveProfile(cProfile.Profile):
+    """模拟 Python 3.12 起已有其他分析在运行时的 cProfile"""
+
+    def enable(self, *args, **kwargs):
+        raise ValueError("Another profiling tool is already active")
+
+
+def test_profile_unavailable():
+    """已有其他分析在运行时不中断代码块，结果为 None"""
+    print("测试3: 无法启用分析")
+    original = profiling.cProfile.Profile
+    profiling.cProfile.Profile = _ActiveProfile
+    try:
+        with profile_run("并发分析") as run:
+            result = _busy_main(1000)
+    finally:
+        profiling.cProfile.Profile = original
+    assert run is None and result == _busy_main(1000)
+    print("✓ 照常运行，未分析")
+
+
+def main():
+    """主测试函数"""
+    test_profile_threads()
+    test_profile_generation()
+    test_profile_unavailable()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
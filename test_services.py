@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+服务容器测试脚本
+"""
+
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from cert_prerender import CertificatePrerenderer
+from services import Services
+from synthetic_data import certificate_pdf
+
+
+def test_warmup():
+    """预热加载公司资料、检查工具、启动后台线程并预热证书缓存，报告就绪和耗时"""
+    print("测试1: 服务预热")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        data_dir = root / "data"
+        data_dir.mkdir()
+        (root / "templates").mkdir()
+
+        certificate_pdf(data_dir / "iso.pdf", "scan", random.Random(0))
+        qualifications = [
+            {"id": 1, "name": "ISO9001", "level": "国际", "cert_file": "iso.pdf"},
+            {"id": 2, "name": "AAA信用", "level": "AAA", "cert_file": ""},
+        ]
+        (data_dir / "qualifications.json").write_text(
+            json.dumps({"qualifications": qualifications}, ensure_ascii=False), encoding="utf-8")
+
+        prerenderer = CertificatePrerenderer(cache_dir=root / "cache")
+        # 不启动进程级的输出目录清理线程，只记录调用
+        cleanups = []
+        services = Services(data_dir, root / "templates", root / "output", prerenderer=prerenderer,
+                            start_cleanup=cleanups.append)
+        assert not services.status()["ready"]
+
+        services.start_warmup(background=False)
+        status = services.status()
+        assert status["ready"] and status["error"] is None
+        assert status["warmup_seconds"] >= sum(seconds for _, seconds, _ in status["steps"])
+        assert [name for name, _, _ in status["steps"]] == [
+            "加载公司资料", "读取公司通用内容", "检查栅格化工具", "启动后台线程", "预热证书缓存"]
+        assert "资质 2（证书文件 1）" in status["steps"][0][2]
+        assert [retention.output_dir for retention in cleanups] == [root / "output"]
+
+        deadline = time.time() + 30
+        while services.prerender_batch.status()["done"] < 1 and time.time() < deadline:
+            time.sleep(0.05)
+        assert services.status()["prerender"] == {"queued": 1, "done": 1, "failed": 0}
+
+        # 重复预热无效
+        services.start_warmup()
+        assert len(services.steps) == 5
+        print(f"✓ 预热 {status['warmup_seconds']:.2f}s，证书缓存已预热")
+
+
+def main():
+    """主测试函数"""
+    test_warmup()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+启动耗时测试脚本
+"""
+
+import sys
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from startup_time import APP_MODULES, IMPORT_BUDGET_SECONDS, measure_cold_import, package_costs
+
+
+def test_cold_import():
+    """冷启动导入应用模块不超过预算，PDF/图片依赖在首次使用时才导入"""
+    print("测试1: 冷启动导入")
+    result = measure_cold_import(APP_MODULES)
+    assert result["lazy_loaded"] == [], result["lazy_loaded"]
+    assert result["seconds"] < IMPORT_BUDGET_SECONDS, result["seconds"]
+
+    packages = [package for package, _ in package_costs(result["imports"])]
+    for module in APP_MODULES:
+        assert module in packages, module
+    print(f"✓ 导入耗时 {result['seconds']:.3f}s（预算 {IMPORT_BUDGET_SECONDS:.1f}s）")
+
+
+def main():
+    """主测试函数"""
+    test_cold_import()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+合成测试数据的测试
+"""
+
+import json
+import random
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from synthetic_data import build_company_data, build_tenders, company_records, write_tender
+
+
+def test_company_data():
+    """按指定规模生成公司资料，证书 PDF 页数与资质一致，可直接被 CompanyDatabase 读取"""
+    from cert_images import get_page_count
+    from database import CompanyDatabase
+
+    print("测试1: 公司资料")
+    sizes = {"qualifications": 20, "certificates": 16, "cases": 30, "products": 25, "personnel": 2, "equipment_rows": 40}
+    assert company_records(random.Random(1), **sizes) == company_records(random.Random(1), **sizes)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        data_dir = build_company_data(Path(temp_dir) / "data", seed=1, vector_ratio=0.25, **sizes)
+        qualifications = json.loads((data_dir / "qualifications.json").read_text(encoding="utf-8"))["qualifications"]
+        with_files = [q for q in qualifications if q["cert_file"]]
+        assert len(qualifications) == 20 and len(with_files) == 16
+        for qualification in with_files:
+            pages = get_page_count(data_dir / qualification["cert_file"])
+            assert (pages > 1) == (qualification["pages"] == "all")
+        assert not list((data_dir / "certs").glob("*.jpg"))
+
+        db = CompanyDatabase(data_dir)
+        assert len(db.match_cases()) > 0
+        assert len(db.get_personnel()) == 6
+        specs = json.loads((data_dir / "equipment_specs.json").read_text(encoding="utf-8"))["equipment_specs"]
+        assert len(specs) == 40
+    print(f"✓ {len(qualifications)} 条资质，{len(with_files)} 个证书 PDF")
+
+
+def test_tenders():
+    """招标文件页数符合要求，同一种子内容相同；不支持的格式报错"""
+    from cert_images import get_page_count
+    from docx import Document
+    from pdf_appendix import find_office_converter
+
+    print("测试2: 招标文件")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        output_dir = Path(temp_dir)
+        paths = build_tenders(output_dir, seed=3, pages=12, formats=["pdf", "docx"], count=2)
+        assert [path.name for path in paths] == ["tender_001.pdf", "tender_001.docx", "tender_002.pdf", "tender_002.docx"]
+        assert get_page_count(paths[0]) == 12
+
+        texts = []
+        for path in (paths[1], output_dir / "again.docx"):
+            if not path.exists():
+                write_tender(path, "合成配电设备采购项目1", 12, random.Random("3:tender:0:docx"))
+            texts.append([paragraph.text for paragraph in Document(str(path)).paragraphs])
+        assert texts[0] == texts[1]
+        assert texts[0][0] == "项目名称：合成配电设备采购项目1"
+
+        # DOC 需要 LibreOffice 转换，未安装时返回 None
+        doc_path = write_tender(output_dir / "tender.doc", "项目", 2, random.Random(0))
+        assert (doc_path is not None) == (find_office_converter() is not None)
+        assert not (output_dir / "tender.docx").exists()
+
+        try:
+            write_tender(output_dir / "tender.txt", "项目", 1, random.Random(0))
+            assert False, "应当报错"
+        except ValueError:
+            pass
+    print(f"✓ {len(paths)} 个招标文件")
+
+
+def main():
+    """主测试函数"""
+    test_company_data()
+    test_tenders()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
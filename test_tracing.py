@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+耗时追踪测试脚本
+"""
+
+import json
+import random
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from docx import Document
+
+from database import CompanyDatabase
+from generator import BidDocumentGenerator
+from output_store import OutputStore
+from parser import TenderParser
+from synthetic_data import certificate_pdf
+from tracing import bind_context, render_waterfall_html, span, start_trace
+
+
+def test_nested_spans():
+    """区间按调用嵌套，线程池任务挂到提交它的区间下，异常记录在区间上，没有追踪时不记录"""
+    print("测试1: 嵌套区间")
+    with span("无追踪") as s:
+        s.set(ignored=True)
+
+    def work(n):
+        with span("任务", n=n):
+            return n * 2
+
+    try:
+        with start_trace("测试") as trace:
+            with span("并发") as parent:
+                with ThreadPoolExecutor(max_workers=2) as executor:
+                    futures = [executor.submit(bind_context(work), n) for n in range(3)]
+                    results = [future.result() for future in futures]
+            with span("失败"):
+                raise ValueError("出错了")
+    except ValueError:
+        pass
+
+    assert results == [0, 2, 4]
+    records = trace.to_records()
+    names = [r["name"] for r in records]
+    assert names == ["测试", "并发", "任务", "任务", "任务", "失败"], names
+    tasks = [r for r in records if r["name"] == "任务"]
+    assert all(r["parent_id"] == parent.span_id and r["depth"] == 2 for r in tasks)
+    assert sorted(r["attrs"]["n"] for r in tasks) == [0, 1, 2]
+    assert records[-1]["attrs"]["error"] == "ValueError: 出错了"
+    assert records[0]["attrs"]["error"] == "ValueError: 出错了"
+
+    # 结束后导出 JSON Lines，每行一个区间
+    lines = trace.path.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["name"] for line in lines] == names
+    trace.path.unlink()
+
+    html = render_waterfall_html(trace)
+    assert html.count("<tr") == len(records) and "#d9534f" in html
+    print("✓ 区间嵌套正确，JSON Lines 已导出")
+
+
+def test_pipeline_spans():
+    """解析、匹配、各章节、证书转换和保存都记录为区间"""
+    print("测试2: 流程区间")
+    with tempfile.TemporaryDirectory() as temp_dir:
+        root = Path(temp_dir)
+        data_dir = root / "data"
+        data_dir.mkdir()
+        (root / "templates").mkdir()
+        (root / "output").mkdir()
+
+        certificate_pdf(data_dir / "iso.pdf", "scan", random.Random(0))
+
+        tender_path = root / "tender.docx"
+        tender = Document()
+        tender.add_paragraph("投标人须具有ISO9001质量管理体系认证")
+        tender.add_paragraph("供货范围：高低压开关柜")
+        tender.save(tender_path)
+
+        generator = BidDocumentGenerator(root / "templates", root / "output")
+        generator.section_cache = None
+        generator.output_store = OutputStore(root / "store")
+        tender_info = {"project_info": {"project_name": "追踪测试"}, "requirements": []}
+        company_info = {"name": "测试公司", "address": "地址", "phone": "1", "fax": "2", "email": "e"}
+        qualifications = [{"id": 1, "name": "ISO9001质量管理体系认证", "level": "国际", "cert_file": "iso.pdf"}]
+
+        with start_trace("解析招标文件") as parse_trace:
+            result = TenderParser(data_dir).parse_file(tender_path)
+        with start_trace("匹配资料") as match_trace:
+            CompanyDatabase(data_dir).match_qualifications(result.requirements)
+        with start_trace("生成投标文件") as generate_trace:
+            generator.generate_separate_bids(tender_info, company_info,
+                                             {"qualifications": qualifications, "cases": []})
+
+        parse_names = [r["name"] for r in parse_trace.to_records()]
+        assert parse_names[:2] == ["解析招标文件", "解析文件"] and "提取需求" in parse_names
+        assert [r["name"] for r in match_trace.to_records()] == ["匹配资料", "匹配资质"]
+
+        records = generate_trace.to_records()
+        by_id = {r["span_id"]: r for r in records}
+        names = [r["name"] for r in records]
+        for name in ("生成技术标", "生成商务标", "构建章节", "组装章节", "保存文件", "资质证书"):
+            assert name in names, name
+        conversions = [r for r in records if r["name"] == "证书转换"]
+        assert conversions and all(by_id[r["parent_id"]]["name"] == "资质证书" for r in conversions)
+        assert all(r["attrs"]["size"] > 0 for r in records if r["name"] == "保存文件")
+
+        for trace in (parse_trace, match_trace, generate_trace):
+            trace.path.unlink()
+        print(f"✓ 生成追踪 {len(records)} 个区间，耗时 {generate_trace.duration:.2f}s")
+
+
+def test_memory_sampling():
+    """开启内存采样时各区间记录峰值、保留量和主要分配位置，结束后停止 tracemalloc"""
+    print("测试3: 内存采样")
+    assert not tracemalloc.is_tracing()
+    retained = []
+    with start_trace("内存测试", memory=True) as trace:
+        with span("临时分配"):
+            buffer = bytearray(8 * 1024 * 1024)
+            del buffer
+        with span("保留分配"):
+            retained.append(bytearray(4 * 1024 * 1024))
+            with span("嵌套"):
+                pass
+    assert not tracemalloc.is_tracing()
+
+    records = {r["name"]: r for r in trace.to_records()}
+    temporary = records["临时分配"]["memory"]
+    assert temporary["peak_mb"] >= 8 and abs(temporary["retained_mb"]) < 1
+    kept = records["保留分配"]["memory"]
+    assert kept["retained_mb"] >= 4
+    assert kept["top_sites"][0]["site"].startswith("test_tracing.py:") and kept["top_sites"][0]["size_mb"] >= 4
+    # 根区间的峰值包含子区间的峰值
+    assert records["内存测试"]["memory"]["peak_mb"] >= 8
+    assert records["嵌套"]["memory"]["peak_mb"] < 1
+    root_memory = records["内存测试"]["memory"]
+    if root_memory["rss_mb"] is not None:
+        assert root_memory["rss_peak_mb"] >= root_memory["rss_mb"] - 1
+
+    assert "峰值 8." in render_waterfall_html(trace)
+    trace.path.unlink()
+
+    # 默认不采样
+    with start_trace("不采样") as plain:
+        with span("区间"):
+            pass
+    assert plain.memory is None and all(r["memory"] is None for r in plain.to_records())
+    plain.path.unlink()
+    print(f"✓ 临时分配峰值 {temporary['peak_mb']:.1f}MB，保留 {kept['retained_mb']:.1f}MB")
+
+
+def test_concurrent_memory_traces():
+    """两个同时采样内存的追踪共用 tracemalloc，先结束的不影响另一个，最后一个结束时才停止"""
+    print("测试4: 并发内存采样")
+    first_done = threading.Event()
+    second_started = threading.Event()
+
+    def first():
+        with start_trace("先结束", memory=True) as trace:
+            second_started.wait(10)
+        first_done.set()
+        return trace
+
+    def second():
+        with start_trace("后结束", memory=True) as trace:
+            second_started.set()
+            first_done.wait(10)
+            assert tracemalloc.is_tracing()
+            with span("分配"):
+                buffer = bytearray(4 * 1024 * 1024)
+                del buffer
+        return trace
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        futures = [executor.submit(first), executor.submit(second)]
+        traces = [future.result() for future in futures]
+    assert not tracemalloc.is_tracing()
+
+    records = {r["name"]: r for r in traces[1].to_records()}
+    assert records["分配"]["memory"]["peak_mb"] >= 4
+    for trace in traces:
+        trace.path.unlink()
+    print("✓ 并发采样互不影响")
+
+
+def test_trace_peak_rss():
+    """每次追踪记录追踪期间的峰值常驻内存，不受之前追踪的峰值影响"""
+    print("测试5: 追踪期间峰值内存")
+    with start_trace("大量分配") as large:
+        buffer = bytearray(b"\x01") * (80 * 1024 * 1024)
+        time.sleep(0.3)  # 至少经过几次采样
+        del buffer
+    with start_trace("少量分配") as small:
+        pass
+    large.path.unlink()
+    small.path.unlink()
+    if large.peak_rss_mb is None:
+        print("✓ 当前平台不支持读取常驻内存，跳过")
+        return
+    assert large.peak_rss_mb >= small.peak_rss_mb + 40
+    print(f"✓ 峰值 {large.peak_rss_mb:.0f}MB / {small.peak_rss_mb:.0f}MB")
+
+
+def main():
+    """主测试函数"""
+    test_nested_spans()
+    test_pipeline_spans()
+    test_memory_sampling()
+    test_concurrent_memory_traces()
+    test_trace_peak_rss()
+    print("✓ 所有测试完成")
+
+
+if __name__ == "__main__":
+    main()
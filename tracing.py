@@ -0,0 +1,311 @@
+"""
+耗时追踪
+
+在解析 → 匹配 → 生成流程中记录嵌套的耗时区间，定位慢的投标文件具体把时间花在了哪里：
+
+    with start_trace("生成投标文件") as trace:
+        with span("资质证书", section="qualifications") as s:
+            ...
+            s.set(cached=True)
+
+没有进行中的追踪时 span() 不记录任何内容，库代码可以随处调用。
+线程池任务要用 bind_context() 包装后再提交，才能挂到提交它的区间下。
+
+追踪结束后按 JSON Lines 写入 cache/traces/（每行一个区间），
+render_waterfall_html() 把追踪渲染为瀑布图（调试模式显示）。
+开启内存采样时（start_trace(..., memory=True)），每个区间还记录内存峰值和保留量（见 memory_profile.py）。
+"""
+
+import contextvars
+import functools
+import html
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from config import TRACE_DIR, TRACE_CONFIG
+from memory_profile import MemoryTracker, RssPeakWatch
+from profiling import profile_task
+
+# 当前 (追踪, 区间)；线程池中的任务通过 bind_context 继承
+_current = contextvars.ContextVar("trace_current", default=None)
+
+
+class Span:
+    """一个耗时区间"""
+
+    def __init__(self, name: str, parent: Optional["Span"], attrs: Dict):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:8]
+        self.parent_id = parent.span_id if parent else None
+        self.depth = parent.depth + 1 if parent else 0
+        self.attrs = dict(attrs)
+        self.memory: Optional[Dict] = None  # 内存采样结果（开启时）
+        self.thread = threading.current_thread().name
+        self.start = time.perf_counter()
+        self.end = None
+
+    def set(self, **attrs):
+        """补充区间属性（例如结果数量、是否命中缓存）"""
+        self.attrs.update(attrs)
+
+    @property
+    def duration(self) -> float:
+        """耗时（秒），未结束的区间按当前时间计算"""
+        return (self.end if self.end is not None else time.perf_counter()) - self.start
+
+
+class _NoopSpan:
+    """没有进行中的追踪时使用，忽略所有属性"""
+
+    def set(self, **attrs):
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """一次追踪（一个根区间及其全部子区间）"""
+
+    def __init__(self, name: str, memory: bool = False, **attrs):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started_at = datetime.now()
+        self.spans: List[Span] = []
+        self.path: Optional[Path] = None  # 导出的 JSON Lines 文件
+        self.memory = MemoryTracker() if memory else None
+        self.rss = RssPeakWatch()  # 追踪期间的峰值常驻内存
+        self._lock = threading.Lock()
+        if self.memory is not None:
+            self.memory.start()
+        self.rss.start()
+        self.root = self._open(name, None, attrs)
+
+    def _open(self, name: str, parent: Optional[Span], attrs: Dict) -> Span:
+        span = Span(name, parent, attrs)
+        with self._lock:
+            self.spans.append(span)
+        if self.memory is not None:
+            self.memory.begin(span, span.depth)
+            # 不把内存采样本身的耗时计入区间
+            span.start = time.perf_counter()
+        return span
+
+    def _close(self, span: Span):
+        span.end = time.perf_counter()
+        if self.memory is not None:
+            span.memory = self.memory.end(span)
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+    @property
+    def peak_rss_mb(self) -> Optional[float]:
+        """追踪期间的峰值常驻内存（MB），不支持的平台为 None"""
+        return self.rss.peak_mb
+
+    def tree(self) -> List[tuple]:
+        """按开始时间深度优先排列的 [(深度, 区间), ...]"""
+        with self._lock:
+            spans = sorted(self.spans, key=lambda s: s.start)
+        children = {}
+        for span in spans:
+            children.setdefault(span.parent_id, []).append(span)
+
+        ordered = []
+
+        def visit(span: Span, depth: int):
+            ordered.append((depth, span))
+            for child in children.get(span.span_id, []):
+                visit(child, depth + 1)
+
+        visit(self.root, 0)
+        return ordered
+
+    def to_records(self) -> List[Dict]:
+        """每个区间一条记录，时间以毫秒计、相对追踪开始"""
+        origin = self.root.start
+        return [
+            {
+                "trace_id": self.trace_id,
+                "trace": self.name,
+                "started_at": self.started_at.isoformat(timespec="seconds"),
+                "span_id": span.span_id,
+                "parent_id": span.parent_id,
+                "name": span.name,
+                "depth": depth,
+                "start_ms": round((span.start - origin) * 1000, 3),
+                "duration_ms": round(span.duration * 1000, 3),
+                "thread": span.thread,
+                "attrs": span.attrs,
+                "memory": span.memory,
+            }
+            for depth, span in self.tree()
+        ]
+
+    def to_jsonl(self) -> str:
+        return "".join(json.dumps(record, ensure_ascii=False, default=str) + "\n"
+                       for record in self.to_records())
+
+    def export_jsonl(self, path: Optional[Path] = None) -> Path:
+        """写出 JSON Lines 文件，默认写入 cache/traces/"""
+        if path is None:
+            path = TRACE_DIR / f"{self.started_at:%Y%m%d_%H%M%S}_{self.trace_id}.jsonl"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(self.to_jsonl(), encoding="utf-8")
+        self.path = path
+        return path
+
+
+def current_trace() -> Optional[Trace]:
+    """当前进行中的追踪"""
+    current = _current.get()
+    return current[0] if current else None
+
+
+@contextmanager
+def start_trace(name: str, memory: Optional[bool] = None, **attrs) -> Iterator[Trace]:
+    """
+    开始一次追踪
+
+    已有进行中的追踪时只作为其中的一个区间，返回外层追踪。
+    追踪结束后按 TRACE_CONFIG 导出 JSON Lines。
+
+    Args:
+        name: 追踪名称
+        memory: 是否采样各区间的内存占用，默认见 TRACE_CONFIG["memory"]
+        attrs: 根区间属性
+    """
+    current = _current.get()
+    if current is not None:
+        with span(name, **attrs):
+            yield current[0]
+        return
+
+    if memory is None:
+        memory = TRACE_CONFIG["memory"]
+    trace = Trace(name, memory=memory, **attrs)
+    token = _current.set((trace, trace.root))
+    try:
+        yield trace
+    except BaseException as e:
+        trace.root.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        trace._close(trace.root)
+        trace.rss.stop()
+        if trace.memory is not None:
+            trace.memory.stop()
+        _current.reset(token)
+        if TRACE_CONFIG["export"]:
+            try:
+                trace.export_jsonl()
+                prune_traces()
+            except OSError as e:
+                print(f"⚠️ 追踪导出失败: {e}")
+
+
+@contextmanager
+def span(name: str, **attrs):
+    """记录一个耗时区间（没有进行中的追踪时不记录）"""
+    current = _current.get()
+    if current is None:
+        yield _NOOP_SPAN
+        return
+
+    trace, parent = current
+    child = trace._open(name, parent, attrs)
+    token = _current.set((trace, child))
+    try:
+        yield child
+    except BaseException as e:
+        child.set(error=f"{type(e).__name__}: {e}")
+        raise
+    finally:
+        trace._close(child)
+        _current.reset(token)
+
+
+def current_span():
+    """当前区间，用于在区间内部补充属性（没有进行中的追踪时返回不记录的空区间）"""
+    current = _current.get()
+    return current[1] if current is not None else _NOOP_SPAN
+
+
+def traced(name: Optional[str] = None):
+    """把整个函数调用记录为一个区间的装饰器"""
+    def decorator(func: Callable) -> Callable:
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name or func.__name__):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def bind_context(func: Callable) -> Callable:
+    """
+    把当前追踪上下文绑定到函数上，提交到线程池前调用
+
+    每个任务单独绑定一次（同一个绑定结果不能在两个线程中同时运行）。
+    有进行中的性能分析时（见 profiling.py），任务在工作线程中一并分析。
+    """
+    return functools.partial(contextvars.copy_context().run, profile_task, func)
+
+
+def prune_traces(trace_dir: Optional[Path] = None, keep: Optional[int] = None) -> int:
+    """只保留最近的追踪文件，返回删除的数量"""
+    trace_dir = trace_dir or TRACE_DIR
+    keep = keep if keep is not None else TRACE_CONFIG["keep"]
+    files = sorted(trace_dir.glob("*.jsonl"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in files[keep:]:
+        path.unlink(missing_ok=True)
+    return max(0, len(files) - keep)
+
+
+def render_waterfall_html(trace: Trace) -> str:
+    """
+    瀑布图：每个区间一行，按嵌套缩进，横条表示在整次追踪中的起止位置
+    （出错的区间标红，命中缓存的标绿）；开启内存采样时增加内存峰值和保留量两列
+    """
+    total = max(trace.duration, 1e-9)
+    origin = trace.root.start
+    rows = []
+    for depth, s in trace.tree():
+        left = (s.start - origin) / total * 100
+        width = max(s.duration / total * 100, 0.3)
+        if "error" in s.attrs:
+            color = "#d9534f"
+        elif s.attrs.get("cached"):
+            color = "#5cb85c"
+        else:
+            color = "#4a90d9"
+        details = [f"{k}={v}" for k, v in s.attrs.items()]
+        memory_cells = ""
+        if s.memory is not None:
+            details.extend(f"{site['site']} +{site['size_mb']:.1f}MB" for site in s.memory.get("top_sites", []))
+            memory_cells = (f'<td class="ms">峰值 {s.memory["peak_mb"]:.1f}MB</td>'
+                            f'<td class="ms">保留 {s.memory["retained_mb"]:.1f}MB</td>')
+        detail = html.escape("\n".join(details), quote=True)
+        rows.append(
+            f'<tr title="{detail}"><td style="padding-left:{depth * 14}px">{html.escape(s.name)}</td>'
+            f'<td class="ms">{s.duration * 1000:.0f}ms</td>{memory_cells}'
+            f'<td class="bar"><div style="margin-left:{left:.2f}%;width:{width:.2f}%;background:{color}"></div></td></tr>'
+        )
+    return (
+        "<style>"
+        ".waterfall { border-collapse: collapse; width: 100%; font-size: 12px; }"
+        ".waterfall td { padding: 1px 6px; white-space: nowrap; }"
+        ".waterfall td.ms { text-align: right; color: #555; }"
+        ".waterfall td.bar { width: 60%; }"
+        ".waterfall td.bar div { height: 10px; }"
+        "</style>"
+        f'<table class="waterfall">{"".join(rows)}</table>'
+    )